@@ -6,6 +6,8 @@ pd.options.display.float_format = '{:.4f}'.format
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR     = PROJECT_ROOT / "data"
 OUTPUT_DIR   = PROJECT_ROOT / "output"
+# Landing-page KPIs, read by the streamlit app (Hello.py)
+KPI_DIR      = PROJECT_ROOT.parent / "streamlit" / "data" / "cache" / "kpis"
 
 
 # ── Excel / PPT Filenames 
@@ -22,5 +24,6 @@ CONFIG = {
     "sheet_investments": "Investments",
     "starting_date":    "2023-05-01",
     "initial_investment": 1000,
+    "risk_free_rate":   0.025,   # annual, for Sharpe ratios (3-month T-bill)
     "portfolio_reference": "Portefeuille de référence",
 }
@@ -0,0 +1,125 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+EPISODE_COLUMNS = ["Series", "Peak", "Trough", "Recovery", "Depth",
+                   "Days to trough", "Days to recover", "Duration", "Recovered"]
+
+
+class DrawdownCalculator:
+    """
+    Drawdowns of level series (prices or a cumulative return index), one column per
+    fund / ETF. Every computation runs on the whole dates x series array at once.
+    Missing levels are carried forward after each series' first observation.
+    """
+
+    def __init__(self, levels):
+        levels = levels if isinstance(levels, pd.DataFrame) else levels.to_frame()
+        self.levels = levels.sort_index().ffill()
+
+    @classmethod
+    def from_returns(cls, returns):
+        """Wealth index (1 + r).cumprod() of simple returns."""
+        return cls((1 + returns.fillna(0)).cumprod())
+
+    def drawdowns(self):
+        """Running-peak drawdown of every series: level / running max - 1 (<= 0)."""
+        return self.levels / self.levels.cummax() - 1
+
+    def episodes(self):
+        """
+        Drawdown episodes of every series: peak (last date at the running max),
+        trough, recovery (first date back at the peak, NaT if still underwater),
+        depth and durations in calendar days. Runs are found on the flattened
+        column-major underwater mask and reduced with np.minimum.reduceat.
+        """
+        dd = self.drawdowns().to_numpy()
+        n_dates, n_series = dd.shape
+        if n_dates == 0 or n_series == 0:
+            return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+        under = np.nan_to_num(dd, nan=0.0) < 0
+        # A run starts where a series goes underwater; row 0 starts a run too
+        prev = np.vstack([np.zeros((1, n_series), dtype=bool), under[:-1]])
+        nxt = np.vstack([under[1:], np.zeros((1, n_series), dtype=bool)])
+        flat_under = under.ravel(order="F")
+        starts = np.flatnonzero(flat_under & ~prev.ravel(order="F"))
+        ends = np.flatnonzero(flat_under & ~nxt.ravel(order="F"))
+        if len(starts) == 0:
+            return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+        # Underwater values only, so each run is a contiguous segment
+        pos = np.flatnonzero(flat_under)
+        vals = dd.ravel(order="F")[pos]
+        lengths = ends - starts + 1
+        depth = np.minimum.reduceat(vals, np.cumsum(lengths) - lengths)
+        # Trough: first date of each run at the run minimum
+        run = np.repeat(np.arange(len(starts)), lengths)
+        at_min = vals == depth[run]
+        _, first = np.unique(run[at_min], return_index=True)
+        trough = pos[at_min][first]
+
+        series, start_row = np.divmod(starts, n_dates)
+        end_row = ends - series * n_dates
+        trough_row = trough - series * n_dates
+        recovered = end_row + 1 < n_dates
+        dates = self.levels.index
+        last = dates[-1]
+        peak = dates[np.maximum(start_row - 1, 0)]
+        recovery = pd.DatetimeIndex(np.where(recovered, dates[np.minimum(end_row + 1, n_dates - 1)], pd.NaT))
+        trough_date = dates[trough_row]
+
+        out = pd.DataFrame({
+            "Series": self.levels.columns[series],
+            "Peak": peak,
+            "Trough": trough_date,
+            "Recovery": recovery,
+            "Depth": depth,
+            "Days to trough": (trough_date - peak).days,
+            "Days to recover": (recovery - trough_date).days,
+            "Duration": (recovery.fillna(last) - peak).days,
+            "Recovered": recovered,
+        })
+        return out[EPISODE_COLUMNS]
+
+    def rolling_max_drawdown(self, window=252, chunk=512):
+        """
+        Max drawdown within the trailing `window` observations ending at each date
+        (NaN before a full window). Strided window views, processed `chunk` dates at
+        a time to bound memory.
+        """
+        x = self.levels.to_numpy(dtype=float)
+        n_dates = len(x)
+        out = np.full(x.shape, np.nan)
+        if n_dates < window:
+            return pd.DataFrame(out, index=self.levels.index, columns=self.levels.columns)
+        views = sliding_window_view(x, window, axis=0)     # (n_dates - window + 1, n_series, window)
+        for i in range(0, len(views), chunk):
+            w = views[i:i + chunk]
+            peaks = np.fmax.accumulate(w, axis=2)
+            # fmin skips the NaN before a series starts
+            out[window - 1 + i:window - 1 + i + len(w)] = np.fmin.reduce(w / peaks - 1, axis=2)
+        return pd.DataFrame(out, index=self.levels.index, columns=self.levels.columns)
+
+    def summary(self, window=252):
+        """Per series: current drawdown, max drawdown, latest rolling max drawdown and episode count."""
+        dd = self.drawdowns()
+        episodes = self.episodes()
+        return pd.DataFrame({
+            "Current drawdown": dd.ffill().iloc[-1],
+            "Max drawdown": dd.min(),
+            f"Max drawdown ({window}D)": self.rolling_max_drawdown(window).ffill().iloc[-1],
+            "Episodes": episodes["Series"].value_counts().reindex(dd.columns, fill_value=0),
+        })
+
+
+if __name__ == "__main__":
+    # python -m src.drawdown_calculator [prices.parquet]
+    from .config import PROJECT_ROOT
+    paths = sys.argv[1:]
+    prices = pd.read_parquet(paths[0] if paths else PROJECT_ROOT.parent / "streamlit" / "data" / "prices.parquet")
+    calc = DrawdownCalculator(prices)
+    print(calc.summary().round(4))
+    print(calc.episodes().sort_values("Depth").head(10))
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .drawdown_calculator import DrawdownCalculator
+
+# Bump when columns or definitions change; recorded in the manifest with the column list
+KPI_VERSION = 1
+KPI_FILE = "kpis.parquet"
+MANIFEST = "manifest.json"
+KPI_COLUMNS = ["AUM", "MTD return", "YTD return", "Annualized vol", "Sharpe 12M", "Max drawdown 12M"]
+TRADING_DAYS = 252
+
+
+class KPICalculator:
+    """
+    Landing-page KPIs of each fund at the last date of the pipeline, computed once
+    per run and written as a one-row-per-fund table with a manifest.
+    """
+
+    def __init__(self, risk_free_rate, window=TRADING_DAYS):
+        self.risk_free_rate = risk_free_rate
+        self.window = window
+
+    @staticmethod
+    def _compound(daily_returns, start):
+        return (1 + daily_returns[daily_returns.index > start]).prod() - 1
+
+    def calculate(self, market_values, daily_returns):
+        """Fund x KPI table from daily market values (incl. cash) and cash-flow adjusted daily returns."""
+        as_of = daily_returns.index.max()
+        last_year = daily_returns.iloc[-self.window:]
+        vol = last_year.std() * np.sqrt(TRADING_DAYS)
+        excess = (1 + last_year).prod() ** (TRADING_DAYS / len(last_year)) - 1 - self.risk_free_rate
+        month_end = as_of.to_period("M").start_time - pd.Timedelta(days=1)
+        year_end = as_of.to_period("Y").start_time - pd.Timedelta(days=1)
+
+        kpis = pd.DataFrame({
+            "AUM": market_values.loc[:as_of].ffill().iloc[-1],
+            "MTD return": self._compound(daily_returns, month_end),
+            "YTD return": self._compound(daily_returns, year_end),
+            "Annualized vol": vol,
+            "Sharpe 12M": excess / vol.replace(0, np.nan),
+            "Max drawdown 12M": DrawdownCalculator.from_returns(last_year).drawdowns().min(),
+        }).reindex(daily_returns.columns)
+        kpis.index.name = "Fund"
+        return kpis[KPI_COLUMNS], as_of
+
+    def write(self, kpis, as_of, out_dir):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        # Drop the manifest first: readers treat the store as missing while the table is rewritten
+        (out_dir / MANIFEST).unlink(missing_ok=True)
+        kpis.reset_index().to_parquet(out_dir / KPI_FILE, index=False)
+        manifest = {
+            "kpi_version": KPI_VERSION,
+            "columns": list(kpis.columns),
+            "as_of": str(as_of.date()),
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+            "risk_free_rate": self.risk_free_rate,
+            "funds": list(kpis.index),
+        }
+        (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        return manifest
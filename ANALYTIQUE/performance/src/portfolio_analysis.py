@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import timedelta
 
-from .config                import CONFIG, DATA_DIR, OUTPUT_DIR, PPT_INPUT, PPT_OUTPUT
+from .config                import CONFIG, DATA_DIR, OUTPUT_DIR, KPI_DIR, PPT_INPUT, PPT_OUTPUT
 from .data_loader           import DataLoader
 from .price_processor       import PriceProcessor
 from .dividend_processor    import DividendProcessor
@@ -13,6 +13,9 @@ from .market_value          import MarketValueCalculator
 from .return_calculator     import ReturnCalculator
 from .plotter               import Plotter
 from .metrics_calculator    import MetricsCalculator
+from .risk_calculator       import RiskCalculator
+from .drawdown_calculator   import DrawdownCalculator
+from .kpi_calculator        import KPICalculator
 from .bni_fund              import funds_name
 
 # Excel PPT paths
@@ -108,6 +111,17 @@ class PortfolioAnalysis:
                 self.config['initial_investment']
             )
 
+        # 8) rolling VaR / Expected Shortfall per portfolio
+        self.calculate_tail_risk(daily_ret[funds_name], start_point='2024-01-01')
+
+        # 9) drawdown episodes: funds on the $1,000 index, ETFs on split-adjusted prices
+        self.calculate_drawdowns(pd.concat([invest_vals[funds_name], adj_prices[starting_date:]], axis=1))
+
+        # 10) landing-page KPIs for the streamlit app
+        kpi_calc = KPICalculator(self.config['risk_free_rate'])
+        kpis, as_of = kpi_calc.calculate(summed_market_value_df[funds_name], daily_ret[funds_name])
+        kpi_calc.write(kpis, as_of, KPI_DIR)
+
 
     def plot_metrics(self, weekly_fund_returns, window):
         date_1 = pd.Timestamp('2025-02-06') ## ligne pour allocation tactique 06 février 2025 -> Tactique 2
@@ -167,6 +181,48 @@ class PortfolioAnalysis:
                 index=True
             )
 
+    def calculate_tail_risk(self, daily_fund_returns, start_point, window=250):
+        risk = RiskCalculator(daily_fund_returns, window).calculate()
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        risk.to_csv(self.output_path / "tail_risk.csv")
+        if not risk.empty:
+            self.plot_tail_risk(risk, start_point)
+
+        # Funds RiskCalculator skipped (history shorter than the window) stay as NaN columns
+        latest_df = RiskCalculator.latest(risk) if not risk.empty else pd.DataFrame()
+        latest_df.columns = [f"{method} {measure} {c:.0%} {h}D" for method, measure, c, h in latest_df.columns]
+        with pd.ExcelWriter(file_path_output_pp, mode='a', engine='openpyxl') as writer:
+            latest_df.T.reindex(columns=funds_name).to_excel(writer, sheet_name="Tail risk", index=True)
+
+    def plot_tail_risk(self, risk, start_point):
+        # 1-day 99% figures, one panel per fund
+        one_day = risk.xs((0.99, 1), axis=1, level=['Confidence', 'Horizon'])[start_point:]
+        funds = one_day.columns.get_level_values('Series').unique()
+        fig, axs = plt.subplots(len(funds), 2, figsize=(10, 8), sharey=True, squeeze=False)
+        for i, fund in enumerate(funds):
+            for j, measure in enumerate(['VaR', 'ES']):
+                ax = axs[i, j]
+                for method, vals in one_day[fund].xs(measure, axis=1, level='Measure').items():
+                    ax.plot(vals.index, vals, label=method)
+                ax.set_title(f"{fund} - {measure} 99% 1D", fontsize=9)
+                if i < len(funds) - 1:
+                    ax.set_xticklabels([])
+                else:
+                    ax.tick_params(axis='x', rotation=45)
+        handles, labels = axs[0, 0].get_legend_handles_labels()
+        fig.legend(handles, labels, loc='lower center', ncol=3, frameon=False)
+        plt.tight_layout(rect=[0,0.05,1,1])
+        plt.savefig(self.output_path / "tail_risk_plot.pdf", dpi=300)
+
+    def calculate_drawdowns(self, levels, window=252):
+        calc = DrawdownCalculator(levels)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        calc.episodes().to_csv(self.output_path / "drawdown_episodes.csv", index=False)
+        calc.drawdowns().to_csv(self.output_path / "drawdowns.csv")
+
+        with pd.ExcelWriter(file_path_output_pp, mode='a', engine='openpyxl') as writer:
+            calc.summary(window).to_excel(writer, sheet_name="Drawdowns", index=True)
+
     def run_analysis(self):
         # reload raw sheets
         ( df_prices,
@@ -0,0 +1,218 @@
+import math
+import sys
+import time
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+class SlidingOrderStatistics:
+    """
+    Order statistics of a sliding window over a fixed series.
+    Observations are ranked once; a Fenwick tree over the ranks keeps the count and
+    the sum of the values in the window, so adding / removing an observation, the
+    k-th smallest value and the sum of the k smallest are all O(log n) - no window
+    is ever re-sorted.
+    """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        self.n = len(self.values)
+        order = np.argsort(self.values, kind="stable")
+        self.rank = np.empty(self.n, dtype=np.int64)
+        self.rank[order] = np.arange(self.n)
+        self.rank = self.rank.tolist()
+        self.sorted_values = self.values[order].tolist()
+        self.count = [0] * (self.n + 1)
+        self.total = [0.0] * (self.n + 1)
+        self.top_bit = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def _update(self, i, sign):
+        r = self.rank[i] + 1
+        v = sign * self.sorted_values[r - 1]
+        while r <= self.n:
+            self.count[r] += sign
+            self.total[r] += v
+            r += r & -r
+
+    def add(self, i):
+        self._update(i, 1)
+
+    def remove(self, i):
+        self._update(i, -1)
+
+    def smallest(self, k):
+        """(k-th smallest value, sum of the k smallest values) in the window, k >= 1."""
+        pos, remaining, acc = 0, k, 0.0
+        step = self.top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.count[nxt] < remaining:
+                pos = nxt
+                remaining -= self.count[nxt]
+                acc += self.total[nxt]
+            step >>= 1
+        value = self.sorted_values[pos]
+        return value, acc + value
+
+
+def rolling_tail(values, window, confidence_levels):
+    """
+    Rolling lower-tail statistics of `values` (no NaN): for each confidence level c,
+    with k = ceil((1 - c) x window), the k-th smallest value and the mean of the k
+    smallest over the window ending at each observation (NaN before a full window).
+    Returns {c: (quantile array, tail mean array)}.
+    """
+    n = len(values)
+    out = {c: (np.full(n, np.nan), np.full(n, np.nan)) for c in confidence_levels}
+    ks = {c: max(1, math.ceil((1 - c) * window - 1e-9)) for c in confidence_levels}
+    stats = SlidingOrderStatistics(values)
+    for t in range(n):
+        stats.add(t)
+        if t >= window:
+            stats.remove(t - window)
+        if t >= window - 1:
+            for c, k in ks.items():
+                q, s = stats.smallest(k)
+                out[c][0][t] = q
+                out[c][1][t] = s / k
+    return out
+
+
+class RiskCalculator:
+    """
+    Rolling VaR and Expected Shortfall of daily return series (one column per fund / ETF).
+    Methods: historical, parametric (Gaussian) and filtered historical (historical
+    quantiles of EWMA-standardized returns, rescaled by the current EWMA volatility).
+    Figures are positive losses (fractions) for the day after each date, scaled to
+    longer horizons with the square root of time.
+    """
+
+    def __init__(self, returns, window=250, confidence_levels=(0.95, 0.99), horizons=(1, 10), ewma_lambda=0.94):
+        self.returns = returns if isinstance(returns, pd.DataFrame) else returns.to_frame()
+        self.window = window
+        self.confidence_levels = tuple(confidence_levels)
+        self.horizons = tuple(horizons)
+        self.ewma_lambda = ewma_lambda
+
+    def _frame(self, name, method, one_day):
+        """{(measure, confidence): Series} of 1-day figures -> horizon-scaled columns."""
+        cols = {}
+        for (measure, c), s in one_day.items():
+            for h in self.horizons:
+                cols[(name, method, measure, c, h)] = s * math.sqrt(h)
+        return cols
+
+    def historical(self, r):
+        tail = rolling_tail(r.to_numpy(), self.window, self.confidence_levels)
+        out = {}
+        for c, (q, m) in tail.items():
+            out[("VaR", c)] = pd.Series(-q, index=r.index)
+            out[("ES", c)] = pd.Series(-m, index=r.index)
+        return out
+
+    def parametric(self, r):
+        mean = r.rolling(self.window).mean()
+        std = r.rolling(self.window).std()
+        out = {}
+        for c in self.confidence_levels:
+            z = NormalDist().inv_cdf(1 - c)
+            out[("VaR", c)] = -(mean + z * std)
+            out[("ES", c)] = -(mean - std * NormalDist().pdf(z) / (1 - c))
+        return out
+
+    def filtered_historical(self, r):
+        # sigma2[t]: EWMA variance known at the close of t (forecast for t + 1)
+        sigma2 = (r ** 2).ewm(alpha=1 - self.ewma_lambda, adjust=False).mean()
+        residuals = (r / np.sqrt(sigma2.shift(1))).iloc[1:]
+        residuals = residuals.replace([np.inf, -np.inf], np.nan).dropna()
+        sigma = np.sqrt(sigma2.reindex(residuals.index)).to_numpy()
+        tail = rolling_tail(residuals.to_numpy(), self.window, self.confidence_levels)
+        out = {}
+        for c, (q, m) in tail.items():
+            out[("VaR", c)] = pd.Series(-q * sigma, index=residuals.index)
+            out[("ES", c)] = pd.Series(-m * sigma, index=residuals.index)
+        return out
+
+    def calculate(self):
+        """Dates x (Series, Method, Measure, Confidence, Horizon) rolling VaR / ES."""
+        cols = {}
+        for name in self.returns.columns:
+            r = self.returns[name].dropna()
+            if len(r) < self.window:
+                warnings.warn(f"{name} has {len(r)} returns, fewer than the {self.window}-day window: skipped",
+                              RuntimeWarning, stacklevel=2)
+                continue
+            cols.update(self._frame(name, "Historical", self.historical(r)))
+            cols.update(self._frame(name, "Parametric", self.parametric(r)))
+            cols.update(self._frame(name, "Filtered historical", self.filtered_historical(r)))
+        names = ["Series", "Method", "Measure", "Confidence", "Horizon"]
+        # Built from the tuples so a frame where every series was skipped keeps its levels
+        frame = pd.DataFrame(cols, columns=pd.MultiIndex.from_tuples(list(cols), names=names))
+        return frame.sort_index()
+
+    @staticmethod
+    def latest(risk):
+        """Last available figure of every column, one row per series."""
+        last = risk.apply(lambda s: s.dropna().iloc[-1] if s.notna().any() else np.nan)
+        return last.unstack("Series").T
+
+
+# ---------------------------------------------------------------------
+# Benchmark: python -m src.risk_calculator --bench [returns.csv]
+# ---------------------------------------------------------------------
+def _naive_rolling_tail(values, window, confidence_levels):
+    """Reference: sort every window."""
+    n = len(values)
+    out = {c: (np.full(n, np.nan), np.full(n, np.nan)) for c in confidence_levels}
+    for t in range(window - 1, n):
+        w = np.sort(values[t - window + 1:t + 1])
+        for c in confidence_levels:
+            k = max(1, math.ceil((1 - c) * window - 1e-9))
+            out[c][0][t] = w[k - 1]
+            out[c][1][t] = w[:k].mean()
+    return out
+
+
+def _bench(path, windows=(250, 1000), confidence_levels=(0.95, 0.99)):
+    returns = pd.read_csv(path, index_col=0, parse_dates=True)
+    for window in windows:
+        _bench_window(returns, window, confidence_levels)
+
+    t0 = time.perf_counter()
+    risk = RiskCalculator(returns, windows[0], confidence_levels).calculate()
+    print(f"RiskCalculator: {risk.shape[1]} rolling series in {time.perf_counter() - t0:.2f}s")
+    print(RiskCalculator.latest(risk).xs(1, axis=1, level="Horizon").round(4))
+
+
+def _bench_window(returns, window, confidence_levels):
+    t_tree = t_naive = t_pandas = 0.0
+    n_obs = 0
+    for name in returns.columns:
+        x = returns[name].dropna().to_numpy()
+        n_obs += len(x)
+        t0 = time.perf_counter()
+        tree = rolling_tail(x, window, confidence_levels)
+        t1 = time.perf_counter()
+        naive = _naive_rolling_tail(x, window, confidence_levels)
+        t2 = time.perf_counter()
+        for c in confidence_levels:
+            pd.Series(x).rolling(window).quantile(1 - c, interpolation="lower")
+        t3 = time.perf_counter()
+        t_tree, t_naive, t_pandas = t_tree + t1 - t0, t_naive + t2 - t1, t_pandas + t3 - t2
+        for c in confidence_levels:
+            assert np.allclose(tree[c][0], naive[c][0], equal_nan=True), name
+            assert np.allclose(tree[c][1], naive[c][1], equal_nan=True), name
+    print(f"{len(returns.columns)} series, {n_obs} returns, window={window}: "
+          f"order-statistics tree={t_tree:.2f}s (VaR + ES) "
+          f"sort per window={t_naive:.2f}s (VaR + ES) "
+          f"pandas rolling quantile={t_pandas:.2f}s (VaR only) identical=True")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        from .config import DATA_DIR
+        paths = [a for a in sys.argv[1:] if a != "--bench"]
+        _bench(paths[0] if paths else DATA_DIR / "returns.csv")
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.drawdown_calculator import EPISODE_COLUMNS, DrawdownCalculator
+
+DATES = pd.date_range("2024-01-01", periods=10, freq="D")
+
+
+def d(i):
+    return DATES[i]
+
+
+@pytest.fixture
+def levels():
+    return pd.DataFrame({
+        # Two recovered episodes, then one still underwater at the end
+        "A": [100, 110, 99, 88, 105, 110, 120, 115, 120, 118],
+        # Starts on day 2; the trough value is hit twice (the first date counts)
+        "B": [np.nan, np.nan, 50, 40, 40, 45, 50, 60, 60, 60],
+        # Never below its running peak
+        "C": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    }, index=DATES, dtype=float)
+
+
+def test_episodes_on_a_hand_built_series(levels):
+    got = DrawdownCalculator(levels).episodes()
+    expected = pd.DataFrame([
+        ("A", d(1), d(3), d(5), 88 / 110 - 1, 2, 2, 4, True),
+        ("A", d(6), d(7), d(8), 115 / 120 - 1, 1, 1, 2, True),
+        ("A", d(8), d(9), pd.NaT, 118 / 120 - 1, 1, np.nan, 1, False),
+        ("B", d(2), d(3), d(6), 40 / 50 - 1, 1, 3, 4, True),
+    ], columns=EPISODE_COLUMNS)
+    assert list(got.columns) == EPISODE_COLUMNS
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_no_episode_without_drawdown():
+    assert DrawdownCalculator(pd.DataFrame({"C": [1.0, 2.0, 3.0]}, index=DATES[:3])).episodes().empty
+
+
+def test_drawdowns_and_rolling_max_drawdown(levels):
+    calc = DrawdownCalculator(levels)
+    dd = calc.drawdowns()
+    assert dd.loc[d(3), "A"] == pytest.approx(-0.2)
+    assert dd["C"].eq(0).all()
+
+    window = 4
+    got = calc.rolling_max_drawdown(window)
+    for t in range(window - 1, len(DATES)):
+        w = levels.iloc[t - window + 1:t + 1]
+        expected = (w / w.cummax() - 1).min()
+        pd.testing.assert_series_equal(got.iloc[t], expected, check_names=False)
+    assert got.iloc[:window - 1].isna().all().all()
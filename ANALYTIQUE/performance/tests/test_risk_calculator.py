@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.risk_calculator import RiskCalculator, SlidingOrderStatistics, rolling_tail
+
+
+@pytest.mark.parametrize("ties", [False, True])
+def test_rolling_tail_matches_np_quantile(ties):
+    rng = np.random.default_rng(3)
+    values = rng.standard_t(4, 600) * 0.01
+    if ties:
+        values = np.round(values, 3)
+    window, levels = 120, (0.9, 0.95, 0.99)
+    tail = rolling_tail(values, window, levels)
+    for c in levels:
+        q, m = tail[c]
+        k = math.ceil((1 - c) * window - 1e-9)
+        assert np.isnan(q[:window - 1]).all() and np.isnan(m[:window - 1]).all()
+        for t in range(window - 1, len(values)):
+            w = values[t - window + 1:t + 1]
+            # k-th smallest of the window = inverted-CDF quantile at k / window
+            # (not at 1 - c: (1 - 0.95) * 120 is a hair above 6 in floats)
+            assert q[t] == np.quantile(w, k / window, method="inverted_cdf")
+            assert m[t] == pytest.approx(np.sort(w)[:k].mean(), abs=1e-15)
+
+
+def test_add_remove_in_any_order():
+    rng = np.random.default_rng(5)
+    values = rng.normal(size=200)
+    stats = SlidingOrderStatistics(values)
+    members = set()
+    for _ in range(2000):
+        i = int(rng.integers(len(values)))
+        (stats.remove if i in members else stats.add)(i)
+        members ^= {i}
+        if members:
+            current = np.sort(values[list(members)])
+            k = int(rng.integers(1, len(current) + 1))
+            value, total = stats.smallest(k)
+            assert value == current[k - 1]
+            assert total == pytest.approx(current[:k].sum(), abs=1e-12)
+
+
+def test_short_series_is_skipped_with_a_warning():
+    idx = pd.bdate_range("2024-01-01", periods=300)
+    returns = pd.DataFrame({"Long": np.random.default_rng(0).normal(0, .01, 300),
+                            "Short": np.r_[np.full(200, np.nan), np.zeros(100)]}, index=idx)
+    with pytest.warns(RuntimeWarning, match="Short"):
+        risk = RiskCalculator(returns, window=250).calculate()
+    assert set(risk.columns.get_level_values("Series")) == {"Long"}
+    # The pipeline's "Tail risk" sheet keeps the skipped fund as a NaN column
+    latest = RiskCalculator.latest(risk).T.reindex(columns=["Long", "Short"])
+    assert latest["Long"].notna().all() and latest["Short"].isna().all()
+
+
+def test_every_series_skipped_gives_an_empty_frame():
+    idx = pd.bdate_range("2024-01-01", periods=100)
+    with pytest.warns(RuntimeWarning):
+        risk = RiskCalculator(pd.DataFrame({"Short": np.zeros(100)}, index=idx), window=250).calculate()
+    assert risk.empty
+    assert risk.columns.names == ["Series", "Method", "Measure", "Confidence", "Horizon"]
@@ -1,6 +1,15 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
 from datetime import date
 
+from utils.stores.data_service import data_service
+from utils.stores.kpi_store import live_kpis, load_kpi_manifest, read_kpis
+from utils.transforms.compute_exposures import etf_market_values
+from utils.transforms.compute_holdings import FUNDS
+from utils.transforms.compute_returns import holdings_returns
+from utils.transforms.normalize_tickers import normalize_holdings_columns
+
 st.set_page_config(
     page_title="Fonds BNI-HEC",
     page_icon="📊",
@@ -66,27 +75,66 @@ with st.container():
         unsafe_allow_html=True
     )
 
-# ------------- QUICK KPI PLACEHOLDERS (Replace with real pipeline) -------------
-# In production, source these from your data layer (e.g., Snowflake, SQL, Parquet)
-mock_data = {
-    "AUM_M": 128.4,
-    "MTD_RET": 0.0042,
-    "YTD_RET": 0.0725,
-    "ANN_VOL": 0.091,
-    "SHARPE_12M": 1.42,
-    "DRAWDOWN": -0.038
-}
+# ------------- KPIs (written by the performance pipeline, else computed live) -------------
+@st.cache_data(show_spinner=False)
+def load_kpis(built_at):
+    # built_at keys the cache: a new pipeline run is read once, then served from memory
+    return read_kpis()
+
+@st.cache_data(show_spinner="Computing KPIs...")
+def compute_kpis_live(version):
+    """
+    KPIs of the ETF book (holdings x prices, cash excluded), returns net of trades;
+    version (data_service().version) keys the cache.
+    """
+    service = data_service()
+    tx, prices = service.transactions, service.etf_prices
+    if tx.empty or prices.empty:
+        return live_kpis(pd.DataFrame(), pd.DataFrame())
+    values, returns = {}, {}
+    for fund in FUNDS:
+        holdings = normalize_holdings_columns(service.holdings(fund, tx.index.min(), prices.index.max()))
+        if holdings.empty:
+            continue
+        fund_prices = prices.reindex(holdings.index.union(prices.index)).ffill().reindex(holdings.index)
+        values[fund] = etf_market_values(holdings, fund_prices).sum(axis=1)
+        returns[fund] = holdings_returns(holdings, fund_prices)
+    return live_kpis(pd.DataFrame(values), pd.DataFrame(returns).iloc[1:])
 
 def fmt_pct(x, decimals=2):
-    return f"{x*100:.{decimals}f}%"
+    return "n/a" if pd.isna(x) else f"{x*100:.{decimals}f}%"
+
+def fmt_num(x, decimals=2):
+    return "n/a" if pd.isna(x) else f"{x:.{decimals}f}"
+
+kpi_manifest = load_kpi_manifest()
+if kpi_manifest is None:
+    kpis, as_of = compute_kpis_live(data_service().version)
+    as_of = None if as_of is None else str(as_of.date())
+    st.info("No current KPI table from the performance pipeline (performance/main.py): KPIs computed "
+            "live from the ETF holdings and prices, cash excluded.")
+else:
+    kpis = load_kpis(kpi_manifest["built_at"])
+    as_of = kpi_manifest["as_of"]
+if kpis.empty:
+    kpi = pd.Series(np.nan, index=kpis.columns)
+else:
+    fund = st.radio("Fund", list(kpis.index), index=list(kpis.index).index("Global") if "Global" in kpis.index else 0,
+                    horizontal=True, label_visibility="collapsed")
+    kpi = kpis.loc[fund]
+
+def direction(x, up, down):
+    return (up, "up") if pd.isna(x) or x >= 0 else (down, "down")
 
+mtd_delta, mtd_class = direction(kpi["MTD return"], "▲ month to date", "▼ month to date")
+ytd_delta, ytd_class = direction(kpi["YTD return"], "▲ cumulative", "▼ cumulative")
 kpi_definitions = [
-    {"label": "Assets (MM)", "value": f'{mock_data["AUM_M"]:.1f}', "delta": "Updated", "delta_class": "up"},
-    {"label": "MTD Return", "value": fmt_pct(mock_data["MTD_RET"]), "delta": "▲ vs prior day" if mock_data["MTD_RET"] >= 0 else "▼ vs prior day", "delta_class": "up" if mock_data["MTD_RET"] >= 0 else "down"},
-    {"label": "YTD Return", "value": fmt_pct(mock_data["YTD_RET"]), "delta": "▲ cumulative" if mock_data["YTD_RET"] >= 0 else "▼ cumulative", "delta_class": "up" if mock_data["YTD_RET"] >= 0 else "down"},
-    {"label": "Annualized Vol", "value": fmt_pct(mock_data["ANN_VOL"]), "delta": "Rolling 1Y", "delta_class": "up"},
-    {"label": "Sharpe (12M)", "value": f'{mock_data["SHARPE_12M"]:.2f}', "delta": "Excess vs RF", "delta_class": "up"},
-    {"label": "Max Drawdown (12M)", "value": fmt_pct(mock_data["DRAWDOWN"]), "delta": "Peak to trough", "delta_class": "down"},
+    {"label": "Assets (MM)", "value": fmt_num(kpi["AUM"] / 1e6), "delta": f"As of {as_of}" if as_of else "Updated", "delta_class": "up"},
+    {"label": "MTD Return", "value": fmt_pct(kpi["MTD return"]), "delta": mtd_delta, "delta_class": mtd_class},
+    {"label": "YTD Return", "value": fmt_pct(kpi["YTD return"]), "delta": ytd_delta, "delta_class": ytd_class},
+    {"label": "Annualized Vol", "value": fmt_pct(kpi["Annualized vol"]), "delta": "Rolling 1Y", "delta_class": "up"},
+    {"label": "Sharpe (12M)", "value": fmt_num(kpi["Sharpe 12M"]), "delta": "Excess vs RF", "delta_class": "up"},
+    {"label": "Max Drawdown (12M)", "value": fmt_pct(kpi["Max drawdown 12M"]), "delta": "Peak to trough", "delta_class": "down"},
 ]
 
 kpi_cols = st.columns(len(kpi_definitions))
@@ -123,7 +171,6 @@ with st.expander("3. Extend modules"):
 st.markdown('<div class="section-title">Ad hoc file preview</div>', unsafe_allow_html=True)
 uploaded = st.file_uploader("Upload a CSV (e.g., positions or returns)", type=["csv"])
 if uploaded:
-    import pandas as pd
     df = pd.read_csv(uploaded)
     st.dataframe(df.head(50))
     st.success("Loaded preview. Integrate ETL pipeline for production use.")
@@ -132,7 +179,7 @@ if uploaded:
 st.markdown(
     f"""
     ---
-    Data as of {date.today().isoformat()} (illustrative). This interface is for internal analytics only
+    Data as of {as_of or date.today().isoformat()}{"" if as_of else " (illustrative)"}. This interface is for internal analytics only
     and not an offer or solicitation. Verify figures against official books & records before distribution.
     """.strip()
 )
@@ -7,3 +7,48 @@ TRANSACTION_FILE = DATA_DIR / "stock_final.xlsx"
 # Bloomberg tickers for the ETFs we track
 TICKERS = ['XBB.TO', 'XCB.TO', 'XEF.TO', 'XEM.TO', 'XHY.TO', 'XIG.TO', 'XIU.TO', 'XSB.TO', 'XUS.TO']
 
+# Derived datasets written by the offline jobs (safe to delete, they are rebuilt)
+CACHE_DIR = DATA_DIR / 'cache'
+EXPOSURE_CUBE_DIR = CACHE_DIR / 'exposure_cube'
+# BlackRock holdings change daily: a cube older than this is rebuilt live
+EXPOSURE_CUBE_MAX_AGE_HOURS = 24
+# Typed Parquet copy of the Transactions sheet, rebuilt when the workbook changes
+TRANSACTIONS_STORE_DIR = CACHE_DIR / 'transactions'
+# Cumulative positions per (fund, ticker) at change points, appended as transactions arrive
+HOLDINGS_LEDGER_DIR = CACHE_DIR / 'holdings_ledger'
+# Workbook "Copy splits" merged with optional Yahoo refreshes
+SPLITS_STORE_DIR = CACHE_DIR / 'splits'
+# KPI table written by the performance pipeline, shown on the landing page
+KPI_DIR = CACHE_DIR / 'kpis'
+# The pipeline's sources: without a current KPI table its KPICalculator runs live
+PERFORMANCE_SRC_DIR = Path(__file__).parent.parent / 'performance' / 'src'
+# Annual rate for the live Sharpe ratio (the pipeline's CONFIG["risk_free_rate"])
+RISK_FREE_RATE = 0.025
+# Results shared by every Streamlit process (utils.stores.shared_cache)
+SHARED_CACHE_DIR = CACHE_DIR / 'shared'
+# How long other workers wait on the one computing an entry before taking over
+SHARED_CACHE_LEASE_SECONDS = 600
+
+# Reference portfolio the committee compares us to: 60% XBB / 40% equities
+# (35% XIU, 35% XUS, 20% XEF, 10% XEM), held at constant weights
+BENCHMARK_WEIGHTS = {'XBB': 0.60, 'XIU': 0.14, 'XUS': 0.14, 'XEF': 0.08, 'XEM': 0.04}
+
+# Stress scenarios on look-through exposures. Keys are "<Dimension>=<Category>"
+# (Sector, Asset Class, Location, Currency: relative price shock, -0.20 = -20%)
+# or "Rates" (parallel yield shift in bp, applied through duration).
+STRESS_SCENARIOS = {
+    "Equity crash": {"Asset Class=Equity": -0.25},
+    "Rates +100bp": {"Rates": 100},
+    "Rates -100bp": {"Rates": -100},
+    "USD -10%": {"Currency=USD": -0.10},
+    "Tech selloff": {"Sector=Information Technology": -0.30},
+    "Credit stress": {"Sector=Corporate": -0.05, "Rates": 50},
+    "Emerging markets": {"Location=China": -0.25, "Location=Brazil": -0.25, "Currency=HKD": -0.05, "Currency=BRL": -0.15},
+    "2008 replay": {"Asset Class=Equity": -0.40, "Sector=Financials": -0.20, "Rates": -150, "Currency=USD": 0.15},
+}
+# Full grid: every combination of these shocks (11 x 9 x 11 = 1089 scenarios)
+STRESS_GRID = {
+    "Asset Class=Equity": [x / 100 for x in range(-50, 1, 5)],
+    "Rates": list(range(-200, 201, 50)),
+    "Currency=USD": [x / 100 for x in range(-25, 26, 5)],
+}
@@ -1,10 +1,21 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 from datetime import date
 
 import config 
-from utils.loaders.load_raw_prices import load_parquet_data
+from utils.stores.data_service import data_service
+from utils.stores.versions import version_token
+from utils.transforms.compute_prices import rebase_index, simple_returns
+from utils.transforms.downsample import downsample_frame
+
+# Width (px) of the plot area in the wide layout; LTTB keeps about one point per
+# pixel of it in every trace, denser lines are not visible
+CHART_PLOT_WIDTH = 700
+POINTS_PER_PIXEL = 1
+CHART_POINTS = CHART_PLOT_WIDTH * POINTS_PER_PIXEL
+# Above this many points in total, draw WebGL traces instead of SVG
+WEBGL_THRESHOLD = 5000
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -95,6 +106,58 @@ def build_sidebar(df: pd.DataFrame) -> dict:
         "data_option": data_option,
     }
 
+# --- Chart ---
+@st.cache_data(show_spinner=False)
+def chart_series(_data: pd.DataFrame, n_points: int, version: str) -> dict:
+    """Downsampled series of `_data`, keyed on its version token instead of its content."""
+    return downsample_frame(_data, n_points)
+
+def zoom_range(event, start: pd.Timestamp, end: pd.Timestamp):
+    """Date range of a box selection on the chart, clipped to [start, end] (None if no box)."""
+    boxes = event.selection.get("box", []) if event else []
+    if not boxes or "x" not in boxes[0]:
+        return None
+    x0, x1 = sorted(pd.to_datetime(boxes[0]["x"], format="mixed"))
+    x0, x1 = max(x0, start), min(x1, end)
+    return (x0, x1) if x0 < x1 else None
+
+def display_chart(filtered: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp, version: str) -> None:
+    """
+    Line chart of the filtered data, each trace downsampled (LTTB) to CHART_POINTS.
+    Selecting a date range on the chart zooms in: the range is re-downsampled from
+    the full data, so detail comes back while the payload stays bounded.
+    """
+    zoom = st.session_state.get("price_zoom")
+    if zoom and not (start <= zoom[0] < zoom[1] <= end):
+        zoom = st.session_state.price_zoom = None
+    visible = filtered.loc[zoom[0]:zoom[1]] if zoom else filtered
+
+    series = chart_series(visible, CHART_POINTS, version_token(version, zoom))
+    n_points = sum(len(s) for s in series.values())
+    webgl = n_points > WEBGL_THRESHOLD
+    trace = go.Scattergl if webgl else go.Scatter
+    fig = go.Figure([trace(x=s.index, y=s.to_numpy(), mode="lines", name=col) for col, s in series.items()])
+    fig.update_layout(title="Price Data Over Time", dragmode="select", selectdirection="h",
+                      xaxis_title=None, yaxis_title=None, legend_title_text=None)
+
+    cols = st.columns([4, 1])
+    with cols[0]:
+        st.caption(
+            f"{n_points:,} of {int(visible.count().sum()):,} points drawn (LTTB)"
+            f"{' — WebGL' if webgl else ''}. Select a date range on the chart to zoom in."
+        )
+    with cols[1]:
+        if zoom and st.button("Reset zoom", use_container_width=True):
+            st.session_state.price_zoom = None
+            st.rerun()
+
+    event = st.plotly_chart(fig, use_container_width=True, key="price_chart",
+                            on_select="rerun", selection_mode="box")
+    new_zoom = zoom_range(event, start, end)
+    if new_zoom and new_zoom != zoom:
+        st.session_state.price_zoom = new_zoom
+        st.rerun()
+
 # --- Main Content ---
 def display_main_content(df: pd.DataFrame, filters: dict) -> None:
     """
@@ -107,23 +170,20 @@ def display_main_content(df: pd.DataFrame, filters: dict) -> None:
         return
 
     start, end = pd.to_datetime(filters["start_date"]), pd.to_datetime(filters["end_date"])
-    filtered = df.loc[start:end]
+    tickers = filters["tickers"]
 
-    # Apply frequency resampling
-    if filters["freq"] != "None":
-        filtered = filtered.resample(filters["freq"]).last().dropna(how="all")
-
-    # Filter selected tickers
-    if filters["tickers"]:
-        filtered = filtered[filters["tickers"]]
-    else:
+    # Derived series are built once per price version and shared; each rerun only slices them
+    service = data_service()
+    series = service.price_series[filters["freq"]]
+    version = version_token(service.prices_version, filters["freq"], filters["data_option"], tuple(tickers), start, end)
+    if not tickers:
         filtered = pd.DataFrame()
-
-    # Compute returns if requested
-    if filters["data_option"] == "Returns":
-        filtered = filtered.pct_change().dropna(how="all") * 100
+    elif filters["data_option"] == "Returns":
+        filtered = simple_returns(series["Log returns"].loc[start:end, tickers]).dropna(how="all") * 100
     elif filters["data_option"] == "Returns (Cummulative)":
-        filtered = filtered.pct_change().dropna(how="all").cumsum() * 100
+        filtered = rebase_index(series["Index"][tickers], start, end).dropna(how="all") * 100
+    else:
+        filtered = series["Prices"].loc[start:end, tickers]
 
     st.caption(f"Date range: {start.date()} → {end.date()}")
 
@@ -137,14 +197,15 @@ def display_main_content(df: pd.DataFrame, filters: dict) -> None:
         if filtered.empty:
             st.info("No data to display. Adjust filters or select tickers.")
         else:
-            fig = px.line(filtered, title="Price Data Over Time")
-            st.plotly_chart(fig, use_container_width=True)
+            display_chart(filtered, filtered.index.min(), filtered.index.max(), version)
     
 # --- Main App Logic ---
 def main():
-    price_data = load_parquet_data(config.PRICES_PARQUET)
+    price_data = data_service().prices
 
-    if not price_data.empty:
+    if not config.PRICES_PARQUET.exists():
+        st.error(f"Data file not found: {config.PRICES_PARQUET}")
+    elif not price_data.empty:
         filters = build_sidebar(price_data)
         display_main_content(price_data, filters)
 
@@ -4,9 +4,16 @@ import pandas as pd
 from datetime import date
 
 import config
-from utils.loaders.load_raw_transactions import load_transactions
-from utils.loaders.api.load_raw_splits import load_splits
-from utils.transforms.compute_holdings import build_holdings as compute_holdings
+from utils.stores import exposure_cube
+from utils.stores.data_service import data_service, read_only
+from utils.stores.splits_store import load_local_splits, refresh_remote_splits
+from utils.stores.versions import version_token
+from utils.transforms.compute_active import category_weight_matrix
+from utils.transforms.compute_exposures import UNDERLYER_DIMENSIONS, etf_market_values, prepare_lines, weight_table
+from utils.transforms.compute_what_if import (
+    TRADE_COLUMNS, apply_deltas, clean_trades, exposure_at, trade_deltas, value_deltas,
+)
+from utils.transforms.normalize_tickers import normalize_holdings_columns
 
 
 # -------------------- Page Config --------------------
@@ -14,15 +21,46 @@ st.set_page_config(page_title="Transactions & Holdings", layout="wide")
 
 
 # -------------------- CACHED UTILITIES --------------------
-@st.cache_data(show_spinner=False)
-def get_trading_days(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+@st.cache_resource(show_spinner=False, max_entries=16)
+def what_if_base(fund: str, start: pd.Timestamp, end: pd.Timestamp, version: str) -> dict:
     """
-    Return business days between start and end (inclusive).
-    Cached to avoid recomputation across reruns.
+    Holdings, prices and market values of the window before any hypothetical trade,
+    shared read-only by every session (version: data_service().version).
     """
-    start = pd.to_datetime(start).normalize()
-    end = pd.to_datetime(end).normalize()
-    return pd.bdate_range(start=start, end=end)
+    service = data_service()
+    holdings = normalize_holdings_columns(service.holdings(fund, start, end))
+    if holdings.empty:
+        return {"holdings": holdings, "prices": holdings, "values": holdings}
+    prices = service.etf_prices
+    prices = prices.reindex(holdings.index.union(prices.index)).ffill().reindex(holdings.index)
+    values = etf_market_values(holdings, prices).fillna(0.0)
+    return {"holdings": read_only(holdings), "prices": read_only(prices), "values": read_only(values)}
+
+
+def look_through_version(etfs: tuple) -> tuple[bool, str]:
+    """(read from the exposure cube, version token of the weights) for look_through_matrices."""
+    manifest = exposure_cube.load_fresh_manifest()
+    if manifest is not None:
+        return True, version_token("cube", manifest["built_at"], exposure_cube.CUBE_VERSION)
+    return False, version_token(data_service().underlyers_version(etfs), exposure_cube.CUBE_VERSION)
+
+
+@st.cache_data(show_spinner="Loading look-through weights...")
+def look_through_matrices(etfs: tuple, from_cube: bool, version: str) -> dict:
+    """
+    {dimension: (ETF x category matrix, categories)} from the exposure cube, or live holdings.
+    `version` (look_through_version) keys the cache on the cube build or the holdings fetched.
+    """
+    if from_cube:
+        meta, weights = exposure_cube.read_security_master(), exposure_cube.read_weights()
+    else:
+        underlyers = data_service().underlyers(etfs)
+        if underlyers.empty:
+            return {}
+        meta, lines = prepare_lines(underlyers, list(etfs))
+        weights = weight_table(meta, lines)
+    index = pd.Index(etfs)
+    return {dim: category_weight_matrix(weights, meta, index, dim) for dim in UNDERLYER_DIMENSIONS}
 
 
 # -------------------- Sidebar / Filters --------------------
@@ -95,14 +133,26 @@ def render_transactions_tab(tx: pd.DataFrame, fund: str):
     st.dataframe(tx, use_container_width=True, height=500)
 
 
-def render_holdings_tab(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp, fund: str):
-    holdings = compute_holdings(df=df, start=start, end=end, fund=fund, trading_days_func=get_trading_days)
+def render_holdings_tab(start: pd.Timestamp, end: pd.Timestamp, fund: str):
+    holdings = data_service().holdings(fund, start, end)
     st.caption(f"Rows: {len(holdings)} — Columns: {len(holdings.columns)}")
     st.dataframe(holdings, use_container_width=True, height=500)
 
 
 def render_splits_tab(start: pd.Timestamp, end: pd.Timestamp):
-    splits = load_splits(config.TICKERS)
+    splits, manifest = load_local_splits(config.TRANSACTION_FILE)
+    cols = st.columns([4, 1])
+    with cols[0]:
+        remote = manifest.get("remote_as_of")
+        st.caption(f"Workbook splits{f' + Yahoo as of {remote}' if remote else ' (never refreshed from Yahoo)'}")
+    with cols[1]:
+        if st.button("Refresh from Yahoo", use_container_width=True):
+            with st.spinner("Fetching splits..."):
+                refreshed = refresh_remote_splits(config.TICKERS, config.TRANSACTION_FILE)
+            if refreshed.get("remote_as_of") == remote:
+                st.warning("Yahoo refresh failed: showing local splits.")
+            else:
+                st.rerun()
     if splits.empty:
         st.info("No split data available.")
         return
@@ -114,19 +164,81 @@ def render_splits_tab(start: pd.Timestamp, end: pd.Timestamp):
     st.dataframe(s_filtered, use_container_width=True)
 
 
+def render_what_if_tab(start: pd.Timestamp, end: pd.Timestamp, fund: str):
+    """
+    Hypothetical trades on top of the fund: each trade is a step change on the
+    holdings, market values and exposures from its date forward, added to the cached
+    base - nothing is rewritten or recomputed from the transactions.
+    """
+    base = what_if_base(fund, start, end, data_service().version)
+    holdings, prices, values = base["holdings"], base["prices"], base["values"]
+    if holdings.empty:
+        st.info("No holdings for selection.")
+        return
+    days = holdings.index
+    tickers = sorted(set(holdings.columns) | set(prices.columns))
+
+    st.caption("Add hypothetical trades (positive = buy, negative = sell). The Excel file is not modified.")
+    trades = st.data_editor(
+        pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"), "Ticker": pd.Series(dtype=object),
+                      "Quantity": pd.Series(dtype=float)})[TRADE_COLUMNS],
+        num_rows="dynamic", use_container_width=True, key=f"what_if_{fund}",
+        column_config={
+            "Date": st.column_config.DateColumn("Date", min_value=days[0].date(), max_value=days[-1].date(),
+                                                default=days[-1].date(), required=True),
+            "Ticker": st.column_config.SelectboxColumn("Ticker", options=tickers, required=True),
+            "Quantity": st.column_config.NumberColumn("Quantity", step=1.0, required=True),
+        },
+    )
+
+    i0, dq = trade_deltas(trades, days, holdings.columns)
+    dv = value_deltas(dq, prices)
+    holdings_wi = apply_deltas(holdings, i0, dq)
+    values_wi = apply_deltas(values, i0, dv)
+    unpriced = [t for t in dq.columns if t not in prices.columns and dq[t].abs().sum() > 0]
+    if unpriced:
+        st.warning(f"No prices for {', '.join(unpriced)}: their market value is counted as 0.")
+
+    picked = pd.Timestamp(st.select_slider("Date", options=list(days.date), value=days[-1].date(), key="what_if_date"))
+    mv_base, mv_wi = values.loc[picked].sum(), values_wi.loc[picked].sum()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Market Value (current)", f"{mv_base:,.0f}")
+    c2.metric("Market Value (what-if)", f"{mv_wi:,.0f}", delta=f"{mv_wi - mv_base:,.0f}")
+    c3.metric("Trades applied", int((clean_trades(trades)["Date"] <= days[-1]).sum()))
+
+    positions = pd.DataFrame({
+        "Quantity": holdings.loc[picked].reindex(holdings_wi.columns, fill_value=0.0),
+        "Quantity (what-if)": holdings_wi.loc[picked],
+        "Value": values.loc[picked].reindex(values_wi.columns, fill_value=0.0).reindex(holdings_wi.columns),
+        "Value (what-if)": values_wi.loc[picked].reindex(holdings_wi.columns),
+    }).rename_axis("Ticker")
+    st.dataframe(positions, use_container_width=True)
+    st.line_chart(pd.DataFrame({"Current": values.sum(axis=1), "What-if": values_wi.sum(axis=1)}))
+
+    held = tuple(sorted(set(values_wi.columns)))
+    matrices = look_through_matrices(held, *look_through_version(held))
+    if not matrices:
+        st.info("Look-through weights unavailable: exposures not shown.")
+        return
+    dim = st.selectbox("Look-through dimension", list(matrices), key="what_if_dim")
+    matrix, categories = matrices[dim]
+    etfs = pd.Index(held)
+    exp_base = exposure_at(values.loc[picked], matrix, etfs, categories)
+    exp_delta = exposure_at(dv.loc[picked] if picked in dv.index else pd.Series(dtype=float), matrix, etfs, categories)
+    exposure = pd.DataFrame({"Current": exp_base, "What-if": exp_base + exp_delta, "Change": exp_delta})
+    exposure = exposure[(exposure[["Current", "What-if"]].abs() > 0).any(axis=1)].sort_values("What-if", ascending=False)
+    st.dataframe(exposure, use_container_width=True)
+
+
 # -------------------- Main --------------------
 def main():
-    # Load transactions (loader handles config paths + parsing)
-    df = load_transactions(config.TRANSACTION_FILE)
+    # Typed transactions, shared across sessions (re-parsed only when the workbook changes)
+    df = data_service().transactions
 
     if df is None or df.empty:
         st.error("No transaction data found.")
         return
 
-    # ensure index is DatetimeIndex (loader should do this but be defensive)
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index)
-
     filters = sidebar_filters(df)
     if not filters:
         return
@@ -136,13 +248,15 @@ def main():
     st.title(f"{fund} Fund Overview")
     st.caption(f"Date range: {start.date()} → {end.date()}")
 
-    tabs = st.tabs(["Transactions", "Holdings", "Splits"])
+    tabs = st.tabs(["Transactions", "Holdings", "Splits", "What-if"])
     with tabs[0]:
         render_transactions_tab(tx, fund)
     with tabs[1]:
-        render_holdings_tab(df, start, end, fund)
+        render_holdings_tab(start, end, fund)
     with tabs[2]:
         render_splits_tab(start, end)
+    with tabs[3]:
+        render_what_if_tab(start, end, fund)
 
     # Minimal custom styling
     st.markdown("""
@@ -3,43 +3,39 @@ import pandas as pd
 import numpy as np
 import altair as alt
 from datetime import date
+from typing import Callable
 
 import config
-from utils.transforms.compute_holdings import build_holdings
-from utils.loaders.load_raw_transactions import load_transactions
-from utils.loaders.load_raw_prices import load_parquet_data
-from utils.loaders.api.blackrock_api import fetch_all_holdings
+from utils.stores.data_service import data_service
+from utils.loaders.api.blackrock_api import CAD_HEDGED, fetch_holdings_snapshots
+from utils.loaders.api.load_raw_fx import load_fx_history
+from utils.transforms import compute_exposures
+from utils.transforms.compute_exposures import (
+    UNDERLYER_DIMENSIONS, etf_market_values, prepare_lines, weight_table,
+)
+from utils.transforms.compute_active import active_exposures
+from utils.transforms.compute_cash_flows import cash_flow_ladder
+from utils.transforms.compute_fixed_income import fixed_income_series, is_fixed_income
+from utils.transforms.compute_fx import currency_exposures, fx_rate_gaps, fx_rate_matrix, snapshot_fx_rates, to_local_amounts
+from utils.transforms.compute_holdings_diff import diff_holdings_series
+from utils.transforms.compute_stress import (
+    factor_exposures, grid_shock_matrix, invalid_factors, position_pnl, run_scenarios, shock_matrix,
+)
+from utils.transforms.compute_overlap import etf_overlap_matrix, issuer_concentration
+from utils.transforms.security_master import attach_attributes
+from utils.transforms.normalize_tickers import normalize_holdings_columns
+from utils.stores import exposure_cube
+from utils.stores.exposure_query import FILTER_DIMENSIONS, date_rows, dimension_totals, query_exposures, top_exposures
+from utils.stores.shared_cache import cache_stats, shared_cache
+from utils.stores.versions import version_token
 
 # -------------------- Page Config --------------------
 st.set_page_config(page_title="Deep Exposure Decomposition", layout="wide")
 st.title("Deep Exposure Decomposition (ETF Look-Through)")
 
-# -------------------- Caching --------------------
-@st.cache_data(show_spinner=False)
-def get_trading_days(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
-    start = pd.to_datetime(start).normalize()
-    end = pd.to_datetime(end).normalize()
-    return pd.bdate_range(start=start, end=end)
-
-@st.cache_data(show_spinner=True)
-def load_prices() -> pd.DataFrame:
-    return load_parquet_data(config.PRICES_PARQUET)
-
-@st.cache_data(show_spinner=True)
-def load_underlyers_snapshot(tickers=None) -> pd.DataFrame:
-    return fetch_all_holdings(ticker_list=tickers)
-
-@st.cache_data(show_spinner=False)
-def compute_holdings_cached(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp, fund: str):
-    return build_holdings(df=df, start=start, end=end, fund=fund, trading_days_func=get_trading_days)
-
 # -------------------- Sidebar Filters --------------------
-def sidebar_filters(tx: pd.DataFrame) -> dict:
+def sidebar_filters(min_date: date, max_date: date) -> dict:
     st.sidebar.header("Filters")
-    if tx.empty:
-        return {}
-    min_date = tx.index.min().date()
-    max_date = tx.index.max().date()
 
     with st.sidebar.expander("Date range", expanded=True):
         mode = st.radio("Preset", ["All","YTD","1Y","3Y","5Y","Custom"], index=5, horizontal=True)
@@ -70,9 +66,6 @@ def sidebar_filters(tx: pd.DataFrame) -> dict:
     }
 
 # -------------------- Core Computation --------------------
-UNDERLYER_DIMENSIONS = ["Sector","Asset Class","Location","Currency"]
-
-FIXED_INCOME_FLAG = lambda df: (df["Duration"].notna()) | (df["Coupon (%)"].notna())
 
 COUNTRY_COORDS = {
     "United States": (37.0902,-95.7129),
@@ -92,76 +85,83 @@ COUNTRY_COORDS = {
     "Sweden": (60.1282,18.6435),
 }
 
-def _safe_weights(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    if df["Weight (%)"].isna().all():
-        df["Weight (%)"] = 0.0
-    return df
-
+# -------------------- Caching --------------------
+# Frames are `_` arguments (not hashed): `version` names their content, see version_token
 @st.cache_data(show_spinner=True)
+@shared_cache("underlyer_exposures", version=exposure_cube.CUBE_VERSION)
 def compute_underlyer_exposures(
-    holdings_qty: pd.DataFrame,
-    prices: pd.DataFrame,
-    underlyers: pd.DataFrame
+    _holdings_qty: pd.DataFrame,
+    _prices: pd.DataFrame,
+    _underlyers: pd.DataFrame,
+    version: str
 ):
-    if holdings_qty.empty:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    common = holdings_qty.columns.intersection(prices.columns)
-    if common.empty:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-    prices = prices.reindex(holdings_qty.index).ffill()
-    prices = prices[common]
-    holdings_qty = holdings_qty[common]
-
-    etf_values = holdings_qty * prices
-    under_df = _safe_weights(underlyers.copy())
-    under_df = under_df[under_df["ETF Ticker"].isin(common)]
-
-    # --- Recalculate Weight (%) from Market Value within each ETF ---
-    if "Market Value" in under_df.columns:
-        mv_totals = under_df.groupby("ETF Ticker")["Market Value"].transform("sum")
-        under_df["Weight (%)"] = np.where(mv_totals > 0, under_df["Market Value"] / mv_totals * 100.0, 0.0)
-
-    all_under_tickers = under_df["Ticker"].unique()
-    values_matrix = pd.DataFrame(0.0, index=etf_values.index, columns=all_under_tickers)
-
-    meta_cols = ["Ticker","Name","Sector","Asset Class","Location","Currency","Duration","Coupon (%)","Maturity","ETF Ticker"]
-    meta = (under_df.sort_values("Effective Date", ascending=False)
-                  .drop_duplicates(subset=["Ticker"])
-                  .set_index("Ticker")[meta_cols[1:]])
-
-    for etf, sub in under_df.groupby("ETF Ticker"):
-        if etf not in etf_values.columns:
-            continue
-        v_series = etf_values[etf]
-        # Aggregate recalculated weights by Ticker (summing if duplicates)
-        w = (sub.groupby("Ticker", as_index=False)["Weight (%)"]
-                .sum())
-        w["w"] = w["Weight (%)"].fillna(0) / 100.0
-        exposures = np.outer(v_series.values, w["w"].values)
-        df_exp = pd.DataFrame(exposures, index=v_series.index, columns=w["Ticker"].values)
-        values_matrix.loc[:, w["Ticker"].values] += df_exp
-
-    long = values_matrix.reset_index(names="Date").melt(id_vars="Date", var_name="Underlying", value_name="Exposure")
-    long = long[long["Exposure"] != 0]
-    long = long.join(meta, on="Underlying")
-
-    return values_matrix, meta, long
-
-def aggregate_dimension(long_df: pd.DataFrame, dimension: str) -> pd.DataFrame:
-    if long_df.empty:
-        return pd.DataFrame()
-    tmp = long_df.copy()
-    tmp[dimension] = tmp[dimension].fillna("Unknown")
-    agg = (tmp.groupby(["Date", dimension])["Exposure"].sum()
-              .reset_index()
-              .pivot(index="Date", columns=dimension, values="Exposure")
-              .fillna(0.0)
-              .sort_index())
-    return agg
+    return compute_exposures.compute_underlyer_exposures(_holdings_qty, _prices, _underlyers)
+
+@st.cache_data(show_spinner=False)
+@shared_cache("weight_table", version=exposure_cube.CUBE_VERSION)
+def compute_weight_table(_underlyers: pd.DataFrame, etfs: list, version: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(security master, sparse weights) of `etfs`."""
+    meta, lines = prepare_lines(_underlyers, etfs)
+    return meta, weight_table(meta, lines)
+
+@st.cache_data(show_spinner=True)
+def compute_issuer_concentration(_etf_values: pd.DataFrame, _weights: pd.DataFrame, _meta: pd.DataFrame,
+                                 top_n: int, version: str):
+    return issuer_concentration(_etf_values, _weights, _meta, top_n=top_n)
 
 # -------------------- Visualization Helpers --------------------
+@st.cache_data(show_spinner=True)
+@shared_cache("holdings_changes", version=exposure_cube.CUBE_VERSION)
+def compute_holdings_changes(dates: tuple, etfs: tuple, tol: float):
+    # Dates without a BlackRock file are skipped: the fetched ones come back to name the others
+    snapshots = fetch_holdings_snapshots(dates, list(etfs))
+    changes, turnover = diff_holdings_series(snapshots, tol)
+    return changes, turnover, pd.Series(sorted(snapshots), dtype="datetime64[ns]", name="Fetched")
+
+@st.cache_data(show_spinner=False)
+def compute_fixed_income(_etf_values: pd.DataFrame, _weights: pd.DataFrame, _meta: pd.DataFrame, version: str):
+    return fixed_income_series(_etf_values, _weights, _meta)
+
+@st.cache_data(show_spinner=False)
+def compute_cash_flow_ladder(_etf_values: pd.Series, _weights: pd.DataFrame, _meta: pd.DataFrame,
+                             as_of: pd.Timestamp, horizon_months: int, version: str):
+    return cash_flow_ladder(_etf_values, _weights, _meta, as_of, horizon_months)
+
+@st.cache_data(show_spinner=False)
+def load_fx(currencies: tuple) -> pd.DataFrame:
+    return load_fx_history(list(currencies))
+
+@st.cache_data(show_spinner=False)
+def compute_currency_views(_etf_values: pd.DataFrame, _weights: pd.DataFrame, _meta: pd.DataFrame,
+                           version: str) -> tuple[dict, dict]:
+    """
+    ({view: dates x currency}, FX gaps): economic and hedge-netted exposure (CAD), the net
+    in local units, and the currencies converted without daily rates (see fx_rate_gaps).
+    """
+    economic, net = currency_exposures(_etf_values, _weights, _meta, CAD_HEDGED)
+    if economic.empty:
+        return {}, {}
+    rates = snapshot_fx_rates(_meta)
+    history = load_fx(tuple(rates.index))
+    fx = fx_rate_matrix(_etf_values.index, rates, history)
+    return {
+        "Economic (CAD)": economic,
+        "Net of hedges (CAD)": net,
+        "Net of hedges (local units)": to_local_amounts(net, fx),
+    }, fx_rate_gaps(rates, history)
+
+@st.cache_data(show_spinner=False)
+def compute_active_exposures(_etf_values: pd.DataFrame, _weights: pd.DataFrame, _meta: pd.DataFrame, version: str) -> dict:
+    return active_exposures(_etf_values, _weights, _meta, config.BENCHMARK_WEIGHTS, UNDERLYER_DIMENSIONS)
+
+@st.cache_data(show_spinner=False)
+def compute_stress(_etf_values: pd.Series, _weights: pd.DataFrame, _meta: pd.DataFrame,
+                   as_of: pd.Timestamp, version: str):
+    positions, X = factor_exposures(_etf_values, _weights, _meta, UNDERLYER_DIMENSIONS, CAD_HEDGED)
+    S = shock_matrix(config.STRESS_SCENARIOS, X.columns)
+    G = grid_shock_matrix(config.STRESS_GRID, X.columns)
+    return positions, X, S, run_scenarios(X, S), run_scenarios(X, G)
+
 def single_date_series(df: pd.DataFrame, d: pd.Timestamp) -> pd.Series:
     if df.empty: return pd.Series(dtype=float)
     if d not in df.index:
@@ -184,30 +184,37 @@ def bar_chart(series: pd.Series, title: str):
     st.altair_chart(chart, use_container_width=True)
 
 # -------------------- Fixed Income Aggregations --------------------
-def fixed_income_summary(long_df: pd.DataFrame, date_point: pd.Timestamp):
-    if long_df.empty:
-        st.info("No data.")
-        return
-    fi = long_df[(long_df["Date"]==date_point) & FIXED_INCOME_FLAG(long_df)]
-    if fi.empty:
-        st.info("No fixed income exposure for selected date.")
+def fixed_income_summary(snap: pd.DataFrame, meta: pd.DataFrame, date_point: pd.Timestamp,
+                         fi_series: tuple):
+    metrics, buckets = fi_series
+    metrics = metrics[metrics["Notional"] > 0]
+    if metrics.empty:
+        st.info("No fixed income exposure.")
         return
-    total = fi["Exposure"].sum()
-    fi["Duration"] = pd.to_numeric(fi["Duration"], errors="coerce")
-    fi["Coupon (%)"] = pd.to_numeric(fi["Coupon (%)"], errors="coerce")
-    vw_duration = (fi["Exposure"] * fi["Duration"]).sum() / max(total,1) if fi["Duration"].notna().any() else np.nan
-    vw_coupon = (fi["Exposure"] * fi["Coupon (%)"]).sum() / max(total,1) if fi["Coupon (%)"].notna().any() else np.nan
-
-    col1,col2,col3 = st.columns(3)
-    col1.metric("Fixed Income Notional", f"{total:,.0f}")
-    col2.metric("Value-Weighted Duration", f"{vw_duration:,.2f}" if pd.notna(vw_duration) else "N/A")
-    col3.metric("Value-Weighted Coupon (%)", f"{vw_coupon:,.2f}" if pd.notna(vw_coupon) else "N/A")
-
-    fi["Dur Bucket"] = pd.cut(fi["Duration"],
-                              bins=[-0.01,1,3,5,7,10,20,100],
-                              labels=["0-1","1-3","3-5","5-7","7-10","10-20","20+"])
-    dur_dist = fi.groupby("Dur Bucket")["Exposure"].sum().sort_index()
-    bar_chart(dur_dist, "Duration Bucket Exposure")
+    day = metrics.loc[nearest_date(metrics.index, date_point)]
+
+    cols = st.columns(5)
+    cols[0].metric("Fixed Income Notional", f"{day['Notional']:,.0f}")
+    for col, name, label in zip(cols[1:], ["Duration","Coupon (%)","Current Yield (%)","Years to Maturity"],
+                                ["Value-Weighted Duration","Value-Weighted Coupon (%)","Current Yield (%)","Years to Maturity"]):
+        col.metric(label, f"{day[name]:,.2f}" if pd.notna(day[name]) else "N/A")
+
+    st.caption("Duration, coupon and yield drift (exposure-weighted)")
+    st.line_chart(metrics[["Duration","Coupon (%)","Current Yield (%)","Years to Maturity"]])
+
+    colA, colB = st.columns(2)
+    with colA:
+        bar_chart(buckets.loc[day.name], "Maturity Bucket Exposure (years)")
+    with colB:
+        fi = attach_attributes(snap, meta, ["Duration","Coupon (%)"])
+        fi = fi[is_fixed_income(fi)].copy()
+        fi["Dur Bucket"] = pd.cut(pd.to_numeric(fi["Duration"], errors="coerce"),
+                                  bins=[-0.01,1,3,5,7,10,20,100],
+                                  labels=["0-1","1-3","3-5","5-7","7-10","10-20","20+"])
+        bar_chart(fi.groupby("Dur Bucket", observed=False)["Exposure"].sum().sort_index(), "Duration Bucket Exposure")
+
+    st.caption("Maturity profile over time")
+    st.area_chart(buckets.loc[metrics.index])
 
 # -------------------- Location Map --------------------
 def location_map(series: pd.Series):
@@ -230,71 +237,364 @@ def location_map(series: pd.Series):
     st.map(df[["lat","lon","Exposure"]], size="Exposure")
 
 # -------------------- Underlyers Table --------------------
-def render_underlyers_table(long_df: pd.DataFrame, date_point: pd.Timestamp):
-    if long_df.empty:
-        st.info("No data.")
-        return
-    snap = long_df[long_df["Date"]==date_point].copy()
+UNDERLYER_PAGE_SIZES = [25, 50, 100, 250]
+TOP_UNDERLYERS = 10
+RAW_PAGE_SIZE = 1000
+
+def render_underlyers_table(snap: pd.DataFrame, meta: pd.DataFrame, date_point: pd.Timestamp):
     if snap.empty:
         st.info("No exposures on selected date.")
         return
-    snap = snap.groupby(["Underlying","Name","Sector","Asset Class","Location","Currency","Duration","Coupon (%)","ETF Ticker"]).agg({"Exposure":"sum"}).reset_index()
-    total = snap["Exposure"].sum()
-    snap["Pct"] = snap["Exposure"]/total
-    snap = snap.sort_values("Exposure", ascending=False)
-    st.caption(f"Underlyers on {date_point.date()} — Total {total:,.0f}")
-    st.dataframe(snap, use_container_width=True, height=600)
-
-# -------------------- Ticker Normalization Helpers --------------------
-def normalize_etf_ticker(raw: str) -> str:
-    if not isinstance(raw, str):
-        return raw
-    r = raw.strip().upper()
-    if ' ' in r:
-        r = r.split(' ')[0]
-    if '.' in r:
-        r = r.split('.')[0]
-    return r
-
-def normalize_holdings_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return df
-    norm_cols = [normalize_etf_ticker(c) for c in df.columns]
-    temp = df.copy()
-    temp.columns = norm_cols
-    return temp.groupby(level=0, axis=1).sum()
+    held = meta.iloc[np.unique(snap["Security"].cat.codes.to_numpy())]
+    cols = st.columns(len(FILTER_DIMENSIONS) + 1)
+    filters = {
+        dim: col.multiselect(dim, sorted(held[dim].astype(object).fillna("Unknown").unique()), key=f"underlyers_{dim}")
+        for dim, col in zip(FILTER_DIMENSIONS, cols)
+    }
+    page_size = cols[-1].selectbox("Rows per page", UNDERLYER_PAGE_SIZES, index=1, key="underlyers_page_size")
+
+    n = query_exposures(snap, meta, filters, limit=0)[1]
+    n_pages = max(1, -(-n // page_size))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="underlyers_page")
+    rows, n, total = query_exposures(snap, meta, filters, (page - 1) * page_size, page_size)
+    if rows.empty:
+        st.info("No underlyer matches the filters.")
+        return
+    first = (page - 1) * page_size + 1
+    st.caption(f"Underlyers on {date_point.date()} — Total {total:,.0f} — rows {first:,}–{first + len(rows) - 1:,} of {n:,}")
+    st.dataframe(rows, use_container_width=True, height=600, hide_index=True)
+
+# -------------------- Overlap & Issuer Concentration --------------------
+def render_overlap_tab(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                       picked_date: pd.Timestamp, version: str):
+    held = weights[weights["ETF Ticker"].isin(etf_values.columns[(etf_values != 0).any()])]
+    overlap = etf_overlap_matrix(held)
+    if overlap.empty:
+        st.info("No ETF weights available.")
+        return
+    data = overlap.rename_axis(index="ETF A", columns="ETF B").stack().rename("Overlap").reset_index()
+    heat = (alt.Chart(data)
+            .mark_rect()
+            .encode(x="ETF A:N", y="ETF B:N",
+                    color=alt.Color("Overlap:Q", scale=alt.Scale(domain=[0, 1])),
+                    tooltip=["ETF A","ETF B",alt.Tooltip("Overlap:Q", format=".1%")])
+            .properties(height=400, title="ETF Overlap (sum of min weights)"))
+    st.altair_chart(heat, use_container_width=True)
+
+    top_n = st.number_input("Top N issuers", min_value=1, max_value=50, value=10)
+    top, top_share = compute_issuer_concentration(etf_values, held, meta, int(top_n), version)
+    if top.empty:
+        st.info("No issuer exposure.")
+        return
+    st.caption(f"Share of look-through exposure in the top {int(top_n)} issuers")
+    st.line_chart(top_share)
+    day = top[top["Date"] == nearest_date(top_share.index, picked_date)]
+    st.dataframe(day.drop(columns="Date"), use_container_width=True, hide_index=True)
+
+def render_changes_tab(etfs: list, picked_date: pd.Timestamp):
+    c1, c2, c3 = st.columns(3)
+    to_date = c2.date_input("To", value=picked_date.date(), key="changes_to")
+    from_date = c1.date_input("From", value=(pd.Timestamp(to_date) - pd.offsets.BMonthEnd(1)).date(),
+                              key="changes_from")
+    step = c3.selectbox("Snapshots", ["From / To only", "Weekly", "Daily"], key="changes_step")
+    if not st.checkbox("Fetch BlackRock snapshots", key="changes_fetch"):
+        st.caption("Historical holdings are downloaded per date: tick the box to compare.")
+        return
+    if step == "From / To only":
+        dates = pd.DatetimeIndex([from_date, to_date])
+    else:
+        dates = pd.bdate_range(from_date, to_date, freq="W-FRI" if step == "Weekly" else "B")
+    changes, turnover, fetched = compute_holdings_changes(tuple(dates), tuple(etfs), 1e-4)
+    skipped = dates.difference(pd.DatetimeIndex(fetched))
+    if len(skipped):
+        st.warning(f"No BlackRock holdings published for {', '.join(str(d.date()) for d in skipped)}: skipped.")
+    if turnover.empty:
+        st.info("Not enough snapshots to compare.")
+        return
+    by_etf = turnover.groupby("ETF Ticker")[["Added","Dropped","Turnover"]].sum().sort_values("Turnover", ascending=False)
+    st.caption("Implied turnover: half the sum of absolute weight changes")
+    st.dataframe(by_etf.style.format({"Turnover": "{:.2%}"}), use_container_width=True)
+    if len(turnover["To"].unique()) > 1:
+        st.line_chart(turnover.pivot(index="To", columns="ETF Ticker", values="Turnover"))
+    st.dataframe(changes.drop(columns="SecurityID")
+                        .style.format({"Weight Before": "{:.3%}", "Weight After": "{:.3%}", "Delta": "{:+.3%}"}),
+                 use_container_width=True, hide_index=True, height=400)
+
+def render_cash_flow_tab(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                         picked_date: pd.Timestamp, version: str):
+    if etf_values.empty:
+        st.info("No ETF values.")
+        return
+    as_of = nearest_date(etf_values.index, picked_date)
+    c1, c2 = st.columns(2)
+    years = c1.selectbox("Horizon (years)", [5, 10, 30, 50], index=1, key="cash_flow_years")
+    split = c2.radio("Split by", ["Flow type", "ETF Ticker", "Currency"], horizontal=True, key="cash_flow_split")
+    ladder = compute_cash_flow_ladder(etf_values.loc[as_of], weights, meta, as_of, years * 12, version)
+    if ladder.empty:
+        st.info("No bond cash flows for the ETFs held.")
+        return
+    st.caption(f"Scheduled coupons and principal of the look-through bonds as of {as_of.date()} "
+               "(semi-annual coupons, amounts in each bond's currency)")
+    if split == "Flow type":
+        data = (ladder.groupby("Month")[["Coupon","Principal"]].sum()
+                      .rename_axis(columns="Split").stack().rename("Amount").reset_index())
+    else:
+        data = ladder.groupby(["Month", split])["Total"].sum().rename("Amount").reset_index().rename(columns={split: "Split"})
+    chart = (alt.Chart(data)
+             .mark_bar()
+             .encode(x=alt.X("Month:T"), y=alt.Y("Amount:Q", stack=True), color="Split:N",
+                     tooltip=[alt.Tooltip("Month:T", format="%Y-%m"), "Split", alt.Tooltip("Amount:Q", format=",.0f")])
+             .properties(height=400))
+    st.altair_chart(chart, use_container_width=True)
+    yearly = ladder.groupby(ladder["Month"].dt.year.rename("Year"))[["Coupon","Principal","Total"]].sum()
+    st.dataframe(yearly.style.format("{:,.0f}"), use_container_width=True)
 
-def normalize_price_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return df
-    norm_cols = [normalize_etf_ticker(c) for c in df.columns]
-    temp = df.copy()
-    temp.columns = norm_cols
-    combined = {}
-    for col, sub in temp.groupby(level=0, axis=1):
-        if sub.shape[1] == 1:
-            combined[col] = sub.iloc[:, 0]
-        else:
-            combined[col] = sub.bfill(axis=1).iloc[:, 0]
-    return pd.DataFrame(combined, index=temp.index).sort_index()
+def render_currency_tab(labels: pd.Series, currency_views: dict, fx_gaps: dict, picked_date: pd.Timestamp):
+    if not currency_views:
+        bar_chart(labels.sort_values(ascending=False), f"Currency Exposure ({picked_date.date()})")
+        return
+    view = st.radio("View", list(currency_views), horizontal=True, key="currency_view")
+    data = currency_views[view]
+    day = data.loc[nearest_date(data.index, picked_date)]
+    bar_chart(day.sort_values(ascending=False), f"Currency Exposure — {view} ({picked_date.date()})")
+    if "CAD" in view:
+        foreign = data.drop(columns="CAD", errors="ignore").sum(axis=1)
+        share = (foreign / data.sum(axis=1)).rename("Foreign currency share")
+        st.caption(f"Foreign currency share ({view})")
+        st.line_chart(share)
+    else:
+        if fx_gaps.get("no_history"):
+            st.warning(f"No daily FX rates for {', '.join(fx_gaps['no_history'])}: "
+                       "the holdings snapshot rate is used on every date.")
+        if fx_gaps.get("no_rate"):
+            st.warning(f"No FX rate for {', '.join(fx_gaps['no_rate'])}: their local amounts are not shown.")
+        st.caption("FX rates: daily history when available, holdings snapshot rates otherwise")
+        st.line_chart(data)
+
+def render_active_tab(active: dict, picked_date: pd.Timestamp):
+    if not active:
+        st.info("No benchmark exposure available.")
+        return
+    bench = " + ".join(f"{w:.0%} {etf}" for etf, w in config.BENCHMARK_WEIGHTS.items())
+    st.caption(f"Fund vs reference portfolio ({bench}), as a share of total value")
+    dim = st.radio("Dimension", list(active), horizontal=True, key="active_dimension")
+    views = active[dim]
+    day = nearest_date(views["Active"].index, picked_date)
+    table = pd.DataFrame({name: frame.loc[day] for name, frame in views.items()})
+    table = table.sort_values("Active", key=lambda s: s.abs(), ascending=False)
+
+    data = table["Active"].rename("Active").rename_axis("Category").reset_index()
+    chart = (alt.Chart(data)
+             .mark_bar()
+             .encode(x=alt.X("Active:Q", axis=alt.Axis(format="%")),
+                     y=alt.Y("Category:N", sort=list(table.index)),
+                     color=alt.condition("datum.Active > 0", alt.value("#2e7d32"), alt.value("#c62828")),
+                     tooltip=["Category", alt.Tooltip("Active:Q", format="+.2%")])
+             .properties(height=max(200, 22 * len(table)), title=f"Active {dim} ({day.date()})"))
+    st.altair_chart(chart, use_container_width=True)
+    st.dataframe(table.style.format("{:.2%}"), use_container_width=True)
+    st.caption("Active weights over time (largest on the selected date)")
+    st.line_chart(views["Active"][list(table.index[:8])])
+
+def render_stress_tab(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                      picked_date: pd.Timestamp, version: str):
+    if etf_values.empty:
+        st.info("No ETF values.")
+        return
+    as_of = nearest_date(etf_values.index, picked_date)
+    positions, X, S, pnl, grid = compute_stress(etf_values.loc[as_of], weights, meta, as_of, version)
+    # Checked on every run, not cached: a cache hit shows the same notes
+    for note in invalid_factors(config.STRESS_SCENARIOS):
+        st.warning(f"Stress scenarios: {note}")
+    total = positions["Value"].sum()
+    st.caption(f"Instantaneous P&L of the look-through positions on {as_of.date()} "
+               "(price shocks by category, rates through duration; scenarios in config)")
+
+    table = pd.DataFrame({"P&L": pnl, "% of NAV": pnl / total if total else np.nan})
+    colA, colB = st.columns([3, 2])
+    with colA:
+        bar_chart(pnl.sort_values(), "Scenario P&L")
+    with colB:
+        st.dataframe(table.style.format({"P&L": "{:,.0f}", "% of NAV": "{:.2%}"}), use_container_width=True)
+
+    scenario = st.selectbox("Largest contributors for", list(S.columns), key="stress_scenario")
+    contrib = position_pnl(positions, X, S[scenario])
+    contrib = contrib.loc[contrib["P&L"].abs().nlargest(15).index]
+    contrib = contrib.join(meta[["Ticker","Name","Sector"]], on="SecurityID").drop(columns="SecurityID")
+    st.dataframe(contrib.style.format({"Value": "{:,.0f}", "P&L": "{:,.0f}"}), use_container_width=True, hide_index=True)
+
+    keys = list(grid.index.names)
+    st.caption(f"Scenario grid: {len(grid):,} combinations of {', '.join(keys)}")
+    levels = sorted(grid.index.get_level_values(-1).unique())
+    last = st.select_slider(keys[-1], options=levels, value=min(levels, key=abs), key="stress_grid_level")
+    sub = grid.xs(last, level=-1).rename("P&L").reset_index()
+    heat = (alt.Chart(sub)
+            .mark_rect()
+            .encode(x=alt.X(field=keys[1], type="ordinal"), y=alt.Y(field=keys[0], type="ordinal", sort="descending"),
+                    color=alt.Color(field="P&L", type="quantitative", scale=alt.Scale(scheme="redyellowgreen", domainMid=0)),
+                    tooltip=[alt.Tooltip(field=k, type="ordinal") for k in keys[:2]]
+                            + [alt.Tooltip(field="P&L", type="quantitative", format=",.0f")])
+            .properties(height=350))
+    st.altair_chart(heat, use_container_width=True)
+
+# -------------------- Exposure Views --------------------
+def render_cache_stats():
+    with st.expander("Shared Cache (all workers)"):
+        st.caption("Results computed by one Streamlit process and reused by the others.")
+        st.dataframe(cache_stats().style.format({"Hit rate": "{:.0%}"}, na_rep="–"), use_container_width=True)
+
+def nearest_date(dates: pd.DatetimeIndex, d: pd.Timestamp) -> pd.Timestamp:
+    if d not in dates:
+        d = dates[dates.get_indexer([d], method="nearest")[0]]
+    return d
+
+def date_slider(dates: pd.DatetimeIndex) -> pd.Timestamp:
+    pick = st.slider("Select Date", min_value=dates.min().to_pydatetime(),
+                     max_value=dates.max().to_pydatetime(),
+                     value=dates.max().to_pydatetime())
+    return nearest_date(dates, pd.Timestamp(pick).normalize())
+
+def header_metrics(total_value: float, n_underlyers: int, n_etfs: int):
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Total Portfolio Value", f"{total_value:,.0f}")
+    m2.metric("Distinct Underlyers", f"{n_underlyers}")
+    m3.metric("ETFs Held", f"{n_etfs}")
+
+def render_exposure_tabs(picked_date: pd.Timestamp, dimension_at: Callable, underlyers_at: Callable,
+                         meta: pd.DataFrame, fi_series: Callable, currency_views: Callable, extra_tabs: dict):
+    """
+    dimension_at(dim, date): Series(category -> exposure) of one dimension on a date
+    underlyers_at(date): long rows (Date / Security / Exposure) of a date
+    fi_series(): (metrics, maturity buckets) for all dates, see fixed_income_series
+    currency_views(): ({view: dates x currency}, FX gaps), see compute_currency_views
+    extra_tabs: {tab label: (subheader, render(date))} shown after the Underlyers tab
+
+    The tabs track the open one (on_change="rerun"): only its content runs, so only
+    the slices it needs are computed for picked_date.
+    """
+    def overview(d):
+        colA, colB = st.columns(2)
+        with colA:
+            bar_chart(dimension_at("Sector", d).sort_values(ascending=False).head(15), f"Sector Exposure ({d.date()})")
+        with colB:
+            bar_chart(dimension_at("Asset Class", d).sort_values(ascending=False).head(15), f"Asset Class Exposure ({d.date()})")
+        top = top_exposures(underlyers_at(d), meta, TOP_UNDERLYERS)
+        if not top.empty:
+            st.caption(f"Top {TOP_UNDERLYERS} underlyers ({d.date()})")
+            st.dataframe(top, use_container_width=True, hide_index=True)
 
-# -------------------- Main --------------------
-def main():
-    tx = load_transactions(config.TRANSACTION_FILE)
+    def dimension(dim):
+        return lambda d: bar_chart(dimension_at(dim, d).sort_values(ascending=False), f"{dim} Exposure ({d.date()})")
+
+    def location(d):
+        loc_series = dimension_at("Location", d)
+        col1,col2 = st.columns([1,1])
+        with col1:
+            bar_chart(loc_series.sort_values(ascending=False), f"Location Exposure ({d.date()})")
+        with col2:
+            location_map(loc_series)
+
+    views = {
+        "Overview": ("Overview", overview),
+        "Sector": ("Sector", dimension("Sector")),
+        "Asset Class": ("Asset Class", dimension("Asset Class")),
+        "Location": ("Location", location),
+        "Currency": ("Currency", lambda d: render_currency_tab(dimension_at("Currency", d), *currency_views(), d)),
+        "Fixed Income": ("Fixed Income Metrics",
+                         lambda d: fixed_income_summary(underlyers_at(d), meta, d, fi_series())),
+        "Underlyers": ("Underlyers (Look-Through)", lambda d: render_underlyers_table(underlyers_at(d), meta, d)),
+        **extra_tabs,
+    }
+    tabs = st.tabs(list(views), key="exposure_tab", on_change="rerun")
+    for tab, (subheader, render) in zip(tabs, views.values()):
+        if tab.open:
+            with tab:
+                st.subheader(subheader)
+                render(picked_date)
+
+@st.fragment
+def exposure_view(dates: pd.DatetimeIndex, total_at: Callable, counts: tuple, dimension_at: Callable,
+                  underlyers_at: Callable, meta: pd.DataFrame, fi_series: Callable, currency_views: Callable,
+                  extra_tabs: dict):
+    """
+    Date slider, header metrics and tabs of one filter selection. Moving the slider or
+    switching tabs reruns this fragment only: the sidebar filters and everything they
+    invalidate (holdings, exposures, the cached range-level series behind the
+    callables) belong to the full run.
+    """
+    picked_date = date_slider(dates)
+    header_metrics(total_at(picked_date), *counts)
+    render_exposure_tabs(picked_date, dimension_at, underlyers_at, meta, fi_series, currency_views, extra_tabs)
+
+# -------------------- Main: materialized cube --------------------
+@st.cache_data(show_spinner=False)
+def load_cube_master(built_at: str) -> pd.DataFrame:
+    return exposure_cube.read_security_master()
+
+def main_from_cube(manifest: dict):
+    filters = sidebar_filters(pd.Timestamp(manifest["dates"]["min"]).date(),
+                              pd.Timestamp(manifest["dates"]["max"]).date())
+    start, end, fund = filters["start"], filters["end"], filters["fund"]
+    st.caption(f"Date range: {start.date()} → {end.date()} | Fund: {fund} | Cube built {manifest['built_at']}")
+
+    fund_info = manifest["funds"].get(fund)
+    totals = exposure_cube.read_totals(fund, start, end) if fund_info else pd.Series(dtype=float)
+    if totals.empty:
+        st.warning("No holdings for selection.")
+        return
+
+    meta = load_cube_master(manifest["built_at"])
+
+    def dimension_at(dim: str, d: pd.Timestamp) -> pd.Series:
+        return exposure_cube.read_dimension_slice(fund, d, [dim])[dim]
+
+    def underlyers_at(d: pd.Timestamp) -> pd.DataFrame:
+        return exposure_cube.read_underlyers_slice(fund, d, meta)
+
+    def render_raw(d):
+        with st.expander("Cube Manifest"):
+            st.json(manifest)
+        render_cache_stats()
+        with st.expander("Underlyer Metadata"):
+            st.dataframe(meta, use_container_width=True, height=300)
+        with st.expander("Long Form Exposures (selected date)"):
+            st.dataframe(attach_attributes(underlyers_at(d), meta, ["Ticker","Name"]), use_container_width=True, height=300)
+
+    etf_values = exposure_cube.read_etf_values(fund, start, end)
+    weights = exposure_cube.read_weights()
+    # ETF values, weights and master of this cube build and window, look-through logic version
+    version = version_token("cube", manifest["built_at"], exposure_cube.CUBE_VERSION, fund, start, end)
+
+    exposure_view(
+        totals.index, lambda d: totals.loc[d], (fund_info["n_underlyers"], len(fund_info["etfs"])),
+        dimension_at, underlyers_at, meta,
+        lambda: compute_fixed_income(etf_values, weights, meta, version),
+        lambda: compute_currency_views(etf_values, weights, meta, version), {
+        "Active": ("Active Exposure vs Benchmark",
+                   lambda d: render_active_tab(compute_active_exposures(etf_values, weights, meta, version), d)),
+        "Stress": ("Stress Scenarios", lambda d: render_stress_tab(etf_values, weights, meta, d, version)),
+        "Overlap": ("ETF Overlap & Issuer Concentration",
+                    lambda d: render_overlap_tab(etf_values, weights, meta, d, version)),
+        "Cash Flows": ("Bond Cash-Flow Ladder", lambda d: render_cash_flow_tab(etf_values, weights, meta, d, version)),
+        "Changes": ("Holdings Changes", lambda d: render_changes_tab(fund_info["etfs"], d)),
+        "Raw": ("Raw Data (Debug)", render_raw),
+    })
+
+# -------------------- Main: live computation --------------------
+def main_live():
+    # Prices, transactions, holdings ledger and look-through lines shared by every session
+    service = data_service()
+    tx = service.transactions
     if tx is None or tx.empty:
         st.error("No transactions available.")
         return
-    if not isinstance(tx.index, pd.DatetimeIndex):
-        tx.index = pd.to_datetime(tx.index)
 
-    filters = sidebar_filters(tx)
-    if not filters:
-        return
+    filters = sidebar_filters(tx.index.min().date(), tx.index.max().date())
     start, end, fund = filters["start"], filters["end"], filters["fund"]
 
     st.caption(f"Date range: {start.date()} → {end.date()} | Fund: {fund}")
 
-    holdings = compute_holdings_cached(tx, start, end, fund)
+    holdings = service.holdings(fund, start, end)
     if holdings.empty:
         st.warning("No holdings for selection.")
         return
@@ -302,93 +602,32 @@ def main():
     original_holdings_cols = holdings.columns.tolist()
     holdings = normalize_holdings_columns(holdings)
 
-    prices = load_prices()
-    prices = normalize_price_columns(prices)
+    prices = service.etf_prices
 
-    underlying = load_underlyers_snapshot(list(holdings.columns))
+    etfs_with_benchmark = sorted(set(holdings.columns) | set(config.BENCHMARK_WEIGHTS))
+    underlying = service.underlyers(etfs_with_benchmark)
     if underlying.empty:
         st.warning("No underlying holdings data fetched.")
         return
 
-    values_matrix, meta, long_df = compute_underlyer_exposures(holdings, prices, underlying)
+    # Holdings window, prices, look-through lines and logic: every cached result below derives from them
+    version = version_token(service.holdings_version(fund, start, end), service.prices_version,
+                            service.underlyers_version(etfs_with_benchmark), exposure_cube.CUBE_VERSION)
+    values_matrix, meta, long_df = compute_underlyer_exposures(holdings, prices, underlying, version)
     if long_df.empty:
         st.warning("Unable to compute look-through exposures (maybe missing prices).")
         return
 
-    dim_agg = {dim: aggregate_dimension(long_df, dim) for dim in UNDERLYER_DIMENSIONS}
+    total_series = values_matrix.sum(axis=1).to_frame("Total")
 
-    all_dates = holdings.index
-    pick = st.slider("Select Date", min_value=all_dates.min().to_pydatetime(),
-                     max_value=all_dates.max().to_pydatetime(),
-                     value=all_dates.max().to_pydatetime())
-    picked_date = pd.Timestamp(pick).normalize()
+    def dimension_at(dim: str, d: pd.Timestamp) -> pd.Series:
+        return dimension_totals(date_rows(long_df, d), meta, dim)
 
-    total_series = values_matrix.sum(axis=1)
-    total_value_latest = single_date_series(total_series.to_frame("Total"), picked_date).iloc[0]
+    def underlyers_at(d: pd.Timestamp) -> pd.DataFrame:
+        return date_rows(long_df, d)
 
-    m1, m2, m3 = st.columns(3)
-    m1.metric("Total Portfolio Value", f"{total_value_latest:,.0f}")
-    m2.metric("Distinct Underlyers", f"{values_matrix.shape[1]}")
-    m3.metric("ETFs Held", f"{holdings.shape[1]}")
-
-    tabs = st.tabs([
-        "Overview","Sector","Asset Class","Location","Currency","Fixed Income","Underlyers","Raw"
-    ])
-
-    # Overview Tab
-    with tabs[0]:
-        st.subheader("Overview")
-        sec_series = single_date_series(dim_agg["Sector"], picked_date) if not dim_agg["Sector"].empty else pd.Series(dtype=float)
-        ac_series = single_date_series(dim_agg["Asset Class"], picked_date) if not dim_agg["Asset Class"].empty else pd.Series(dtype=float)
-        colA, colB = st.columns(2)
-        with colA:
-            bar_chart(sec_series.sort_values(ascending=False).head(15), f"Sector Exposure ({picked_date.date()})")
-        with colB:
-            bar_chart(ac_series.sort_values(ascending=False).head(15), f"Asset Class Exposure ({picked_date.date()})")
-
-    # Sector
-    with tabs[1]:
-        st.subheader("Sector")
-        s = single_date_series(dim_agg["Sector"], picked_date)
-        bar_chart(s.sort_values(ascending=False), f"Sector Exposure ({picked_date.date()})")
-
-    # Asset Class
-    with tabs[2]:
-        st.subheader("Asset Class")
-        s = single_date_series(dim_agg["Asset Class"], picked_date)
-        bar_chart(s.sort_values(ascending=False), f"Asset Class Exposure ({picked_date.date()})")
-
-    # Location
-    with tabs[3]:
-        st.subheader("Location")
-        loc_df = dim_agg["Location"]
-        loc_series = single_date_series(loc_df, picked_date)
-        col1,col2 = st.columns([1,1])
-        with col1:
-            bar_chart(loc_series.sort_values(ascending=False), f"Location Exposure ({picked_date.date()})")
-        with col2:
-            location_map(loc_series)
-
-    # Currency
-    with tabs[4]:
-        st.subheader("Currency")
-        cur_df = dim_agg["Currency"]
-        s = single_date_series(cur_df, picked_date)
-        bar_chart(s.sort_values(ascending=False), f"Currency Exposure ({picked_date.date()})")
-
-    # Fixed Income
-    with tabs[5]:
-        st.subheader("Fixed Income Metrics")
-        fixed_income_summary(long_df, picked_date)
-
-    # Underlyers
-    with tabs[6]:
-        st.subheader("Underlyers (Look-Through)")
-        render_underlyers_table(long_df, picked_date)
-
-    # Raw
-    with tabs[7]:
-        st.subheader("Raw Data (Debug)")
+    def render_raw(d):
+        render_cache_stats()
         with st.expander("Original vs Normalized Holdings Columns"):
             st.write("Original:", original_holdings_cols)
             st.write("Normalized:", list(holdings.columns))
@@ -401,7 +640,41 @@ def main():
         with st.expander("Underlyer Metadata"):
             st.dataframe(meta, use_container_width=True, height=300)
         with st.expander("Long Form Exposures"):
-            st.dataframe(long_df.head(5000), use_container_width=True, height=300)
+            n_pages = max(1, -(-len(long_df) // RAW_PAGE_SIZE))
+            page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="raw_long_page")
+            rows = long_df.iloc[(page - 1) * RAW_PAGE_SIZE:page * RAW_PAGE_SIZE]
+            st.dataframe(attach_attributes(rows, meta, ["Ticker","Name"]), use_container_width=True, height=300)
+
+    # Weights cover the benchmark ETFs too; their master is a superset of `meta`
+    etf_values = etf_market_values(holdings, prices)
+    weights_meta, weights = compute_weight_table(
+        underlying, etfs_with_benchmark,
+        version_token(service.underlyers_version(etfs_with_benchmark), exposure_cube.CUBE_VERSION))
+
+    exposure_view(
+        holdings.index, lambda d: single_date_series(total_series, d).iloc[0], (values_matrix.shape[1], holdings.shape[1]),
+        dimension_at, underlyers_at, meta,
+        lambda: compute_fixed_income(etf_values, weights, weights_meta, version),
+        lambda: compute_currency_views(etf_values, weights, weights_meta, version), {
+        "Active": ("Active Exposure vs Benchmark",
+                   lambda d: render_active_tab(compute_active_exposures(etf_values, weights, weights_meta, version), d)),
+        "Stress": ("Stress Scenarios", lambda d: render_stress_tab(etf_values, weights, weights_meta, d, version)),
+        "Overlap": ("ETF Overlap & Issuer Concentration",
+                    lambda d: render_overlap_tab(etf_values, weights, weights_meta, d, version)),
+        "Cash Flows": ("Bond Cash-Flow Ladder", lambda d: render_cash_flow_tab(etf_values, weights, weights_meta, d, version)),
+        "Changes": ("Holdings Changes", lambda d: render_changes_tab(list(holdings.columns), d)),
+        "Raw": ("Raw Data (Debug)", render_raw),
+    })
+
+# -------------------- Main --------------------
+def main():
+    manifest = exposure_cube.load_fresh_manifest()
+    if manifest is not None:
+        main_from_cube(manifest)
+    else:
+        st.caption("Exposure cube missing or stale: computing live. "
+                   "Rebuild with `python -m utils.stores.exposure_cube`.")
+        main_live()
 
     st.markdown("""
     <style>
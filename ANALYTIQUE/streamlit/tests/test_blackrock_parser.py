@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils.loaders.api import blackrock_api
+from utils.loaders.api.blackrock_api import TARGET_COLUMNS, _load_csv_exact, _load_csv_pandas
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "blackrock").glob("*.csv"))
+HEADER = "Ticker,Name,Market Value,Weight (%),Price"
+
+
+def _holdings_csv(*rows: str) -> str:
+    return "\n".join(["iShares Test ETF", 'Fund Holdings as of,"Oct 17, 2025"', " ", HEADER, *rows])
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_fixture_matches_pandas_reader(path):
+    # Decoded like _download_text
+    text = path.read_text(encoding="utf-8-sig")
+    fast = _load_csv_exact(text)
+    assert fast.equals(_load_csv_pandas(text))
+    assert list(fast.columns) == TARGET_COLUMNS
+    assert fast["Ticker"].notna().all()
+
+
+def test_fixture_values():
+    df = _load_csv_exact((FIXTURES[0].parent / "XBB_holdings.csv").read_text(encoding="utf-8-sig"))
+    assert df.loc[0, "Market Value"] == 118_054_310.20
+    assert df.loc[0, "Coupon (%)"] == 1.25
+    # "-" stays as text in text columns; columns a bond file does not have are NaN
+    assert df.loc[df["Ticker"] == "CAD", "Maturity"].item() == "-"
+    assert df["Shares"].isna().all()
+
+
+def test_dash_cells_stay_on_fast_path(monkeypatch):
+    # BlackRock writes "-" for the Par Value, Duration and Coupon of futures and collateral
+    text = (FIXTURES[0].parent / "XSB_holdings.csv").read_text(encoding="utf-8-sig")
+    ref = _load_csv_pandas(text)
+
+    def _no_fallback(csv_text):
+        raise AssertionError("fell back to the pandas reader")
+
+    monkeypatch.setattr(blackrock_api, "_load_csv_pandas", _no_fallback)
+    fast = _load_csv_exact(text)
+    pd.testing.assert_frame_equal(fast, ref, check_exact=True)
+    futures = fast.loc[fast["Ticker"] == "CGBZ5"].iloc[0]
+    assert futures[["Par Value", "Duration", "Coupon (%)"]].isna().all()
+    assert futures["Notional Value"] == -2_212_400.0
+
+
+@pytest.mark.parametrize("cell", [
+    "inf", "-inf", "+inf", "Infinity", "-Infinity", "INF", " inf ", "1,000%",
+    "+3", "-0", "00012", "1.", ".5", "-.5e-3", "1E+05", "1.7976931348623157e309",
+    "1e-400", "123456789012345678", "1234567890123456789", "1_000", "0x10", "-", "n/a", "",
+    "--", "n.a.", "%", "1234.56789012345678", "-9798348375255889.39",
+])
+@pytest.mark.parametrize("other", ["7", "7.5", None])
+def test_numeric_cells_match_pandas_reader(cell, other):
+    other = cell if other is None else other
+    text = _holdings_csv(f'A,N,"{cell}","{other}",{other}', f'B,M,"3","{cell}",1')
+    fast, ref = _load_csv_exact(text), _load_csv_pandas(text)
+    pd.testing.assert_frame_equal(fast, ref, check_exact=True)
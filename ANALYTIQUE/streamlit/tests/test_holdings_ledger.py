@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.stores import holdings_ledger
+from utils.stores.holdings_ledger import read_holdings_ledger, update_holdings_ledger
+from utils.transforms.compute_holdings import build_holdings, holdings_window, ledger_matrix
+
+
+def trading_days(start, end):
+    return pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+
+
+def transactions(rows) -> pd.DataFrame:
+    """Transactions in the store layout from (date, type, ticker, quantity) rows."""
+    df = pd.DataFrame(rows, columns=["Date", "Type", "Ticker", "Quantity"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df.set_index("Date")
+
+
+@pytest.fixture
+def tx():
+    rng = np.random.default_rng(7)
+    days = pd.bdate_range("2024-01-02", periods=120)
+    picks = np.sort(rng.choice(len(days), 80))
+    return transactions([
+        (days[i], ("Strategic", "Tactic")[j % 2], ("XIU", "XBB", "XUS", "XEF")[j % 4], float(rng.integers(-50, 100)))
+        for j, i in enumerate(picks)
+    ])
+
+
+def window(changes, fund, start, end):
+    return holdings_window(*ledger_matrix(changes, fund), pd.Timestamp(start), pd.Timestamp(end), trading_days)
+
+
+def test_build_holdings_is_cumulative_position(tx):
+    got = build_holdings(tx, pd.Timestamp("2024-02-01"), pd.Timestamp("2024-05-31"), "Tactic", trading_days)
+    work = tx[tx["Type"] == "Tactic"]
+    days = trading_days(work.index.min(), "2024-05-31")
+    expected = (work.groupby([work.index, "Ticker"])["Quantity"].sum().unstack(fill_value=0.0)
+                .reindex(days, fill_value=0.0).cumsum().loc["2024-02-01":"2024-05-31"])
+    pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False)
+
+
+def test_weekend_trade_counts_from_next_trading_day():
+    tx = transactions([
+        ("2024-03-01", "Strategic", "XIU", 100.0),  # Friday
+        ("2024-03-02", "Strategic", "XIU", 50.0),   # Saturday
+        ("2024-03-10", "Strategic", "XBB", 10.0),   # Sunday
+    ])
+    h = build_holdings(tx, pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-12"), "Global", trading_days)
+    assert h.index.dayofweek.max() < 5
+    assert h.loc["2024-03-01", "XIU"] == 100.0
+    assert h.loc["2024-03-04", "XIU"] == 150.0
+    assert h.loc["2024-03-08", "XBB"] == 0.0
+    assert h.loc["2024-03-11", "XBB"] == 10.0
+
+
+def test_append_matches_rebuild(tx, tmp_path):
+    n = 60
+    update_holdings_ledger(tx.iloc[:n], "v1", tmp_path / "appended")
+    appended = update_holdings_ledger(tx, "v2", tmp_path / "appended")
+    rebuilt = update_holdings_ledger(tx, "v2", tmp_path / "rebuilt")
+    assert len(appended["parts"]) == 2 and len(rebuilt["parts"]) == 1
+    assert appended["last"] == rebuilt["last"]
+    a, r = read_holdings_ledger(tmp_path / "appended"), read_holdings_ledger(tmp_path / "rebuilt")
+    for fund in ["Global", "Strategic", "Tactic"]:
+        pd.testing.assert_frame_equal(window(a, fund, "2024-01-01", "2024-07-01"),
+                                      window(r, fund, "2024-01-01", "2024-07-01"))
+
+
+def test_append_on_the_last_ledger_date(tmp_path):
+    tx = transactions([("2024-03-01", "Tactic", "XIU", 10.0), ("2024-03-04", "Tactic", "XIU", 5.0),
+                       ("2024-03-04", "Tactic", "XIU", 7.0)])
+    update_holdings_ledger(tx.iloc[:2], "v1", tmp_path)
+    manifest = update_holdings_ledger(tx, "v2", tmp_path)
+    assert len(manifest["parts"]) == 2
+    assert window(read_holdings_ledger(tmp_path), "Tactic", "2024-03-04", "2024-03-04").loc["2024-03-04", "XIU"] == 22.0
+
+
+def test_back_dated_or_edited_rows_rebuild(tx, tmp_path):
+    update_holdings_ledger(tx.iloc[:60], "v1", tmp_path)
+    back_dated = pd.concat([tx, transactions([("2024-01-03", "Tactic", "XIU", 1.0)])])
+    manifest = update_holdings_ledger(back_dated, "v2", tmp_path)
+    assert [p.name for p in tmp_path.glob("part-*.parquet")] == manifest["parts"]
+
+    edited = tx.copy()
+    edited.iloc[0, edited.columns.get_loc("Quantity")] += 1
+    manifest = update_holdings_ledger(edited, "v3", tmp_path)
+    # Written next to the replaced ledger (never over a part its readers may open), then swapped
+    assert manifest["parts"] == ["part-00002.parquet"]
+    assert [p.name for p in tmp_path.glob("part-*.parquet")] == manifest["parts"]
+    assert manifest["last"] == update_holdings_ledger(edited, "v3", tmp_path / "fresh")["last"]
+
+
+def test_failed_update_keeps_the_previous_ledger(tx, tmp_path, monkeypatch):
+    update_holdings_ledger(tx.iloc[:60], "v1", tmp_path)
+    before = read_holdings_ledger(tmp_path)
+    monkeypatch.setattr(holdings_ledger, "_last_positions", lambda *a: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        update_holdings_ledger(tx, "v2", tmp_path)
+    pd.testing.assert_frame_equal(read_holdings_ledger(tmp_path), before)
+    monkeypatch.undo()
+    manifest = update_holdings_ledger(tx, "v2", tmp_path)
+    assert [p.name for p in sorted(tmp_path.glob("part-*.parquet"))] == manifest["parts"]
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.stores.kpi_store import MANIFEST, kpi_calculator, live_kpis, load_kpi_manifest, read_kpis
+from utils.transforms.compute_returns import holdings_returns
+
+
+def fund_series():
+    rng = np.random.default_rng(3)
+    days = pd.bdate_range("2024-01-02", periods=300)
+    returns = pd.DataFrame(rng.normal(0.0003, 0.006, (len(days), 2)), index=days, columns=["Global", "Tactic"])
+    return 1e6 * (1 + returns).cumprod(), returns
+
+
+def test_store_written_by_the_pipeline_is_read_back(tmp_path):
+    values, returns = fund_series()
+    kpis, as_of = live_kpis(values, returns)
+    calculator = kpi_calculator()
+    manifest = calculator.KPICalculator(0.025).write(kpis, as_of, tmp_path)
+    assert load_kpi_manifest(tmp_path) == manifest
+    pd.testing.assert_frame_equal(read_kpis(tmp_path), kpis)
+    assert list(read_kpis(tmp_path).columns) == manifest["columns"] == calculator.KPI_COLUMNS
+
+
+def test_store_of_another_kpi_version_is_missing(tmp_path):
+    values, returns = fund_series()
+    kpi_calculator().KPICalculator(0.025).write(*live_kpis(values, returns), tmp_path)
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+    (tmp_path / MANIFEST).write_text(json.dumps({**manifest, "kpi_version": manifest["kpi_version"] + 1}))
+    assert load_kpi_manifest(tmp_path) is None
+    assert load_kpi_manifest(tmp_path / "never_written") is None
+
+
+def test_holdings_returns_count_trades_as_flows():
+    days = pd.bdate_range("2024-03-01", periods=4)
+    holdings = pd.DataFrame({"XIU": [10.0, 30.0, 30.0, 0.0], "NBC5703": [5.0, 5.0, 5.0, 5.0]}, index=days)
+    prices = pd.DataFrame({"XIU": [10.0, 11.0, 9.9, 9.9]}, index=days)
+    returns = holdings_returns(holdings, prices)
+    # The 20 units bought on day 2 are not a gain; the unpriced line is left out
+    assert np.isnan(returns.iloc[0])
+    np.testing.assert_allclose(returns.iloc[1:3], [0.10, -0.10])
+    assert returns.iloc[3] == 0.0
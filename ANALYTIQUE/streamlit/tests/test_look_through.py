@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from utils.transforms.look_through import expand_fund_lines
+
+
+def holdings(*rows) -> pd.DataFrame:
+    """Holding lines from (fund, ticker, weight %) rows."""
+    return pd.DataFrame(rows, columns=["ETF Ticker", "Ticker", "Weight (%)"]).assign(Name=lambda d: d["Ticker"])
+
+
+def weights(out: pd.DataFrame, root: str) -> dict:
+    sub = out[out["ETF Ticker"] == root]
+    return sub.groupby("Ticker")["Weight (%)"].sum().round(10).to_dict()
+
+
+def test_two_level_nested_fund():
+    lines = holdings(("XGRO", "XUS", 40), ("XGRO", "CASH", 60),
+                     ("XUS", "XIU", 50), ("XUS", "AAPL", 50),
+                     ("XIU", "RY", 100))
+    out = expand_fund_lines(lines, ["XGRO"])
+    assert weights(out, "XGRO") == {"CASH": 60.0, "AAPL": 20.0, "RY": 20.0}
+    assert out.set_index("Ticker")["Via"].fillna("").to_dict() == {"CASH": "", "AAPL": "XUS", "RY": "XUS > XIU"}
+
+
+def test_cycle_is_cut_and_warned():
+    lines = holdings(("A", "B", 50), ("A", "X", 50), ("B", "A", 50), ("B", "Y", 50))
+    with pytest.warns(RuntimeWarning, match="fund cycle"):
+        out = expand_fund_lines(lines, ["A"])
+    # A > B > A is cut: B's line into A stays opaque
+    assert weights(out, "A") == {"X": 50.0, "Y": 25.0, "A": 25.0}
+
+
+@pytest.mark.parametrize("roots", [["A", "B"], ["B", "A"]])
+def test_cycle_expansion_does_not_depend_on_root_order(roots):
+    lines = holdings(("A", "B", 50), ("A", "X", 50), ("B", "A", 50), ("B", "Y", 50), ("C", "A", 100))
+    with pytest.warns(RuntimeWarning):
+        out = expand_fund_lines(lines, roots + ["C"])
+    assert weights(out, "A") == {"X": 50.0, "Y": 25.0, "A": 25.0}
+    assert weights(out, "B") == {"Y": 50.0, "X": 25.0, "B": 25.0}
+    # Reached through C, the cut still falls on B's line back into A
+    assert weights(out, "C") == {"X": 50.0, "Y": 25.0, "A": 25.0}
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.stores import shared_cache as sc
+
+
+def frame(n: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({"a": np.arange(n, dtype=float), "b": list("xyz"[:n])})
+
+
+def run_threads(target, n: int):
+    errors = []
+
+    def guarded():
+        try:
+            target()
+        except Exception as e:  # noqa: BLE001 - surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=guarded) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_miss_then_hit(tmp_path):
+    calls = []
+
+    @sc.shared_cache("f", cache_dir=tmp_path)
+    def f(n):
+        calls.append(n)
+        return frame(n), frame(n).iloc[:, 0]
+
+    first, again = f(3), f(3)
+    assert calls == [3]
+    pd.testing.assert_frame_equal(again[0], first[0])
+    pd.testing.assert_series_equal(again[1], first[1])
+    f(2)
+    assert calls == [3, 2]
+    stats = sc.cache_stats(tmp_path).loc["f"]
+    assert (stats["Hits"], stats["Misses"], stats["Entries"]) == (1, 2, 2)
+
+
+def test_version_and_private_arguments_in_key(tmp_path):
+    calls = []
+
+    def make(version):
+        @sc.shared_cache("g", version=version, cache_dir=tmp_path)
+        def g(_data, token):
+            calls.append(token)
+            return _data
+        return g
+
+    make(1)(frame(), "t")
+    make(1)(frame(2), "t")  # _data is not hashed: same entry
+    assert calls == ["t"]
+    make(2)(frame(), "t")
+    assert calls == ["t", "t"]
+
+
+def test_two_threads_compute_once(tmp_path):
+    calls = []
+
+    @sc.shared_cache("slow", cache_dir=tmp_path)
+    def slow():
+        calls.append(1)
+        time.sleep(0.5)
+        return frame()
+
+    run_threads(slow, 2)
+    assert len(calls) == 1
+    stats = sc.cache_stats(tmp_path).loc["slow"]
+    assert (stats["Hits"], stats["Misses"], stats["Waits"]) == (1, 1, 1)
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    @sc.shared_cache("h", cache_dir=tmp_path)
+    def h():
+        return frame()
+
+    key = sc.cache_key(h.__wrapped__, (), {})
+    (tmp_path / "h").mkdir()
+    lock = tmp_path / "h" / f"{key}.lock"
+    lock.write_text(json.dumps({"pid": -1, "expires": time.time() - 1}))
+    t0 = time.perf_counter()
+    pd.testing.assert_frame_equal(h(), frame())
+    assert time.perf_counter() - t0 < 5 * sc.POLL_SECONDS
+    assert not lock.exists()
+
+
+def test_live_lease_is_waited_for(tmp_path):
+    @sc.shared_cache("w", cache_dir=tmp_path)
+    def w():
+        return frame()
+
+    key = sc.cache_key(w.__wrapped__, (), {})
+    (tmp_path / "w").mkdir()
+    (tmp_path / "w" / f"{key}.lock").write_text(json.dumps({"pid": -1, "expires": time.time() + 0.6}))
+    t0 = time.perf_counter()
+    w()
+    assert time.perf_counter() - t0 >= 0.5
+
+
+@pytest.mark.parametrize("n_threads", [8])
+def test_concurrent_hits_and_counters(tmp_path, n_threads):
+    @sc.shared_cache("hot", cache_dir=tmp_path)
+    def hot(i):
+        return frame()
+
+    hot(0)
+    run_threads(lambda: [hot(i % 2) for i in range(40)], n_threads)
+    stats = sc.cache_stats(tmp_path).loc["hot"]
+    assert stats["Hits"] + stats["Misses"] == 1 + 40 * n_threads
+    assert not list((tmp_path / sc.STATS_DIR).glob(".*.tmp"))
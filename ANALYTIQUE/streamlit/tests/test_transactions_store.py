@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+import pytest
+
+from utils.stores import transactions_store
+from utils.stores.transactions_store import (
+    MANIFEST, STORE_VERSION, TRANSACTIONS_FILE, ensure_transactions_store, read_transactions_store,
+)
+from utils.loaders.load_raw_transactions import load_transactions
+
+
+def write_workbook(path, rows):
+    df = pd.DataFrame(rows, columns=["Date", "Type", "Ticker", "Price", "Quantity"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    df.to_excel(path, sheet_name="Transactions", index=False)
+
+
+ROWS = [("2024-01-02", "Strategic", "XIU", 30.5, 100), ("2024-01-03", "Tactic", "XBB", 28.0, 50)]
+
+
+def test_store_matches_workbook_and_rebuilds_on_change(tmp_path):
+    workbook, store = tmp_path / "stock_final.xlsx", tmp_path / "store"
+    write_workbook(workbook, ROWS)
+    digest = ensure_transactions_store(workbook, store)
+    tx = read_transactions_store(store)
+    expected = load_transactions(workbook)
+    assert list(tx.index) == list(expected.index)
+    assert tx["Ticker"].dtype == "category" and tx["Quantity"].dtype == "float64"
+    assert tx["Value"].tolist() == expected["Value"].astype(float).tolist()
+
+    written = (store / TRANSACTIONS_FILE).stat().st_mtime_ns
+    assert ensure_transactions_store(workbook, store) == digest
+    assert (store / TRANSACTIONS_FILE).stat().st_mtime_ns == written
+
+    write_workbook(workbook, ROWS + [("2024-01-04", "Tactic", "XUS", 50.0, -10)])
+    assert ensure_transactions_store(workbook, store) != digest
+    assert read_transactions_store(store)["Ticker"].tolist()[-1] == "XUS"
+
+
+def test_store_of_another_version_is_rebuilt(tmp_path):
+    workbook, store = tmp_path / "stock_final.xlsx", tmp_path / "store"
+    write_workbook(workbook, ROWS)
+    ensure_transactions_store(workbook, store)
+    manifest = json.loads((store / MANIFEST).read_text())
+    (store / MANIFEST).write_text(json.dumps({**manifest, "store_version": STORE_VERSION - 1, "rows": -1}))
+    ensure_transactions_store(workbook, store)
+    assert json.loads((store / MANIFEST).read_text())["rows"] == len(ROWS)
+
+
+def test_failed_rebuild_keeps_the_previous_store(tmp_path, monkeypatch):
+    workbook, store = tmp_path / "stock_final.xlsx", tmp_path / "store"
+    write_workbook(workbook, ROWS)
+    digest = ensure_transactions_store(workbook, store)
+
+    def _crash(table, path):
+        path.write_bytes(b"PAR1 truncated")
+        raise OSError("disk full")
+
+    write_workbook(workbook, ROWS[:1])
+    monkeypatch.setattr(transactions_store.pq, "write_table", _crash)
+    with pytest.raises(OSError):
+        ensure_transactions_store(workbook, store)
+    assert json.loads((store / MANIFEST).read_text())["workbook"] == digest
+    assert len(read_transactions_store(store)) == len(ROWS)
+    assert sorted(p.name for p in store.iterdir()) == [MANIFEST, TRANSACTIONS_FILE]
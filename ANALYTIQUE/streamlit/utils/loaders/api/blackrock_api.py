@@ -1,9 +1,18 @@
+import csv
+import sys
 import threading
+import time
+import warnings
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 from io import StringIO
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Iterable
 from urllib.parse import urlencode
 
@@ -36,6 +45,15 @@ ETF_NAME_MAP: Dict[str, str] = {
     for tk, frag in tickers.items()
 }
 
+# Funds hedging their foreign currency exposure back to CAD
+CAD_HEDGED = {tk for tk, frag in tickers.items() if "cadhedged" in frag}
+
+# Underlyer tickers (after normalize_etf_ticker) looked through as a fund of `tickers`.
+# Lines pointing to one of `tickers` (directly or through this map) are looked
+# through recursively, e.g. {"XSP": "XUS"} for the CAD-hedged S&P 500 class, whose
+# underlyers are those of XUS.
+FUND_ALIASES: Dict[str, str] = {}
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) "
@@ -74,10 +92,24 @@ NUMERIC_COLUMNS = {
     "Price",
     "Duration",
     "FX Rate",
-    "Maturity",
     "Coupon (%)",
 }
 
+# pandas.read_csv default NA strings, so the Arrow reader nulls exactly the same cells
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+# Plain numbers the Arrow cast reads like pandas: integers only when they surely fit
+# in int64 and carry no "+" (pandas keeps those int64, a float cast would not)
+_NUMBER_PATTERN = r"^(-?\d{1,18}|[+-]?(\d+\.\d*|\.\d+)([eE][+-]?\d+)?|[+-]?\d+[eE][+-]?\d+)$"
+_INTEGER_PATTERN = r"^-?\d{1,18}$"
+# Other cells pandas may still read as a number ("+3", "inf", a 19-digit integer...);
+# cells matching neither pattern ("-", "--", "n.a.") are coerced to NaN like pandas does
+_NUMBER_LIKE_PATTERN = r"\pN|(?i:inf)"
+
 # ---------------------------------------------------------------------
 # Optimized session handling
 # ---------------------------------------------------------------------
@@ -165,7 +197,11 @@ def _parse_numeric_series(series: pd.Series) -> pd.Series:
     return pd.to_numeric(s, errors="coerce")
 
 
-def _load_csv_exact(csv_text: str) -> pd.DataFrame:
+def _load_csv_pandas(csv_text: str) -> pd.DataFrame:
+    """
+    Reference parser (pandas C engine). Used when the fast path cannot apply,
+    e.g. no "Ticker," header line or a malformed body.
+    """
     # Find header line
     lines = csv_text.splitlines()
     header_idx = None
@@ -196,15 +232,130 @@ def _load_csv_exact(csv_text: str) -> pd.DataFrame:
     for c in NUMERIC_COLUMNS:
         df[c] = _parse_numeric_series(df[c])
 
+    return _scale_weights(df)
+
+
+def _scale_weights(df: pd.DataFrame) -> pd.DataFrame:
     # Scale weight if in 0-1 range
     if df["Weight (%)"].notna().any():
         max_w = df["Weight (%)"].max()
         if max_w is not None and max_w <= 1.5:
             df["Weight (%)"] = df["Weight (%)"] * 100.0
-
     return df
 
 
+def _find_header_offset(data: bytes) -> int:
+    """Byte offset of the first line starting with "Ticker,", or -1."""
+    pos = data.find(b"Ticker,")
+    while pos > 0 and data[pos - 1] not in (0x0A, 0x0D):
+        pos = data.find(b"Ticker,", pos + 1)
+    return pos
+
+
+def _numeric_column(arr: pa.ChunkedArray) -> Optional[np.ndarray]:
+    """
+    Thousands separators and percent signs are removed in one Arrow kernel and plain
+    numbers are cast there; text without digits ("-" for a missing Duration) becomes
+    NaN, as with pd.to_numeric(errors="coerce"). Returns int64 when every cell is an
+    integer, like pandas does. None when a cell is number-like but not plain (inf,
+    Infinity, "+3", an exponent, more than 15 digits...): the caller then falls back
+    to the pandas reader, whose type inference and rounding decide those cells.
+    """
+    cleaned = pc.utf8_trim_whitespace(pc.replace_substring_regex(arr, pattern="[,%]", replacement=""))
+    valid = pc.fill_null(pc.match_substring_regex(cleaned, _NUMBER_PATTERN), False)
+    unsure = pc.and_not(pc.fill_null(pc.match_substring_regex(cleaned, _NUMBER_LIKE_PATTERN), False), valid)
+    # pandas' parser rounds exponents and more than 15 digits differently from the cast
+    digits = pc.utf8_length(pc.replace_substring_regex(cleaned, pattern=r"\D", replacement=""))
+    inexact = pc.and_(valid, pc.or_(pc.greater(digits, 15), pc.match_substring_regex(cleaned, "[eE]")))
+    if pc.any(pc.or_(unsure, inexact)).as_py():
+        return None
+    cleaned = pc.if_else(valid, cleaned, pa.scalar(None, pa.string()))
+    if pc.all(valid).as_py() and pc.all(pc.match_substring_regex(cleaned, _INTEGER_PATTERN)).as_py():
+        return pc.cast(cleaned, pa.int64()).to_numpy()
+    numbers = pc.cast(cleaned, pa.float64()).to_numpy(zero_copy_only=False)
+    return None if np.isinf(numbers).any() else numbers
+
+
+def _text_column(arr: pa.ChunkedArray) -> pd.Series:
+    if arr.null_count == len(arr):
+        return pd.Series(np.nan, index=range(len(arr)), dtype=float)
+    values = pd.Series(arr.to_numpy(zero_copy_only=False), dtype=object)
+    return values.where(values.notna(), np.nan)
+
+
+def _short_rows_table(rows: list, header: List[str], columns: List[str]) -> pa.Table:
+    """Rows with fewer fields than the header (footer notes), padded like pandas pads them."""
+    na = set(PANDAS_NA_VALUES)
+    parsed = []
+    for row in sorted(rows, key=lambda r: r.number if r.number is not None else 0):
+        fields = next(csv.reader([row.text]), [])
+        fields += [None] * (len(header) - len(fields))
+        parsed.append([None if f is None or f in na else f for f in fields])
+    return pa.table({
+        col: pa.array([r[header.index(col)] for r in parsed], type=pa.string())
+        for col in columns
+    })
+
+
+def _load_csv_exact(csv_text: str) -> pd.DataFrame:
+    data = csv_text.encode("utf-8")
+    start = _find_header_offset(data)
+    if start < 0:
+        return _load_csv_pandas(csv_text)
+
+    header_end = data.find(b"\n", start)
+    header_line = data[start:header_end if header_end >= 0 else len(data)]
+    header = next(csv.reader([header_line.decode("utf-8").rstrip("\r")]))
+    stripped = {c.strip(): c for c in header}
+    present = {t: stripped[t.strip()] for t in TARGET_COLUMNS if t.strip() in stripped}
+    if len(set(header)) != len(header):
+        return _load_csv_pandas(csv_text)
+
+    short_rows = []
+
+    def _on_invalid_row(row):
+        if row.actual_columns > row.expected_columns:
+            return "error"
+        # pandas skips lines made only of blanks, and pads short lines with NaN
+        if row.text.strip(" \t\r"):
+            short_rows.append(row)
+        return "skip"
+
+    columns = list(present.values())
+    try:
+        table = pa_csv.read_csv(
+            pa.BufferReader(pa.py_buffer(data)[start:]),
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=1 << 20),
+            parse_options=pa_csv.ParseOptions(invalid_row_handler=_on_invalid_row),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={c: pa.string() for c in columns},
+                null_values=PANDAS_NA_VALUES,
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        return _load_csv_pandas(csv_text)
+    if short_rows:
+        table = pa.concat_tables([table, _short_rows_table(short_rows, header, columns)])
+    if table.num_rows == 0:
+        return _load_csv_pandas(csv_text)
+
+    out = {}
+    for target in TARGET_COLUMNS:
+        if target not in present:
+            fill, dtype = (np.nan, float) if target in NUMERIC_COLUMNS else (pd.NA, object)
+            out[target] = pd.Series(fill, index=range(table.num_rows), dtype=dtype)
+        elif target in NUMERIC_COLUMNS:
+            out[target] = _numeric_column(table.column(present[target]))
+            if out[target] is None:
+                return _load_csv_pandas(csv_text)
+        else:
+            out[target] = _text_column(table.column(present[target]))
+    return _scale_weights(pd.DataFrame(out))
+
+
 def _add_parent_etf_columns(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
     df = df.copy()
     df["ETF Ticker"] = ticker
@@ -223,18 +374,30 @@ def fetch_holdings(ticker: str, as_of_date: Optional[str] = None) -> pd.DataFram
     return _add_parent_etf_columns(df, ticker)
 
 
+def _nested_fund_tickers(df: pd.DataFrame, fetched: set) -> List[str]:
+    """Funds from `tickers` held by the fetched funds and not fetched yet."""
+    held = df["Ticker"].dropna().astype(str).str.strip().str.upper().replace(FUND_ALIASES)
+    return sorted(set(held.unique()).intersection(tickers) - fetched)
+
+
 def fetch_all_holdings(
     ticker_list: Optional[Iterable[str]] = None,
     as_of_date: Optional[str] = None,
     ignore_errors: bool = True,
-    max_workers: int = 8
+    max_workers: int = 8,
+    nested: bool = True
 ) -> pd.DataFrame:
+    """
+    Holdings of `ticker_list` (all known funds by default). With nested=True, funds
+    held by those funds are fetched too (until closure) so they can be looked through.
+    """
     if ticker_list is None:
         ticker_list = list(tickers.keys())
     ticker_list = list(ticker_list)
 
     results: List[pd.DataFrame] = []
     errors: Dict[str, Exception] = {}
+    fetched = set(ticker_list)
 
     with ThreadPoolExecutor(max_workers=min(max_workers, len(ticker_list) or 1)) as ex:
         future_map = {
@@ -254,7 +417,40 @@ def fetch_all_holdings(
     if not results:
         raise RuntimeError(f"No holdings fetched. Errors: { {k: str(v) for k,v in errors.items()} }")
 
-    return pd.concat(results, ignore_index=True)
+    df = pd.concat(results, ignore_index=True)
+    # Fetch the funds held by fetched funds until no new one appears
+    missing = _nested_fund_tickers(df, fetched) if nested else []
+    while missing:
+        fetched.update(missing)
+        try:
+            more = fetch_all_holdings(missing, as_of_date, ignore_errors, max_workers, nested=False)
+        except RuntimeError:
+            if not ignore_errors:
+                raise
+            break
+        df = pd.concat([df, more], ignore_index=True)
+        missing = _nested_fund_tickers(df, fetched)
+    return df
+
+
+def fetch_holdings_snapshots(
+    dates: Iterable,
+    ticker_list: Optional[Iterable[str]] = None,
+    max_workers: int = 8
+) -> Dict[pd.Timestamp, pd.DataFrame]:
+    """
+    {as-of date: holdings} for each date (no nested fetch: snapshots are diffed per fund).
+    Dates without a published file (holidays, before inception) are skipped with a
+    RuntimeWarning.
+    """
+    snapshots = {}
+    for d in pd.to_datetime(list(dates)):
+        try:
+            snapshots[d] = fetch_all_holdings(ticker_list, d.strftime("%Y%m%d"),
+                                              max_workers=max_workers, nested=False)
+        except RuntimeError as e:
+            warnings.warn(f"no holdings for {d.date()}, skipped: {e}", RuntimeWarning, stacklevel=2)
+    return snapshots
 
 
 # ---------------------------------------------------------------------
@@ -282,6 +478,52 @@ def _demo_all():
         print("Failed fetching all:", e)
 
 
+def _synthetic_csv(n_rows: int) -> str:
+    """XBB-like holdings file: preamble, quoted thousands, footer disclaimer."""
+    rng = np.random.default_rng(0)
+    lines = [
+        "iShares Core Canadian Universe Bond Index ETF",
+        'Fund Holdings as of,"Oct 17, 2025"',
+        "\u00a0",
+        "Ticker,Name,Sector,Asset Class,Market Value,Weight (%),Notional Value,Par Value,"
+        "Price,Location,Exchange,Currency,Duration,Maturity,Coupon (%),Market Currency",
+    ]
+    for i in range(n_rows):
+        mv = rng.uniform(1e3, 5e7)
+        lines.append(
+            f'"B{i % 997}","ISSUER {i % 1500}","{("Government", "Corporate", "Provincial")[i % 3]}",'
+            f'"Fixed Income","{mv:,.2f}","{mv / 1e9:.4f}","{mv:,.2f}","{mv * 0.98:,.0f}",'
+            f'"{rng.uniform(80, 120):.3f}","Canada","-","CAD","{rng.uniform(0, 25):.2f}",'
+            f'"Jun 01, {2026 + i % 30}","{rng.uniform(0, 8):.3f}","CAD"'
+        )
+    lines += ["\u00a0", '"The content contained herein is owned or licensed by BlackRock."']
+    return "\n".join(lines)
+
+
+def _bench_parse(paths: List[str], repeat: int = 5):
+    """
+    Compare the Arrow parser against the pandas reference on recorded CSVs
+    (or a synthetic file) and check both give the same frame.
+    """
+    samples = {p: Path(p).read_text(encoding="utf-8-sig") for p in paths}
+    if not samples:
+        samples = {"synthetic (20k rows)": _synthetic_csv(20_000)}
+    for name, text in samples.items():
+        fast, ref = _load_csv_exact(text), _load_csv_pandas(text)
+        pd.testing.assert_frame_equal(fast, ref, check_exact=True)
+        timings = {}
+        for label, parser in (("arrow", _load_csv_exact), ("pandas", _load_csv_pandas)):
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                parser(text)
+            timings[label] = (time.perf_counter() - t0) / repeat * 1000
+        print(f"{name}: rows={len(fast)} arrow={timings['arrow']:.1f}ms "
+              f"pandas={timings['pandas']:.1f}ms identical=True")
+
+
 if __name__ == "__main__":
-    _demo_individual()
-    _demo_all()
+    if "--bench" in sys.argv:
+        _bench_parse([a for a in sys.argv[1:] if a != "--bench"])
+    else:
+        _demo_individual()
+        _demo_all()
@@ -0,0 +1,24 @@
+import pandas as pd
+
+def load_fx_history(currencies: list[str], base: str = "CAD") -> pd.DataFrame:
+    """
+    Daily closes of `base` per unit of each currency (dates x currency). Every requested
+    currency other than `base` has a column: it is all NaN when Yahoo returned no rate
+    for it (API unavailable, unknown pair), so callers can tell missing rates apart.
+    """
+    pairs = {f"{c}{base}=X": c for c in currencies if c != base}
+    missing = pd.DataFrame(columns=list(pairs.values()), dtype=float)
+    if not pairs:
+        return missing
+    try:
+        from yahoo_api import YahooAPI
+        raw = YahooAPI().get_yahoo_data(list(pairs), metric=['close'])
+    except Exception:
+        return missing
+    if raw is None or raw.empty:
+        return missing
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = raw.columns.get_level_values(0)
+    raw = raw.rename(columns=pairs).reindex(columns=list(pairs.values()))
+    raw.index = pd.to_datetime(raw.index).tz_localize(None).normalize()
+    return raw.sort_index()
@@ -1,18 +1,23 @@
 import streamlit as st
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 
+def read_prices(file_path: Path) -> pd.DataFrame:
+    """Prices from 2019 on (dates x tickers), read through Arrow; empty if the file is missing."""
+    if not file_path.exists():
+        return pd.DataFrame()
+    df = pq.read_table(file_path).to_pandas(split_blocks=True)
+    return df.loc['2019-01-01':].dropna(how="all")
+
 @st.cache_data
 def load_parquet_data(file_path: Path) -> pd.DataFrame:
     """
     Load and preprocess price data from a Parquet file.
     The data is cached to improve performance.
+    The app pages read the shared copy instead (utils.stores.data_service).
     """
     if not file_path.exists():
         st.error(f"Data file not found: {file_path}")
         return pd.DataFrame()
-    
-    df = pd.read_parquet(file_path)
-    df = df.loc['2019-01-01':].dropna(how="all")
-
-    return df
\ No newline at end of file
+    return read_prices(file_path)
@@ -0,0 +1,16 @@
+import pandas as pd
+from pathlib import Path
+
+def load_workbook_splits(path: Path) -> pd.DataFrame:
+    """Splits of the "Copy splits" sheet, in the load_splits layout: Ex-Date index, Ticker / SplitFactor."""
+    if not path.exists():
+        return pd.DataFrame()
+    df = pd.read_excel(path, sheet_name="Copy splits")
+    if df.empty or not {'Asset', 'Ex-Date', 'Split'}.issubset(df.columns):
+        return pd.DataFrame()
+    df = df.dropna(subset=['Asset', 'Ex-Date', 'Split'])
+    out = pd.DataFrame({
+        'Ticker': df['Asset'].astype(str).to_numpy(),
+        'SplitFactor': df['Split'].astype(float).to_numpy(),
+    }, index=pd.DatetimeIndex(pd.to_datetime(df['Ex-Date']).dt.tz_localize(None), name='Date'))
+    return out.sort_index(kind="stable")
@@ -11,4 +11,5 @@ def load_transactions(path: Path) -> pd.DataFrame:
         df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize(None)
     if {'Quantity', 'Price'}.issubset(df.columns):
         df['Value'] = df['Quantity'] * df['Price']
-    return df.sort_index()
+    # Stable: rows of the same date keep their sheet order
+    return df.sort_index(kind="stable")
@@ -0,0 +1,133 @@
+"""
+Read-only data shared by every session and page of the app.
+
+One DataService per input version (content hashes of prices.parquet and of the
+workbook), created through st.cache_resource: every session and page gets the same
+object, so memory stays flat as analysts connect (st.cache_data unpickles a private
+copy of a frame for each caller).
+
+  - prices / etf_prices   dates x tickers, raw and normalized (XIU.TO -> XIU) columns
+  - price_series          derived series per frequency (compute_prices.derived_series)
+  - transactions          typed transactions store (the frame load_transactions_table shares)
+  - holdings()            windows sliced from the shared holdings ledger
+  - underlyers()          look-through lines of a set of ETFs, fetched once for every
+                          process (utils.stores.shared_cache)
+
+Each dataset has a version token (prices_version, transactions_version,
+holdings_version(), underlyers_version()): cached functions downstream key on the
+tokens instead of hashing the frames (see versions.version_token). The tokens cover
+the code that derives the data as well (PRICES_VERSION, the transactions store and
+ledger versions, exposure_cube.CUBE_VERSION), so a logic change invalidates them.
+
+The frames are read from Parquet through Arrow and their arrays are read-only:
+writing into them raises "assignment destination is read-only". Derive a new frame
+(reindex, assign, arithmetic...) instead of modifying one in place.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import config
+from utils.loaders.api.blackrock_api import fetch_all_holdings
+from utils.loaders.load_raw_prices import read_prices
+from utils.stores.exposure_cube import CUBE_VERSION
+from utils.stores.holdings_ledger import LEDGER_VERSION, fund_holdings
+from utils.stores.shared_cache import shared_cache
+from utils.stores.transactions_store import STORE_VERSION as TRANSACTIONS_STORE_VERSION
+from utils.stores.transactions_store import ensure_transactions_store, load_transactions_table
+from utils.stores.versions import file_digest, frame_digest, version_token
+from utils.transforms.compute_prices import derived_series
+from utils.transforms.normalize_tickers import normalize_price_columns
+
+
+# Bump when read_prices, the normalized columns or the derived series change
+PRICES_VERSION = 1
+
+
+def read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """An all-float frame as one read-only float64 block (no copy when it already is one)."""
+    values = df.to_numpy(dtype="float64")
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def trading_days(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    """Business days between start and end (inclusive)."""
+    return pd.bdate_range(start=pd.to_datetime(start).normalize(), end=pd.to_datetime(end).normalize())
+
+
+@shared_cache("underlyers", version=CUBE_VERSION, ttl=config.EXPOSURE_CUBE_MAX_AGE_HOURS * 3600)
+def _fetch_underlyers(etfs: tuple) -> pd.DataFrame:
+    return fetch_all_holdings(ticker_list=list(etfs))
+
+
+@st.cache_resource(
+    show_spinner="Loading look-through holdings...",
+    max_entries=8,
+    ttl=config.EXPOSURE_CUBE_MAX_AGE_HOURS * 3600,
+)
+def _shared_underlyers(etfs: tuple) -> tuple[pd.DataFrame, str]:
+    """
+    (lines, version token): the content is hashed once per fetch, not per use.
+    Expires with the shared-cache entry, so a long-lived server picks up new holdings.
+    """
+    lines = _fetch_underlyers(etfs)
+    # The parsed lines depend on the BlackRock parser too, versioned with the look-through
+    return lines, version_token("underlyers", CUBE_VERSION, frame_digest(lines))
+
+
+@dataclass(frozen=True)
+class DataService:
+    version: str
+    prices_version: str
+    transactions_version: str
+    prices: pd.DataFrame
+    etf_prices: pd.DataFrame
+    price_series: dict
+    transactions: pd.DataFrame
+    workbook: Path
+
+    def holdings(self, fund: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Trading days x ticker holdings of `fund` over [start, end]."""
+        return fund_holdings(fund, start, end, trading_days, self.workbook)
+
+    def holdings_version(self, fund: str, start: pd.Timestamp, end: pd.Timestamp) -> str:
+        return version_token(self.transactions_version, LEDGER_VERSION, fund, start, end)
+
+    def underlyers(self, etfs) -> pd.DataFrame:
+        """Current look-through lines of `etfs` (BlackRock), shared by every session."""
+        return _shared_underlyers(tuple(sorted(etfs)))[0]
+
+    def underlyers_version(self, etfs) -> str:
+        return _shared_underlyers(tuple(sorted(etfs)))[1]
+
+
+def _build_service(prices_file: Path, workbook: Path, prices_digest: str, tx_digest: str) -> DataService:
+    prices = read_prices(prices_file)
+    if not prices.empty:
+        prices = read_only(prices)
+    series = {
+        freq: {name: read_only(frame) for name, frame in frames.items()}
+        for freq, frames in derived_series(prices).items()
+    } if not prices.empty else {}
+    etf_prices = read_only(normalize_price_columns(prices)) if not prices.empty else prices
+    transactions = load_transactions_table(workbook)
+    prices_version = version_token("prices", prices_digest, PRICES_VERSION)
+    transactions_version = version_token("transactions", tx_digest, TRANSACTIONS_STORE_VERSION)
+    return DataService(version_token(prices_version, transactions_version), prices_version, transactions_version,
+                       prices, etf_prices, series, transactions, workbook)
+
+
+@st.cache_resource(show_spinner="Loading data...", max_entries=2)
+def _shared_service(prices_file: str, workbook: str, prices_digest: str, tx_digest: str) -> DataService:
+    return _build_service(Path(prices_file), Path(workbook), prices_digest, tx_digest)
+
+
+def data_service(prices_file: Path = config.PRICES_PARQUET,
+                 workbook: Path = config.TRANSACTION_FILE) -> DataService:
+    """The service for the current prices and workbook; rebuilt only when either file changes."""
+    tx_digest = ensure_transactions_store(workbook) if workbook.exists() else ""
+    return _shared_service(str(prices_file), str(workbook), file_digest(prices_file), tx_digest)
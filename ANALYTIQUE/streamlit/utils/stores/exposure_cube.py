@@ -0,0 +1,215 @@
+"""
+Materialized look-through exposures for the Exposure page.
+
+Offline job (run from the streamlit/ folder):
+    python -m utils.stores.exposure_cube
+
+Writes to config.EXPOSURE_CUBE_DIR:
+  - cube.parquet        Fund / Dimension / Date / Category / Exposure
+  - etf_values.parquet  Fund / Date / ETF Ticker / Value
+  - weights.parquet     ETF Ticker / SecurityID / Weight / Par
+  - totals.parquet      Fund / Date / Total
+  - security_master.parquet
+  - manifest.json       input versions the files were built from
+
+The per-date underlyer table is kept factorized (ETF values x ETF weights):
+materialized it is dates x ~10k securities x funds rows, while one date is
+rebuilt from the two small files in milliseconds.
+"""
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import config
+from utils.loaders.api.blackrock_api import fetch_all_holdings
+from utils.loaders.load_raw_prices import load_parquet_data
+from utils.stores.transactions_store import ensure_transactions_store, read_transactions_store
+from utils.stores.versions import file_digest, frame_digest
+from utils.transforms.compute_exposures import (
+    UNDERLYER_DIMENSIONS, aggregate_dimension, compute_underlyer_exposures,
+    etf_market_values, prepare_lines, weight_table,
+)
+from utils.transforms.compute_holdings import build_holdings
+from utils.transforms.normalize_tickers import normalize_holdings_columns, normalize_price_columns
+from utils.transforms.security_master import TEXT_ATTRIBUTES
+
+# Bump when the layout or the look-through logic changes (BlackRock parsing, security
+# master, compute_exposures...): it also versions the shared-cache entries and the
+# version tokens of look-through results computed live
+CUBE_VERSION = 5
+FUNDS = ["Global", "Strategic", "Tactic"]
+
+MANIFEST = "manifest.json"
+CUBE_FILE = "cube.parquet"
+ETF_VALUES_FILE = "etf_values.parquet"
+WEIGHTS_FILE = "weights.parquet"
+TOTALS_FILE = "totals.parquet"
+MASTER_FILE = "security_master.parquet"
+
+
+def input_versions() -> dict:
+    """Versions of the local inputs; the holdings snapshot is versioned by age."""
+    return {
+        "cube_version": CUBE_VERSION,
+        "transactions": file_digest(config.TRANSACTION_FILE),
+        "prices": file_digest(config.PRICES_PARQUET),
+    }
+
+
+def _trading_days(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    return pd.bdate_range(start=pd.to_datetime(start).normalize(), end=pd.to_datetime(end).normalize())
+
+
+def _write(df: pd.DataFrame, path: Path, sort_by: list):
+    # Sorted + small row groups so readers prune with min/max statistics
+    table = pa.Table.from_pandas(df.sort_values(sort_by), preserve_index=False)
+    pq.write_table(table, path, row_group_size=50_000)
+
+
+# ---------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------
+def build_exposure_cube(out_dir: Path = config.EXPOSURE_CUBE_DIR) -> dict:
+    ensure_transactions_store(config.TRANSACTION_FILE)
+    tx = read_transactions_store()
+    if tx.empty:
+        raise RuntimeError("No transactions available.")
+    versions = input_versions()
+    prices = normalize_price_columns(load_parquet_data(config.PRICES_PARQUET))
+    underlyers = fetch_all_holdings()
+    start, end = tx.index.min().normalize(), tx.index.max().normalize()
+
+    cube, etf_values, totals, funds = [], [], [], {}
+    for fund in FUNDS:
+        holdings = normalize_holdings_columns(build_holdings(tx, start, end, fund, _trading_days))
+        if holdings.empty:
+            continue
+        values_matrix, meta, long = compute_underlyer_exposures(holdings, prices, underlyers)
+        if long.empty:
+            continue
+        for dim in UNDERLYER_DIMENSIONS:
+            agg = aggregate_dimension(long, meta, dim)
+            part = agg.rename_axis(columns="Category").stack().rename("Exposure").reset_index()
+            part = part[part["Exposure"] != 0]
+            part.insert(0, "Dimension", dim)
+            part.insert(0, "Fund", fund)
+            cube.append(part)
+        values = etf_market_values(holdings, prices).fillna(0.0)
+        etf_values.append(values.rename_axis(index="Date", columns="ETF Ticker")
+                                .stack().rename("Value").reset_index().assign(Fund=fund))
+        totals.append(values_matrix.sum(axis=1).rename("Total").rename_axis("Date").reset_index().assign(Fund=fund))
+        funds[fund] = {"etfs": list(holdings.columns), "n_underlyers": int(values_matrix.shape[1])}
+
+    if not funds:
+        raise RuntimeError("No exposures computed for any fund.")
+
+    master, lines = prepare_lines(underlyers, underlyers["ETF Ticker"].unique())
+    weights = weight_table(master, lines)
+    master = master.astype({c: object for c in master.select_dtypes("category").columns}).reset_index()
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Drop the manifest first: readers fall back to live computation while files are rewritten
+    (out_dir / MANIFEST).unlink(missing_ok=True)
+    _write(pd.concat(cube, ignore_index=True), out_dir / CUBE_FILE, ["Fund", "Date", "Dimension"])
+    _write(pd.concat(etf_values, ignore_index=True), out_dir / ETF_VALUES_FILE, ["Fund", "Date"])
+    _write(weights, out_dir / WEIGHTS_FILE, ["ETF Ticker", "SecurityID"])
+    _write(pd.concat(totals, ignore_index=True), out_dir / TOTALS_FILE, ["Fund", "Date"])
+    _write(master, out_dir / MASTER_FILE, ["SecurityID"])
+
+    manifest = {
+        **versions,
+        "holdings_snapshot": frame_digest(underlyers),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "dates": {"min": str(start.date()), "max": str(end.date())},
+        "funds": funds,
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+# ---------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------
+def load_fresh_manifest(cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> Optional[dict]:
+    """Manifest of the cube, or None if missing or built from other inputs / too old."""
+    path = cube_dir / MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    current = input_versions()
+    if any(manifest.get(k) != v for k, v in current.items()):
+        return None
+    age = datetime.now() - datetime.fromisoformat(manifest["built_at"])
+    if age > timedelta(hours=config.EXPOSURE_CUBE_MAX_AGE_HOURS):
+        return None
+    return manifest
+
+
+def read_totals(fund: str, start: pd.Timestamp, end: pd.Timestamp,
+                cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> pd.Series:
+    df = pd.read_parquet(cube_dir / TOTALS_FILE, columns=["Date", "Total"],
+                         filters=[("Fund", "==", fund), ("Date", ">=", start), ("Date", "<=", end)])
+    return df.set_index("Date")["Total"].sort_index()
+
+
+def read_dimension_slice(fund: str, date_point: pd.Timestamp, dimensions: list = UNDERLYER_DIMENSIONS,
+                         cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> dict:
+    """{dimension: Series(category -> exposure)} for one fund and date."""
+    df = pd.read_parquet(cube_dir / CUBE_FILE, columns=["Dimension", "Category", "Exposure"],
+                         filters=[("Fund", "==", fund), ("Date", "==", date_point),
+                                  ("Dimension", "in", list(dimensions))])
+    out = {}
+    for dim in dimensions:
+        sub = df[df["Dimension"] == dim]
+        out[dim] = pd.Series(sub["Exposure"].to_numpy(), index=pd.Index(sub["Category"].to_numpy(), name=dim))
+    return out
+
+
+def read_security_master(cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> pd.DataFrame:
+    master = pd.read_parquet(cube_dir / MASTER_FILE).set_index("SecurityID")
+    for col in TEXT_ATTRIBUTES + ["ETF Ticker"]:
+        if col in master.columns:
+            master[col] = master[col].astype("category")
+    return master
+
+
+def read_etf_values(fund: str, start: pd.Timestamp, end: pd.Timestamp,
+                    cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> pd.DataFrame:
+    """Dates x ETF market values of one fund."""
+    df = pd.read_parquet(cube_dir / ETF_VALUES_FILE, columns=["Date", "ETF Ticker", "Value"],
+                         filters=[("Fund", "==", fund), ("Date", ">=", start), ("Date", "<=", end)])
+    return df.pivot(index="Date", columns="ETF Ticker", values="Value").fillna(0.0).sort_index()
+
+
+def read_weights(cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> pd.DataFrame:
+    return pd.read_parquet(cube_dir / WEIGHTS_FILE)
+
+
+def read_underlyers_slice(fund: str, date_point: pd.Timestamp, master: pd.DataFrame,
+                          cube_dir: Path = config.EXPOSURE_CUBE_DIR) -> pd.DataFrame:
+    """Date / Security (codes into master) / Exposure rows for one fund and date."""
+    values = pd.read_parquet(cube_dir / ETF_VALUES_FILE, columns=["ETF Ticker", "Value"],
+                             filters=[("Fund", "==", fund), ("Date", "==", date_point)])
+    values = values.set_index("ETF Ticker")["Value"]
+    weights = pd.read_parquet(cube_dir / WEIGHTS_FILE,
+                              filters=[("ETF Ticker", "in", list(values.index))])
+    exposure = weights["Weight"].to_numpy() * values.reindex(weights["ETF Ticker"]).fillna(0.0).to_numpy()
+    by_security = pd.Series(exposure).groupby(weights["SecurityID"].to_numpy()).sum()
+    by_security = by_security[by_security != 0]
+    codes = np.searchsorted(master.index.to_numpy(), by_security.index.to_numpy()).astype(np.int32)
+    return pd.DataFrame({
+        "Date": date_point,
+        "Security": pd.Categorical.from_codes(codes, categories=master.index),
+        "Exposure": by_security.to_numpy(),
+    })
+
+
+if __name__ == "__main__":
+    m = build_exposure_cube()
+    print(json.dumps(m, indent=2))
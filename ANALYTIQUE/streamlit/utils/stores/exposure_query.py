@@ -0,0 +1,79 @@
+"""
+Queries over look-through exposure rows (Date / Security / Exposure, Security
+being codes into the security master), from the cube or the live computation.
+
+Rows of one date are contiguous (row-major order), filters are evaluated on the
+master (one row per security) and ordering uses partial selection, so master
+attributes are only joined onto the rows a query returns.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.transforms.security_master import attach_attributes
+
+QUERY_COLUMNS = ["Ticker","Name","Sector","Asset Class","Location","Currency","Duration","Coupon (%)","ETF Ticker"]
+FILTER_DIMENSIONS = ["Sector", "Location", "Currency"]
+
+
+def date_rows(long_df: pd.DataFrame, date_point: pd.Timestamp) -> pd.DataFrame:
+    """Rows of one date, by binary search on the (sorted) Date column."""
+    dates = long_df["Date"].to_numpy()
+    d = np.datetime64(date_point)
+    return long_df.iloc[np.searchsorted(dates, d, side="left"):np.searchsorted(dates, d, side="right")]
+
+
+def dimension_totals(snap: pd.DataFrame, meta: pd.DataFrame, dimension: str) -> pd.Series:
+    """Exposure by category of `dimension` over one date's rows (one bincount on master codes)."""
+    dim_codes, dim_labels = pd.factorize(meta[dimension].astype(object).fillna("Unknown"))
+    rows = dim_codes[snap["Security"].cat.codes.to_numpy()]
+    sums = np.bincount(rows, weights=snap["Exposure"].to_numpy(), minlength=len(dim_labels))
+    present = np.bincount(rows, minlength=len(dim_labels)) > 0
+    return pd.Series(sums[present], index=pd.Index(dim_labels[present], name=dimension)).sort_index()
+
+
+def filter_mask(meta: pd.DataFrame, filters: Optional[dict]) -> Optional[np.ndarray]:
+    """Boolean mask over master rows for {dimension: selected values}; None when nothing is selected."""
+    mask = None
+    for dim, values in (filters or {}).items():
+        if not values:
+            continue
+        m = meta[dim].astype(object).fillna("Unknown").isin(values).to_numpy()
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def query_exposures(snap: pd.DataFrame, meta: pd.DataFrame, filters: Optional[dict] = None,
+                    offset: int = 0, limit: int = 50, columns=QUERY_COLUMNS) -> tuple[pd.DataFrame, int, float]:
+    """
+    Rows [offset, offset + limit) of one date's exposures, largest first, after filters.
+    Only offset + limit rows are ordered (argpartition) and only `limit` get attributes.
+    Returns (rows with attributes and Pct of the date total, number of matching rows, date total).
+    """
+    if snap.empty:
+        return pd.DataFrame(), 0, 0.0
+    codes = snap["Security"].cat.codes.to_numpy()
+    exposure = snap["Exposure"].to_numpy()
+    total = float(exposure.sum())
+
+    mask = filter_mask(meta, filters)
+    pos = np.arange(len(snap)) if mask is None else np.flatnonzero(mask[codes])
+    n = len(pos)
+    end = min(offset + limit, n)
+    if offset >= end:
+        return pd.DataFrame(), n, total
+
+    if end < n:
+        pos = pos[np.argpartition(-exposure[pos], end - 1)[:end]]
+    pos = pos[np.argsort(-exposure[pos], kind="stable")][offset:end]
+
+    rows = attach_attributes(snap.iloc[pos][["Security", "Exposure"]].reset_index(drop=True), meta, columns)
+    rows["Pct"] = rows["Exposure"] / total if total else np.nan
+    return rows.drop(columns="Security"), n, total
+
+
+def top_exposures(snap: pd.DataFrame, meta: pd.DataFrame, k: int = 10,
+                  filters: Optional[dict] = None, columns=QUERY_COLUMNS) -> pd.DataFrame:
+    """The k largest exposures of one date (after filters)."""
+    return query_exposures(snap, meta, filters, 0, k, columns)[0]
@@ -0,0 +1,149 @@
+"""
+Persisted holdings ledger: cumulative position of every (fund, ticker) at the dates it
+changes, built from the transactions store.
+
+Written to config.HOLDINGS_LEDGER_DIR:
+  - part-00000.parquet, part-00001.parquet...  Fund / Ticker / Date / Position
+  - manifest.json  workbook version, rows covered (with their hash), last positions
+
+When the workbook only gains transactions dated on or after the last ledger date,
+the new rows are written as one more part, seeded with the last positions kept in
+the manifest: O(new changes), the existing parts are never rewritten. Anything
+else (edits, back-dated rows) rebuilds the ledger.
+
+A window is then a binary search per trading day on the change dates
+(compute_holdings.holdings_window) instead of a re-aggregation of every trade.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+import config
+from utils.stores.transactions_store import ensure_transactions_store, load_transactions_table
+from utils.stores.versions import frame_digest, replace_file
+from utils.transforms.compute_holdings import (
+    CHANGE_COLUMNS, FUNDS, holdings_window, ledger_matrix, position_changes,
+)
+
+# Bump when the layout or the position logic changes
+LEDGER_VERSION = 2
+MANIFEST = "manifest.json"
+
+
+def _part_name(i: int) -> str:
+    return f"part-{i:05d}.parquet"
+
+
+def _next_part(parts: list) -> int:
+    return int(parts[-1][len("part-"):-len(".parquet")]) + 1 if parts else 0
+
+
+def _read_manifest(out_dir: Path) -> Optional[dict]:
+    path = out_dir / MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    return manifest if manifest.get("ledger_version") == LEDGER_VERSION else None
+
+
+def _last_positions(changes: pd.DataFrame, previous: dict = None) -> dict:
+    """{fund: {ticker: last position}}, updated with the latest change points."""
+    last = {f: dict(t) for f, t in (previous or {}).items()}
+    tail = changes.sort_values("Date").groupby(["Fund", "Ticker"])["Position"].last()
+    for (fund, ticker), pos in tail.items():
+        last.setdefault(fund, {})[ticker] = float(pos)
+    return last
+
+
+def _write_part(changes: pd.DataFrame, out_dir: Path, i: int):
+    table = pa.Table.from_pandas(changes.sort_values(["Fund", "Date", "Ticker"]), preserve_index=False)
+    replace_file(out_dir / _part_name(i), lambda tmp: pq.write_table(table, tmp))
+
+
+def update_holdings_ledger(tx: pd.DataFrame, version: str,
+                           out_dir: Path = config.HOLDINGS_LEDGER_DIR) -> dict:
+    """Bring the ledger to the transactions of workbook `version`: nothing, one appended part, or a rebuild."""
+    manifest = _read_manifest(out_dir)
+    if manifest is not None and manifest["transactions"] == version:
+        return manifest
+
+    rows = manifest["rows"] if manifest else 0
+    appendable = (
+        manifest is not None
+        and 0 < rows <= len(tx)
+        and frame_digest(tx.iloc[:rows]) == manifest["prefix"]
+        and (rows == len(tx) or tx.index[rows:].min() >= pd.Timestamp(manifest["last_date"]))
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # New parts never overwrite one the current manifest lists, and the manifest is
+    # replaced whole: readers keep a consistent ledger while it is updated
+    existing = sorted(p.name for p in out_dir.glob("part-*.parquet"))
+    i = _next_part(existing)
+    if appendable:
+        new = tx.iloc[rows:]
+        base = pd.Series({(f, t): p for f, tickers in manifest["last"].items() for t, p in tickers.items()},
+                         dtype=float)
+        changes = position_changes(new, base=base)
+        parts = manifest["parts"]
+        if not changes.empty:
+            _write_part(changes, out_dir, i)
+            parts = parts + [_part_name(i)]
+        last = _last_positions(changes, manifest["last"])
+    else:
+        changes = position_changes(tx)
+        _write_part(changes, out_dir, i)
+        parts = [_part_name(i)]
+        last = _last_positions(changes)
+
+    manifest = {
+        "ledger_version": LEDGER_VERSION,
+        "transactions": version,
+        "rows": len(tx),
+        "prefix": frame_digest(tx),
+        "last_date": str(tx.index.max().date()) if len(tx) else None,
+        "parts": parts,
+        "last": last,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    replace_file(out_dir / MANIFEST, lambda tmp: tmp.write_text(json.dumps(manifest, indent=2)))
+    # Parts of a replaced ledger (or of an update that failed) are no longer listed
+    for old in set(existing) - set(parts):
+        (out_dir / old).unlink(missing_ok=True)
+    return manifest
+
+
+def read_holdings_ledger(out_dir: Path = config.HOLDINGS_LEDGER_DIR) -> pd.DataFrame:
+    """All change points; a later part wins for a (fund, ticker, date) present twice."""
+    manifest = _read_manifest(out_dir)
+    if manifest is None:
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    changes = pd.concat([pd.read_parquet(out_dir / p) for p in manifest["parts"]], ignore_index=True)
+    return changes.drop_duplicates(["Fund", "Ticker", "Date"], keep="last")
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _ledger_matrices(out_dir: str, version: str) -> dict:
+    """{fund: (change dates, tickers, positions)} shared by every session."""
+    changes = read_holdings_ledger(Path(out_dir))
+    return {fund: ledger_matrix(changes, fund) for fund in FUNDS}
+
+
+def fund_holdings(fund: str, start: pd.Timestamp, end: pd.Timestamp,
+                  trading_days_func: Callable[[pd.Timestamp, pd.Timestamp], pd.DatetimeIndex],
+                  workbook: Path = config.TRANSACTION_FILE,
+                  out_dir: Path = config.HOLDINGS_LEDGER_DIR) -> pd.DataFrame:
+    """Trading days x ticker holdings of `fund` over [start, end], sliced from the ledger."""
+    if not workbook.exists():
+        return pd.DataFrame()
+    version = ensure_transactions_store(workbook)
+    manifest = _read_manifest(out_dir)
+    if manifest is None or manifest["transactions"] != version:
+        update_holdings_ledger(load_transactions_table(workbook), version, out_dir)
+    dates, tickers, positions = _ledger_matrices(str(out_dir), version)[fund]
+    return holdings_window(dates, tickers, positions, start, end, trading_days_func)
@@ -0,0 +1,70 @@
+"""
+Landing-page KPIs written by the performance pipeline
+(performance/src/kpi_calculator.py, run by performance/main.py).
+
+Reads config.KPI_DIR:
+  - kpis.parquet   Fund / AUM / MTD return / YTD return / Annualized vol / Sharpe 12M / Max drawdown 12M
+  - manifest.json  KPI version and columns of the table, as-of date, build time
+
+One small file per run: while it is current the landing page recomputes nothing.
+The writer owns the schema: the manifest lists the columns it wrote, and a missing
+table or one of another KPI version makes the landing page compute the KPIs live,
+with the writer's own KPICalculator (loaded from performance/src, not copied).
+"""
+import importlib
+import importlib.util
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+import config
+
+KPI_FILE = "kpis.parquet"
+MANIFEST = "manifest.json"
+# Name the pipeline package is imported under (its own tests import it as `src`)
+PIPELINE_PACKAGE = "performance_pipeline"
+
+_pipeline_lock = threading.Lock()
+
+
+def kpi_calculator():
+    """The pipeline's kpi_calculator module: KPI_VERSION, KPI_COLUMNS and KPICalculator."""
+    with _pipeline_lock:
+        if PIPELINE_PACKAGE not in sys.modules:
+            spec = importlib.util.spec_from_file_location(
+                PIPELINE_PACKAGE, config.PERFORMANCE_SRC_DIR / "__init__.py",
+                submodule_search_locations=[str(config.PERFORMANCE_SRC_DIR)],
+            )
+            package = importlib.util.module_from_spec(spec)
+            sys.modules[PIPELINE_PACKAGE] = package
+            spec.loader.exec_module(package)
+        return importlib.import_module(f"{PIPELINE_PACKAGE}.kpi_calculator")
+
+
+def load_kpi_manifest(kpi_dir: Path = config.KPI_DIR) -> Optional[dict]:
+    """Manifest of the KPI table, or None if missing or written by another KPI version."""
+    path = kpi_dir / MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    if manifest.get("kpi_version") != kpi_calculator().KPI_VERSION:
+        return None
+    return manifest
+
+
+def read_kpis(kpi_dir: Path = config.KPI_DIR) -> pd.DataFrame:
+    """Fund x KPI table, columns as listed in the manifest."""
+    manifest = json.loads((kpi_dir / MANIFEST).read_text())
+    return pd.read_parquet(kpi_dir / KPI_FILE).set_index("Fund")[manifest["columns"]]
+
+
+def live_kpis(market_values: pd.DataFrame, daily_returns: pd.DataFrame) -> tuple[pd.DataFrame, pd.Timestamp]:
+    """(Fund x KPI table, as-of date) computed now, as the pipeline computes them."""
+    module = kpi_calculator()
+    if daily_returns.empty:
+        return pd.DataFrame(columns=module.KPI_COLUMNS, dtype=float), None
+    return module.KPICalculator(config.RISK_FREE_RATE).calculate(market_values, daily_returns)
@@ -0,0 +1,314 @@
+"""
+Second cache tier shared by every Streamlit process on the machine.
+
+st.cache_data / st.cache_resource live inside one process: behind a load balancer
+each worker fetches the same BlackRock snapshots and computes the same exposures.
+A function decorated with @shared_cache (under its st.cache_* decorator) first looks
+in config.SHARED_CACHE_DIR:
+
+  <name>/<key>/entry.json   layout of the result (frame, series, tuple, dict), creation time
+  <name>/<key>/<i>.arrow    one Arrow IPC file per frame, memory-mapped when read (wide
+                            all-float frames: one tensor plus index-/columns- label files)
+  <name>/<key>.lock         lease of the worker computing the entry (pid, expiry)
+  stats/<pid>.json          hits / misses / waits per function, one file per process
+
+The key is a hash of the function source, of the decorator's `version` (the source
+of the code the function calls is not hashed: bump it with that code) and of the
+arguments (frame_digest for frames; `_`-prefixed arguments are skipped, pass a
+version token instead). The first
+worker to miss takes the lock (created with O_EXCL) and computes; the others poll
+until the entry appears, or take the lock over once the lease has expired (a
+crashed worker). Entries are written to a temporary folder and renamed
+into place, so a reader never sees a partial one. A result Arrow cannot hold is
+returned uncached, with a warning.
+
+    python -m utils.stores.shared_cache          hit rate per function (all processes)
+    python -m utils.stores.shared_cache clear    drop every entry and the counters
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import config
+from utils.stores.versions import frame_digest
+
+ENTRY = "entry.json"
+STATS_DIR = "stats"
+POLL_SECONDS = 0.2
+# All-float frames wider than this are stored as one dense tensor
+MATRIX_COLUMNS = 256
+STAT_COLUMNS = ["Hits", "Misses", "Waits"]
+
+# {function name: {"Hits", "Misses", "Waits"}} of this process, shared by its session threads
+_stats: dict = {}
+_stats_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------
+def _arg_digest(value) -> str:
+    if isinstance(value, pd.DataFrame):
+        return frame_digest(value)
+    if isinstance(value, pd.Series):
+        return frame_digest(value.to_frame())
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(_arg_digest(v) for v in value) + ")"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_arg_digest(value[k])}" for k in sorted(value, key=repr)) + "}"
+    return repr(value)
+
+
+def _source(func: Callable) -> bytes:
+    try:
+        return inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        return func.__qualname__.encode() + func.__code__.co_code
+
+
+def cache_key(func: Callable, args: tuple, kwargs: dict, version=None) -> str:
+    """
+    Hash of the function source, of `version` and of the arguments: equal in every process.
+    As in st.cache_*, arguments named with a leading underscore are not hashed.
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    h = hashlib.sha256(_source(func))
+    h.update(repr(version).encode())
+    h.update(_arg_digest({k: v for k, v in bound.arguments.items() if not k.startswith("_")}).encode())
+    return h.hexdigest()[:24]
+
+
+# ---------------------------------------------------------------------
+# Entries
+# ---------------------------------------------------------------------
+def _write_frame(df: pd.DataFrame, path: Path):
+    # IPC file format, uncompressed: readers memory-map it instead of parsing
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    # The mapping stays open as long as the frame's buffers reference it
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all().to_pandas(split_blocks=True)
+
+
+def _is_matrix(df: pd.DataFrame) -> bool:
+    return df.shape[1] > MATRIX_COLUMNS and all(dtype == "float64" for dtype in df.dtypes)
+
+
+def _write_matrix(df: pd.DataFrame, folder: Path, name: str):
+    # One contiguous tensor + its labels: Arrow tables pay per column on read
+    tensor = pa.Tensor.from_numpy(np.ascontiguousarray(df.to_numpy()))
+    with pa.OSFile(str(folder / name), "wb") as sink:
+        pa.ipc.write_tensor(tensor, sink)
+    _write_frame(pd.DataFrame(index=df.index), folder / f"index-{name}")
+    _write_frame(pd.DataFrame(index=df.columns), folder / f"columns-{name}")
+
+
+def _read_matrix(folder: Path, name: str) -> pd.DataFrame:
+    values = pa.ipc.read_tensor(pa.memory_map(str(folder / name))).to_numpy()
+    return pd.DataFrame(values, index=_read_frame(folder / f"index-{name}").index,
+                        columns=_read_frame(folder / f"columns-{name}").index, copy=False)
+
+
+def _encode(value, folder: Path, counter: list) -> dict:
+    """Write the frames of `value` to `folder`; layout of `value` for entry.json."""
+    if isinstance(value, pd.DataFrame):
+        name = f"{len(counter)}.arrow"
+        counter.append(name)
+        if _is_matrix(value):
+            _write_matrix(value, folder, name)
+            return {"matrix": name}
+        _write_frame(value, folder / name)
+        return {"frame": name}
+    if isinstance(value, pd.Series):
+        layout = _encode(value.to_frame("values"), folder, counter)
+        return {"series": layout["frame"], "name": value.name}
+    if isinstance(value, (tuple, list)):
+        return {"tuple": [_encode(v, folder, counter) for v in value]}
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        return {"dict": {k: _encode(v, folder, counter) for k, v in value.items()}}
+    raise TypeError(f"cannot store {type(value).__name__} in the shared cache")
+
+
+def _decode(layout: dict, folder: Path):
+    if "frame" in layout:
+        return _read_frame(folder / layout["frame"])
+    if "matrix" in layout:
+        return _read_matrix(folder, layout["matrix"])
+    if "series" in layout:
+        return _read_frame(folder / layout["series"])["values"].rename(layout["name"])
+    if "tuple" in layout:
+        return tuple(_decode(v, folder) for v in layout["tuple"])
+    return {k: _decode(v, folder) for k, v in layout["dict"].items()}
+
+
+def _load(entry: Path, ttl: Optional[float]):
+    """Cached value of `entry`, or None if missing, expired or unreadable."""
+    try:
+        meta = json.loads((entry / ENTRY).read_text())
+        if ttl is not None and time.time() - meta["created"] > ttl:
+            return None
+        return _decode(meta["layout"], entry)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+
+
+def _tmp_suffix() -> str:
+    # Sessions are threads of one process: the pid alone does not make a name unique
+    return f"{os.getpid()}.{uuid.uuid4().hex}.tmp"
+
+
+def _entries(folder: Path) -> list:
+    return [p for p in folder.glob("*") if p.is_dir() and not p.name.startswith(".")]
+
+
+def _store(value, entry: Path, max_entries: int):
+    tmp = entry.parent / f".{entry.name}.{_tmp_suffix()}"
+    tmp.mkdir(parents=True)
+    try:
+        layout = _encode(value, tmp, [])
+        (tmp / ENTRY).write_text(json.dumps({"created": time.time(), "layout": layout}, default=str))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    except (OSError, TypeError, ValueError, pa.ArrowException) as e:
+        print(f"Warning: result not shared ({entry.parent.name}): {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    # Oldest entries beyond max_entries go (readers holding a mapping keep their data)
+    for old in sorted(_entries(entry.parent), key=lambda p: p.stat().st_mtime)[:-max_entries]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------
+# Lock and lease
+# ---------------------------------------------------------------------
+def _acquire(lock: Path, lease: float) -> bool:
+    """Take the lock; an expired lease (crashed or stuck worker) is removed for the next try."""
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            expires = json.loads(lock.read_text())["expires"]
+        except (OSError, ValueError, KeyError):
+            # Being written right now, or garbage: judge by age
+            try:
+                expires = lock.stat().st_mtime + lease
+            except OSError:
+                return False
+        if expires < time.time():
+            lock.unlink(missing_ok=True)
+        return False
+    with os.fdopen(fd, "w") as f:
+        json.dump({"pid": os.getpid(), "expires": time.time() + lease}, f)
+    return True
+
+
+def _release(lock: Path):
+    try:
+        if json.loads(lock.read_text())["pid"] == os.getpid():
+            lock.unlink()
+    except (OSError, ValueError, KeyError):
+        pass
+
+
+# ---------------------------------------------------------------------
+# Hit rates
+# ---------------------------------------------------------------------
+def _count(cache_dir: Path, name: str, *fields: str):
+    """Count a call of `name`; the counters are best effort and never fail the call."""
+    with _stats_lock:
+        counts = _stats.setdefault(name, dict.fromkeys(STAT_COLUMNS, 0))
+        for field in fields:
+            counts[field] += 1
+        payload = json.dumps(_stats)
+    folder = cache_dir / STATS_DIR
+    tmp = folder / f".{_tmp_suffix()}"
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(payload)
+        os.replace(tmp, folder / f"{os.getpid()}.json")
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def cache_stats(cache_dir: Path = config.SHARED_CACHE_DIR) -> pd.DataFrame:
+    """Hits, misses, waits and hit rate per function, summed over every process."""
+    totals = {}
+    for path in (cache_dir / STATS_DIR).glob("*.json"):
+        try:
+            counts = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, c in counts.items():
+            row = totals.setdefault(name, dict.fromkeys(STAT_COLUMNS, 0))
+            for field in STAT_COLUMNS:
+                row[field] += c.get(field, 0)
+    stats = pd.DataFrame.from_dict(totals, orient="index", columns=STAT_COLUMNS).rename_axis("Function")
+    stats["Hit rate"] = stats["Hits"] / (stats["Hits"] + stats["Misses"]).where(lambda n: n > 0)
+    stats["Entries"] = [len(_entries(cache_dir / name)) for name in stats.index]
+    return stats.sort_index()
+
+
+# ---------------------------------------------------------------------
+# Decorator
+# ---------------------------------------------------------------------
+def shared_cache(name: str, version=None, ttl: Optional[float] = None, max_entries: int = 8,
+                 lease: float = config.SHARED_CACHE_LEASE_SECONDS,
+                 cache_dir: Path = config.SHARED_CACHE_DIR):
+    """
+    Share the results of a function returning frames (or a tuple / dict of them)
+    between processes. `version` is hashed into every key: entries outlive restarts
+    and deploys, so bump it whenever the code the function calls changes. `ttl`
+    (seconds) expires entries of time-dependent data, `max_entries` bounds the
+    entries kept on disk for the function, and `lease` bounds how long other
+    workers wait on the one computing.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(func, args, kwargs, version)
+            folder = cache_dir / name
+            folder.mkdir(parents=True, exist_ok=True)
+            entry, lock = folder / key, folder / f"{key}.lock"
+            waited = False
+            while True:
+                value = _load(entry, ttl)
+                if value is not None:
+                    _count(cache_dir, name, "Hits", *(["Waits"] if waited else []))
+                    return value
+                if _acquire(lock, lease):
+                    try:
+                        value = func(*args, **kwargs)
+                        _store(value, entry, max_entries)
+                    finally:
+                        _release(lock)
+                    _count(cache_dir, name, "Misses")
+                    return value
+                waited = True
+                time.sleep(POLL_SECONDS)
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["clear"]:
+        shutil.rmtree(config.SHARED_CACHE_DIR, ignore_errors=True)
+        print(f"Cleared {config.SHARED_CACHE_DIR}")
+    else:
+        print(cache_stats().to_string())
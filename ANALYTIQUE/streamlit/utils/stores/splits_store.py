@@ -0,0 +1,116 @@
+"""
+Local splits: the workbook's "Copy splits" sheet merged with optional Yahoo refreshes.
+
+Offline refresh (run from the streamlit/ folder):
+    python -m utils.stores.splits_store
+
+Writes to config.SPLITS_STORE_DIR:
+  - splits.parquet  Date / Ticker / SplitFactor / Source ("Workbook" or "Yahoo")
+  - manifest.json   workbook version, as-of time of the last remote refresh
+
+The workbook sheet is re-read only when the workbook changes; remote events are
+kept across rebuilds and only added for (ticker, date) pairs the workbook lacks.
+Readers never call the API.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+import config
+from utils.loaders.api.load_raw_splits import load_splits
+from utils.loaders.load_raw_splits import load_workbook_splits
+from utils.stores.versions import file_digest, replace_file
+from utils.transforms.normalize_tickers import normalize_etf_ticker
+
+# Bump when the layout changes
+STORE_VERSION = 1
+SPLITS_FILE = "splits.parquet"
+MANIFEST = "manifest.json"
+SPLIT_COLUMNS = ["Ticker", "SplitFactor", "Source"]
+
+
+def _read_manifest(out_dir: Path) -> Optional[dict]:
+    path = out_dir / MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    return manifest if manifest.get("store_version") == STORE_VERSION else None
+
+
+def _tagged(splits: pd.DataFrame, source: str) -> pd.DataFrame:
+    if splits.empty:
+        return pd.DataFrame(columns=SPLIT_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+    out = splits[["Ticker", "SplitFactor"]].copy()
+    out["Ticker"] = [normalize_etf_ticker(t) for t in out["Ticker"]]
+    out["Source"] = source
+    out.index = pd.DatetimeIndex(out.index, name="Date").normalize()
+    return out
+
+
+def merge_splits(workbook: pd.DataFrame, remote: pd.DataFrame) -> pd.DataFrame:
+    """Workbook events plus the remote ones on (ticker, date) pairs the workbook does not have."""
+    both = pd.concat([workbook, remote])
+    both = both[~both.reset_index().duplicated(["Date", "Ticker"], keep="first").to_numpy()]
+    return both.sort_index(kind="stable")[SPLIT_COLUMNS]
+
+
+def _write(splits: pd.DataFrame, manifest: dict, out_dir: Path) -> dict:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Each file is replaced whole: a concurrent reader gets the old splits or the new ones
+    replace_file(out_dir / SPLITS_FILE, splits.to_parquet)
+    manifest = {**manifest, "store_version": STORE_VERSION, "rows": len(splits),
+                "built_at": datetime.now().isoformat(timespec="seconds")}
+    replace_file(out_dir / MANIFEST, lambda tmp: tmp.write_text(json.dumps(manifest, indent=2)))
+    return manifest
+
+
+def read_splits_store(out_dir: Path = config.SPLITS_STORE_DIR) -> pd.DataFrame:
+    if _read_manifest(out_dir) is None:
+        return pd.DataFrame(columns=SPLIT_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+    return pd.read_parquet(out_dir / SPLITS_FILE)
+
+
+def ensure_splits_store(workbook: Path = config.TRANSACTION_FILE,
+                        out_dir: Path = config.SPLITS_STORE_DIR) -> dict:
+    """Manifest of the store, re-reading the workbook sheet first if the workbook changed."""
+    digest = file_digest(workbook)
+    manifest = _read_manifest(out_dir)
+    if manifest is not None and manifest["workbook"] == digest:
+        return manifest
+    remote = read_splits_store(out_dir)
+    remote = remote[remote["Source"] == "Yahoo"]
+    splits = merge_splits(_tagged(load_workbook_splits(workbook), "Workbook"), remote)
+    return _write(splits, {"workbook": digest, "remote_as_of": (manifest or {}).get("remote_as_of")}, out_dir)
+
+
+def refresh_remote_splits(tickers: list = config.TICKERS, workbook: Path = config.TRANSACTION_FILE,
+                          out_dir: Path = config.SPLITS_STORE_DIR) -> dict:
+    """Merge the splits of `tickers` from Yahoo into the store; on failure the store is left as is."""
+    manifest = ensure_splits_store(workbook, out_dir)
+    remote = load_splits(tickers)
+    if remote.empty:
+        print("Warning: no splits returned by Yahoo API, keeping the local splits")
+        return manifest
+    splits = merge_splits(read_splits_store(out_dir), _tagged(remote, "Yahoo"))
+    return _write(splits, {"workbook": manifest["workbook"],
+                           "remote_as_of": datetime.now().isoformat(timespec="seconds")}, out_dir)
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _cached_splits(out_dir: str, built_at: str) -> pd.DataFrame:
+    return read_splits_store(Path(out_dir))
+
+
+def load_local_splits(workbook: Path = config.TRANSACTION_FILE,
+                      out_dir: Path = config.SPLITS_STORE_DIR) -> tuple[pd.DataFrame, dict]:
+    """(splits, manifest) served from the local store."""
+    manifest = ensure_splits_store(workbook, out_dir)
+    return _cached_splits(str(out_dir), manifest["built_at"]), manifest
+
+
+if __name__ == "__main__":
+    print(json.dumps(refresh_remote_splits(), indent=2))
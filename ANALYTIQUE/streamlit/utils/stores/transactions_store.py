@@ -0,0 +1,96 @@
+"""
+Typed Parquet copy of the "Transactions" sheet of stock_final.xlsx.
+
+Written to config.TRANSACTIONS_STORE_DIR:
+  - transactions.parquet  Date / Type / Ticker / Price / Quantity / Value
+                          (datetime64, categorical Type and Ticker, float64)
+  - manifest.json         store version and content hash of the workbook
+
+The workbook is parsed only when its content hash changes. Readers in the app share
+one frame per workbook version (st.cache_resource): its numeric columns are views
+on the Arrow buffers, read-only, so copy before modifying.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+import config
+from utils.loaders.load_raw_transactions import load_transactions
+from utils.stores.versions import file_digest, replace_file
+
+# Bump when the schema or the parsing changes
+STORE_VERSION = 2
+TRANSACTIONS_FILE = "transactions.parquet"
+MANIFEST = "manifest.json"
+
+CATEGORY_COLUMNS = ["Type", "Ticker"]
+FLOAT_COLUMNS = ["Price", "Quantity", "Value"]
+
+
+def typed_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """Store schema: datetime64 "Date" index, categorical Type / Ticker, float64 amounts."""
+    df = df.copy()
+    df.index = pd.DatetimeIndex(df.index, name="Date").astype("datetime64[ns]")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+
+def build_transactions_store(workbook: Path = config.TRANSACTION_FILE,
+                             out_dir: Path = config.TRANSACTIONS_STORE_DIR) -> dict:
+    digest = file_digest(workbook)
+    tx = typed_transactions(load_transactions(workbook))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Both files are replaced whole: until the manifest is, it names the old workbook
+    # and readers rebuild rather than take the new file as theirs
+    table = pa.Table.from_pandas(tx, preserve_index=True)
+    replace_file(out_dir / TRANSACTIONS_FILE, lambda tmp: pq.write_table(table, tmp))
+    manifest = {
+        "store_version": STORE_VERSION,
+        "workbook": digest,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "rows": len(tx),
+    }
+    replace_file(out_dir / MANIFEST, lambda tmp: tmp.write_text(json.dumps(manifest, indent=2)))
+    return manifest
+
+
+def ensure_transactions_store(workbook: Path = config.TRANSACTION_FILE,
+                              out_dir: Path = config.TRANSACTIONS_STORE_DIR) -> str:
+    """Content hash of the workbook, rebuilding the store first if it was built from another version."""
+    digest = file_digest(workbook)
+    path = out_dir / MANIFEST
+    manifest = json.loads(path.read_text()) if path.exists() else {}
+    if manifest.get("store_version") != STORE_VERSION or manifest.get("workbook") != digest:
+        build_transactions_store(workbook, out_dir)
+    return digest
+
+
+def read_transactions_store(out_dir: Path = config.TRANSACTIONS_STORE_DIR) -> pd.DataFrame:
+    # split_blocks: one block per column, so float columns without nulls are zero-copy views
+    table = pq.read_table(out_dir / TRANSACTIONS_FILE)
+    return table.to_pandas(split_blocks=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _shared_transactions(out_dir: str, version: str) -> pd.DataFrame:
+    return read_transactions_store(Path(out_dir))
+
+
+def load_transactions_table(workbook: Path = config.TRANSACTION_FILE,
+                            out_dir: Path = config.TRANSACTIONS_STORE_DIR) -> pd.DataFrame:
+    """Typed transactions shared by every session; the workbook is re-parsed only when it changes."""
+    if not workbook.exists():
+        return pd.DataFrame()
+    version = ensure_transactions_store(workbook, out_dir)
+    return _shared_transactions(str(out_dir), version)
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file (empty string if missing)."""
+    path = Path(path)
+    if not path.exists():
+        return ""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index and column names)."""
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update("|".join(map(str, df.columns)).encode())
+    return h.hexdigest()[:16]
+
+
+def version_token(*parts) -> str:
+    """
+    Version of a derived dataset: the tokens / content hashes it is built from, its
+    transform version and its parameters. Cached functions take the frames as
+    `_`-prefixed arguments (not hashed by st.cache_* nor shared_cache) plus this
+    token, so a cache hit costs O(1) instead of hashing every frame.
+    """
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+def replace_file(path: Path, write: Callable[[Path], None]):
+    """
+    Write `path` through `write(tmp)` on a temporary file of the same folder, then
+    rename it over `path`: readers see the old file or the new one, never a partial one.
+    """
+    path = Path(path)
+    # Sessions are threads of one process: the pid alone does not make a name unique
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
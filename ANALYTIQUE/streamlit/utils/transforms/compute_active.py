@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+
+def benchmark_etf_values(etf_values: pd.DataFrame, benchmark_weights: dict) -> pd.DataFrame:
+    """Benchmark ETF values: the fund's total value each date split at the benchmark weights."""
+    total = etf_values.fillna(0.0).sum(axis=1).to_numpy()
+    w = pd.Series(benchmark_weights, dtype=float)
+    return pd.DataFrame(np.outer(total, w.to_numpy()), index=etf_values.index, columns=w.index)
+
+
+def category_weight_matrix(weights: pd.DataFrame, meta: pd.DataFrame, etfs: pd.Index,
+                           dimension: str) -> tuple[np.ndarray, pd.Index]:
+    """(ETF x category) weights of `dimension` from the sparse weight table."""
+    w = weights[weights["ETF Ticker"].isin(etfs)]
+    labels = meta[dimension].astype(object).fillna("Unknown").to_numpy()[meta.index.get_indexer(w["SecurityID"])]
+    codes, categories = pd.factorize(labels)
+    matrix = np.zeros((len(etfs), len(categories)))
+    np.add.at(matrix, (etfs.get_indexer(w["ETF Ticker"]), codes), w["Weight"].to_numpy())
+    return matrix, pd.Index(categories, name=dimension)
+
+
+def active_exposures(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                     benchmark_weights: dict, dimensions: list) -> dict:
+    """
+    Fund vs benchmark look-through weights for every date, per dimension:
+    {dimension: {"Fund", "Benchmark", "Active"}: dates x categories (fractions of total value)}.
+    Fund and benchmark ETF values are stacked into one matrix, so each dimension is a
+    single product through the same ETF -> category weights.
+    """
+    if etf_values.empty or weights.empty:
+        return {}
+    bench = benchmark_etf_values(etf_values, benchmark_weights)
+    etfs = etf_values.columns.union(bench.columns)
+    n = len(etf_values)
+    stacked = np.vstack([etf_values.reindex(columns=etfs).fillna(0.0).to_numpy(),
+                         bench.reindex(columns=etfs).fillna(0.0).to_numpy()])
+    total = stacked[:n].sum(axis=1, keepdims=True)
+    total = np.where(total > 0, total, np.nan)
+
+    out = {}
+    for dim in dimensions:
+        matrix, categories = category_weight_matrix(weights, meta, etfs, dim)
+        shares = (stacked @ matrix) / np.vstack([total, total])
+        fund = pd.DataFrame(shares[:n], index=etf_values.index, columns=categories).sort_index(axis=1)
+        benchmark = pd.DataFrame(shares[n:], index=etf_values.index, columns=categories).sort_index(axis=1)
+        out[dim] = {"Fund": fund, "Benchmark": benchmark, "Active": fund - benchmark}
+    return out
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from utils.transforms.compute_fixed_income import maturity_dates
+
+# Canadian and US bonds pay semi-annual coupons
+COUPONS_PER_YEAR = 2
+
+LADDER_COLUMNS = ["ETF Ticker", "Currency", "Month", "Coupon", "Principal", "Total"]
+
+
+def _months(dates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(months since 1970-01, day of month) of datetime64[D] values."""
+    months = dates.astype("datetime64[M]")
+    return months.astype(np.int64), (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+
+
+def bond_schedules(maturity: np.ndarray, coupon: np.ndarray, as_of: pd.Timestamp,
+                   frequency: int = COUPONS_PER_YEAR) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Remaining cash flows per unit of par for every bond, all bonds at once.
+    Payment dates step back from maturity every 12 / frequency months; flows dated
+    after `as_of` are kept. Schedules are expanded with repeat / cumsum, no loop.
+    Returns flat arrays (bond position, month offset from as_of's month, coupon, principal).
+    """
+    mat = maturity.astype("datetime64[D]")
+    valid = ~np.isnat(mat)
+    m_mat, d_mat = _months(np.where(valid, mat, np.datetime64("1970-01-01")))
+    m0, d0 = (int(x[0]) for x in _months(np.array([as_of], dtype="datetime64[D]")))
+
+    step = 12 // frequency
+    # Months from as_of to the last payment date after it (a payment in as_of's month counts if its day is later)
+    span = m_mat - m0 - (d_mat <= d0)
+    n = np.where(valid & (span >= 0), span // step + 1, 0)
+
+    bond = np.repeat(np.arange(len(mat)), n)
+    k = np.arange(len(bond)) - np.repeat(np.cumsum(n) - n, n)     # 0 = maturity, 1 = one period before...
+    offset = m_mat[bond] - m0 - step * k
+    cpn = np.nan_to_num(coupon, nan=0.0)[bond] / 100.0 / frequency
+    principal = (k == 0).astype(float)
+    return bond, offset, cpn, principal
+
+
+def cash_flow_ladder(etf_values: pd.Series, weights: pd.DataFrame, meta: pd.DataFrame,
+                     as_of: pd.Timestamp, horizon_months: int = None) -> pd.DataFrame:
+    """
+    Monthly coupon and principal ladder of the look-through bonds, as of one date.
+    Par held = ETF value x Par per unit of ETF value (weights table), so nested funds
+    and our share of each ETF are already applied. Amounts are in each bond's currency.
+    Returns long rows: ETF Ticker / Currency / Month / Coupon / Principal / Total.
+    """
+    values = etf_values[etf_values > 0]
+    w = weights[weights["ETF Ticker"].isin(values.index) & (weights["Par"] > 0)]
+    if w.empty:
+        return pd.DataFrame(columns=LADDER_COLUMNS)
+    rows = meta.index.get_indexer(w["SecurityID"])
+    par = w["Par"].to_numpy() * values.reindex(w["ETF Ticker"]).to_numpy()
+    coupon = pd.to_numeric(meta["Coupon (%)"], errors="coerce").to_numpy()[rows]
+    maturity = maturity_dates(meta).to_numpy()[rows]
+
+    bond, offset, cpn, principal = bond_schedules(maturity, coupon, as_of)
+    if horizon_months is not None:
+        keep = offset < horizon_months
+        bond, offset, cpn, principal = bond[keep], offset[keep], cpn[keep], principal[keep]
+    if len(bond) == 0:
+        return pd.DataFrame(columns=LADDER_COLUMNS)
+
+    # One integer key per (ETF, currency, month): bincount instead of a groupby
+    etf_codes, etfs = pd.factorize(w["ETF Ticker"].to_numpy())
+    cur_codes, curs = pd.factorize(meta["Currency"].astype(object).fillna("Unknown").to_numpy()[rows])
+    n_months = int(offset.max()) + 1
+    key = (etf_codes[bond] * len(curs) + cur_codes[bond]) * n_months + offset
+    size = len(etfs) * len(curs) * n_months
+    coupons = np.bincount(key, weights=par[bond] * cpn, minlength=size)
+    principals = np.bincount(key, weights=par[bond] * principal, minlength=size)
+
+    nz = np.flatnonzero((coupons != 0) | (principals != 0))
+    e, rest = np.divmod(nz, len(curs) * n_months)
+    c, m = np.divmod(rest, n_months)
+    m0 = np.datetime64(pd.Timestamp(as_of), "M").astype(np.int64)
+    ladder = pd.DataFrame({
+        "ETF Ticker": np.asarray(etfs, dtype=object)[e],
+        "Currency": np.asarray(curs, dtype=object)[c],
+        "Month": pd.to_datetime((m0 + m).astype("datetime64[M]")),
+        "Coupon": coupons[nz],
+        "Principal": principals[nz],
+    })
+    ladder["Total"] = ladder["Coupon"] + ladder["Principal"]
+    return ladder
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from utils.transforms.look_through import expand_fund_lines
+from utils.transforms.security_master import build_security_master
+
+UNDERLYER_DIMENSIONS = ["Sector", "Asset Class", "Location", "Currency"]
+
+
+def _safe_weights(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    if df["Weight (%)"].isna().all():
+        df["Weight (%)"] = 0.0
+    return df
+
+
+def etf_weight_matrix(lines: pd.DataFrame, etfs, n_securities: int) -> np.ndarray:
+    """
+    Dense (ETF x security) weight matrix, in fractions, from holding lines that
+    carry "ETF Ticker", "Security" codes and "Weight (%)". Duplicate lines are summed.
+    """
+    etfs = pd.Index(etfs)
+    W = np.zeros((len(etfs), n_securities))
+    etf_pos = etfs.get_indexer(lines["ETF Ticker"].astype(object))
+    keep = etf_pos >= 0
+    w = lines["Weight (%)"].fillna(0).to_numpy(dtype=float) / 100.0
+    np.add.at(W, (etf_pos[keep], lines["Security"].cat.codes.to_numpy()[keep]), w[keep])
+    return W
+
+
+def etf_market_values(holdings_qty: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """Dates x ETF market values for the ETFs that have both holdings and prices."""
+    common = holdings_qty.columns.intersection(prices.columns)
+    if common.empty:
+        return pd.DataFrame()
+    prices = prices.reindex(holdings_qty.index).ffill()
+    return holdings_qty[common] * prices[common]
+
+
+def prepare_lines(underlyers: pd.DataFrame, etfs) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Security master and holding lines of `etfs`, weights recalculated from Market Value.
+    Funds held by `etfs` are looked through recursively when their holdings are in `underlyers`.
+    """
+    under_df = _safe_weights(underlyers)
+
+    # --- Recalculate Weight (%) from Market Value within each ETF ---
+    if "Market Value" in under_df.columns:
+        mv_totals = under_df.groupby("ETF Ticker")["Market Value"].transform("sum")
+        under_df["Weight (%)"] = np.where(mv_totals > 0, under_df["Market Value"] / mv_totals * 100.0, 0.0)
+
+    # Composed once per snapshot: deeper nesting adds lines, not per-date work
+    under_df = expand_fund_lines(under_df, list(etfs))
+    return build_security_master(under_df)
+
+
+def weight_table(meta: pd.DataFrame, lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sparse ETF -> security weights (fractions): ETF Ticker / SecurityID / Weight / Par.
+    Par is the face amount held per unit of ETF value (bond lines, 0 otherwise).
+    """
+    weight = lines["Weight (%)"].fillna(0).to_numpy() / 100.0
+    par = np.zeros(len(lines))
+    if "Par Value" in lines.columns:
+        mv = lines["Market Value"].to_numpy(dtype=float)
+        par_mv = np.divide(lines["Par Value"].fillna(0).to_numpy(dtype=float), mv,
+                           out=np.zeros(len(lines)), where=mv > 0)
+        par = weight * par_mv
+    weights = (pd.DataFrame({
+                   "ETF Ticker": lines["ETF Ticker"].astype(object).to_numpy(),
+                   "SecurityID": meta.index.to_numpy()[lines["Security"].cat.codes.to_numpy()],
+                   "Weight": weight,
+                   "Par": par,
+               })
+               .groupby(["ETF Ticker", "SecurityID"], as_index=False)[["Weight", "Par"]].sum())
+    return weights[weights["Weight"] != 0].reset_index(drop=True)
+
+
+def compute_underlyer_exposures(
+    holdings_qty: pd.DataFrame,
+    prices: pd.DataFrame,
+    underlyers: pd.DataFrame
+):
+    """
+    Look-through exposures.
+    Returns (values_matrix, meta, long):
+      - values_matrix: dates x SecurityID exposure values
+      - meta: security master (one row per SecurityID)
+      - long: non-zero exposures as Date / Security (categorical codes into meta) / Exposure
+    """
+    if holdings_qty.empty:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    etf_values = etf_market_values(holdings_qty, prices)
+    if etf_values.empty:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    meta, lines = prepare_lines(underlyers, etf_values.columns)
+    W = etf_weight_matrix(lines, etf_values.columns, len(meta))
+    values = etf_values.fillna(0.0).to_numpy() @ W
+    values_matrix = pd.DataFrame(values, index=etf_values.index, columns=meta.index)
+
+    # Row-major non-zeros: each date's exposures are contiguous
+    rows, cols = np.nonzero(values)
+    long = pd.DataFrame({
+        "Date": etf_values.index[rows],
+        "Security": pd.Categorical.from_codes(cols.astype(np.int32), categories=meta.index),
+        "Exposure": values[rows, cols],
+    })
+    return values_matrix, meta, long
+
+
+def aggregate_dimension(long_df: pd.DataFrame, meta: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Dates x categories of `dimension`, grouped on integer codes."""
+    if long_df.empty:
+        return pd.DataFrame()
+    labels = meta[dimension].astype(object).fillna("Unknown")
+    dim_codes, dim_labels = pd.factorize(labels)
+    row_codes = dim_codes[long_df["Security"].cat.codes.to_numpy()]
+    agg = (long_df["Exposure"]
+              .groupby([long_df["Date"].to_numpy(), row_codes]).sum()
+              .unstack(fill_value=0.0))
+    agg.columns = pd.Index(dim_labels[agg.columns], name=dimension)
+    agg.index.name = "Date"
+    return agg.sort_index(axis=1).sort_index()
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Years to maturity
+MATURITY_EDGES = [0, 1, 3, 5, 7, 10, 20, np.inf]
+MATURITY_LABELS = ["0-1", "1-3", "3-5", "5-7", "7-10", "10-20", "20+"]
+DAYS_PER_YEAR = 365.25
+
+FI_METRICS = ["Notional", "Duration", "Coupon (%)", "Current Yield (%)", "Years to Maturity"]
+
+
+def is_fixed_income(df: pd.DataFrame) -> pd.Series:
+    return df["Duration"].notna() | df["Coupon (%)"].notna()
+
+
+def maturity_dates(meta: pd.DataFrame) -> pd.Series:
+    """Maturity as datetime ("Jun 01, 2030" in the BlackRock files), NaT when missing."""
+    raw = meta["Maturity"].astype(object)
+    parsed = pd.to_datetime(raw, format="%b %d, %Y", errors="coerce")
+    retry = parsed.isna() & raw.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(raw[retry], format="mixed", errors="coerce")
+    return parsed
+
+
+def security_fixed_income(meta: pd.DataFrame) -> pd.DataFrame:
+    """Per-security FI attributes (NaN for non fixed income): Duration, Coupon, Current Yield, Maturity."""
+    fi = is_fixed_income(meta)
+    coupon = pd.to_numeric(meta["Coupon (%)"], errors="coerce")
+    price = pd.to_numeric(meta["Price"], errors="coerce") if "Price" in meta.columns else pd.Series(np.nan, index=meta.index)
+    return pd.DataFrame({
+        "Duration": pd.to_numeric(meta["Duration"], errors="coerce"),
+        "Coupon (%)": coupon,
+        # Coupon over clean price (per 100 par): a yield proxy, as the files carry no YTM
+        "Current Yield (%)": (coupon / price * 100.0).where(price > 0),
+        "Maturity": maturity_dates(meta),
+    }, index=meta.index).where(fi, axis=0)
+
+
+def fixed_income_series(etf_values: pd.DataFrame, weights: pd.DataFrame,
+                        meta: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Portfolio FI analytics for every date, from ETF values and the sparse weights.
+    Each metric is an exposure-weighted average over the securities where it is known;
+    the per-ETF weighted sums are built once, so every date is one (dates x ETF) product.
+    Maturity buckets move with the date: lines are sorted by maturity and each ETF's
+    cumulative weight is read at date + bucket edge (searchsorted), no per-date filtering.
+    Returns (metrics: dates x FI_METRICS, buckets: dates x MATURITY_LABELS exposure).
+    """
+    if etf_values.empty or weights.empty:
+        return pd.DataFrame(columns=FI_METRICS), pd.DataFrame(columns=MATURITY_LABELS)
+    attrs = security_fixed_income(meta)
+    w = weights[weights["ETF Ticker"].isin(etf_values.columns)]
+    etf_pos = etf_values.columns.get_indexer(w["ETF Ticker"])
+    attrs = attrs.iloc[meta.index.get_indexer(w["SecurityID"])]
+    line_w = w["Weight"].to_numpy()
+    n_etf = etf_values.shape[1]
+    values = etf_values.fillna(0.0).to_numpy()
+    dates = etf_values.index
+
+    def etf_sum(x):
+        return np.bincount(etf_pos, weights=x, minlength=n_etf)
+
+    fi = attrs["Duration"].notna().to_numpy() | attrs["Coupon (%)"].notna().to_numpy()
+    metrics = pd.DataFrame({"Notional": values @ etf_sum(line_w * fi)}, index=dates)
+    for col in ["Duration", "Coupon (%)", "Current Yield (%)"]:
+        x = attrs[col].to_numpy()
+        known = ~np.isnan(x)
+        num = values @ etf_sum(np.where(known, line_w * x, 0.0))
+        den = values @ etf_sum(line_w * known)
+        metrics[col] = np.divide(num, den, out=np.full(len(dates), np.nan), where=den > 0)
+
+    # Days from the epoch: sum(w * (m - t)) = sum(w * m) - t * sum(w)
+    mat = attrs["Maturity"].to_numpy(dtype="datetime64[D]")
+    has_mat = ~np.isnat(mat)
+    mat_int = np.where(has_mat, mat.astype(np.int64), 0)
+    t_days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    wm = values @ etf_sum(line_w * mat_int)
+    wk = values @ etf_sum(line_w * has_mat)
+    metrics["Years to Maturity"] = np.divide(wm - t_days * wk, wk * DAYS_PER_YEAR,
+                                             out=np.full(len(dates), np.nan), where=wk > 0)
+
+    order = np.argsort(mat_int[has_mat], kind="stable")
+    mat_sorted = mat_int[has_mat][order]
+    cum = np.zeros((n_etf, len(order) + 1))
+    cum[etf_pos[has_mat][order], np.arange(1, len(order) + 1)] = line_w[has_mat][order]
+    cum = np.cumsum(cum, axis=1)
+    thresholds = t_days[:, None] + np.array(MATURITY_EDGES)[None, :] * DAYS_PER_YEAR
+    idx = np.searchsorted(mat_sorted, thresholds, side="left")           # dates x edges
+    at_edges = np.einsum("te,etk->tk", values, cum[:, idx])              # cumulative exposure
+    buckets = pd.DataFrame(np.diff(at_edges, axis=1), index=dates, columns=MATURITY_LABELS)
+    return metrics, buckets
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Fund currency of the ETFs and of every exposure value
+BASE_CURRENCY = "CAD"
+
+
+def currency_labels(meta: pd.DataFrame) -> pd.Series:
+    return meta["Currency"].astype(object).fillna("Unknown")
+
+
+def snapshot_fx_rates(meta: pd.DataFrame) -> pd.Series:
+    """CAD per unit of each currency from the holdings "FX Rate" (median per currency)."""
+    if "FX Rate" not in meta.columns:
+        return pd.Series({BASE_CURRENCY: 1.0})
+    rates = pd.to_numeric(meta["FX Rate"], errors="coerce")
+    rates = rates.where(rates > 0).groupby(currency_labels(meta).to_numpy()).median()
+    rates[BASE_CURRENCY] = 1.0
+    return rates
+
+
+def fx_rate_matrix(dates: pd.DatetimeIndex, snapshot_rates: pd.Series,
+                   history: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Dates x currency FX matrix (CAD per unit). Daily history is used where available
+    (carried forward), the holdings snapshot rates fill the rest; unknown rates are NaN.
+    """
+    fx = pd.DataFrame(np.tile(snapshot_rates.to_numpy(), (len(dates), 1)),
+                      index=dates, columns=snapshot_rates.index)
+    if history is not None and not history.empty:
+        hist = history.reindex(columns=fx.columns.intersection(history.columns))
+        hist = hist.reindex(hist.index.union(dates)).ffill().reindex(dates)
+        fx.update(hist)
+    fx[BASE_CURRENCY] = 1.0
+    return fx
+
+
+def fx_rate_gaps(snapshot_rates: pd.Series, history: pd.DataFrame = None) -> dict:
+    """
+    Currencies the FX matrix cannot convert at daily rates:
+    "no_history": no daily rate, the holdings snapshot rate is used for every date;
+    "no_rate": no rate at all, their local amounts are NaN.
+    """
+    has_history = history.notna().any() if history is not None and not history.empty else pd.Series(dtype=bool)
+    foreign = snapshot_rates.drop(BASE_CURRENCY, errors="ignore")
+    no_daily = [c for c in foreign.index if not has_history.get(c, False)]
+    return {
+        "no_history": [c for c in no_daily if pd.notna(foreign[c])],
+        "no_rate": [c for c in no_daily if pd.isna(foreign[c])],
+    }
+
+
+def currency_exposures(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                       hedged_etfs=()) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Dates x currency exposure in CAD, (economic, net of hedges).
+    Economic: by currency of the underlying. Net: the foreign currency held through
+    CAD-hedged ETFs is moved back to CAD. Built from an (ETF x currency) weight matrix,
+    so every date is one product.
+    """
+    if etf_values.empty or weights.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    w = weights[weights["ETF Ticker"].isin(etf_values.columns)]
+    cur_codes, curs = pd.factorize(currency_labels(meta).to_numpy()[meta.index.get_indexer(w["SecurityID"])])
+    etf_pos = etf_values.columns.get_indexer(w["ETF Ticker"])
+    by_currency = np.zeros((etf_values.shape[1], len(curs)))
+    np.add.at(by_currency, (etf_pos, cur_codes), w["Weight"].to_numpy())
+
+    values = etf_values.fillna(0.0).to_numpy()
+    economic = pd.DataFrame(values @ by_currency, index=etf_values.index, columns=pd.Index(curs, name="Currency"))
+    hedged = etf_values.columns.isin(list(hedged_etfs))
+    hedged_part = values[:, hedged] @ by_currency[hedged]
+    net = economic - hedged_part
+    if BASE_CURRENCY not in net.columns:
+        net[BASE_CURRENCY] = 0.0
+        economic[BASE_CURRENCY] = 0.0
+    net[BASE_CURRENCY] += hedged_part.sum(axis=1)
+    return economic.sort_index(axis=1), net.sort_index(axis=1)
+
+
+def to_local_amounts(exposure_cad: pd.DataFrame, fx: pd.DataFrame) -> pd.DataFrame:
+    """CAD exposures per currency in units of that currency: one broadcast divide."""
+    rates = fx.reindex(index=exposure_cad.index, columns=exposure_cad.columns).to_numpy()
+    return pd.DataFrame(exposure_cad.to_numpy() / rates, index=exposure_cad.index, columns=exposure_cad.columns)
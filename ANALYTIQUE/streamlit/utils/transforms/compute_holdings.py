@@ -1,20 +1,69 @@
 from typing import Callable
+import numpy as np
 import pandas as pd
 
-def _pre_aggregate(df: pd.DataFrame) -> pd.DataFrame:
+# Funds of the app; Global holds every transaction, the others filter on Type
+FUNDS = ["Global", "Strategic", "Tactic"]
+CHANGE_COLUMNS = ["Fund", "Ticker", "Date", "Position"]
+
+def _fund_transactions(df: pd.DataFrame, fund: str) -> pd.DataFrame:
+    if fund in ("Strategic", "Tactic"):
+        return df[df['Type'] == fund]
+    return df
+
+def position_changes(df: pd.DataFrame, funds: list = FUNDS, base: pd.Series = None) -> pd.DataFrame:
     """
-    Aggregate transactions to daily net quantity per ticker.
-    Expects df indexed by date and having 'Ticker' and 'Quantity' columns.
+    Change points of the cumulative position of every (fund, ticker): one row per date
+    with a trade, Fund / Ticker / Date / Position. `base` (indexed by Fund, Ticker)
+    seeds the positions, so transactions appended later continue an existing ledger.
     """
-    # ensure columns present
-    df = df.copy()
     if 'Ticker' not in df.columns or 'Quantity' not in df.columns:
         raise ValueError("Ticker and Quantity must be present")
-    # group by date (index) and ticker
-    g = (df.groupby([df.index.date, 'Ticker'])['Quantity']
-           .sum().unstack(fill_value=0.0))
-    g.index = pd.to_datetime(g.index)
-    return g.sort_index()
+    parts = []
+    for fund in funds:
+        work = _fund_transactions(df, fund)
+        parts.append(pd.DataFrame({
+            "Fund": fund,
+            "Ticker": work['Ticker'].astype(object).to_numpy(),
+            "Date": work.index.normalize(),
+            "Quantity": work['Quantity'].to_numpy(dtype=float),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    net = (pd.concat(parts, ignore_index=True)
+             .groupby(["Fund", "Ticker", "Date"], sort=True)["Quantity"].sum()
+             .reset_index())
+    net["Position"] = net.groupby(["Fund", "Ticker"], sort=False)["Quantity"].cumsum()
+    if base is not None and not base.empty:
+        seed = base.reindex(pd.MultiIndex.from_frame(net[["Fund", "Ticker"]])).fillna(0.0)
+        net["Position"] += seed.to_numpy()
+    return net[CHANGE_COLUMNS]
+
+def ledger_matrix(changes: pd.DataFrame, fund: str) -> tuple[np.ndarray, pd.Index, np.ndarray]:
+    """
+    (change dates, tickers, positions) of one fund: positions[i] holds every ticker's
+    position from dates[i] until the next change date.
+    """
+    sub = changes[changes["Fund"] == fund]
+    if sub.empty:
+        return np.array([], dtype="datetime64[ns]"), pd.Index([], name="Ticker"), np.zeros((0, 0))
+    wide = sub.pivot(index="Date", columns="Ticker", values="Position").sort_index().ffill().fillna(0.0)
+    return wide.index.to_numpy(), pd.Index(wide.columns.astype(object), name="Ticker"), wide.to_numpy()
+
+def holdings_window(dates: np.ndarray, tickers: pd.Index, positions: np.ndarray,
+                    start: pd.Timestamp, end: pd.Timestamp,
+                    trading_days_func: Callable[[pd.Timestamp, pd.Timestamp], pd.DatetimeIndex]) -> pd.DataFrame:
+    """
+    Holdings on every trading day of [start, end] (from the first trade): a binary search per day.
+    A trade dated on a non-trading day (weekend, holiday) counts from the next trading day.
+    """
+    if len(dates) == 0:
+        return pd.DataFrame()
+    first = pd.Timestamp(dates[0])
+    days = trading_days_func(max(first, pd.Timestamp(start).normalize()), end)
+    days = days[(days >= start) & (days <= end)]
+    rows = np.searchsorted(dates, days.to_numpy(), side="right") - 1
+    return pd.DataFrame(positions[rows], index=days, columns=tickers)
 
 def build_holdings(df: pd.DataFrame,
                    start: pd.Timestamp,
@@ -22,27 +71,17 @@ def build_holdings(df: pd.DataFrame,
                    fund: str,
                    trading_days_func: Callable[[pd.Timestamp, pd.Timestamp], pd.DatetimeIndex]) -> pd.DataFrame:
     """
-    Build holdings timeseries (cumulative sum of daily net quantities) for selected fund.
+    Build holdings timeseries (cumulative positions) for selected fund.
     Parameter trading_days_func is injected for testability.
+    For repeated windows use the persisted ledger (utils.stores.holdings_ledger).
     """
     if df is None or df.empty:
         return pd.DataFrame()
 
-    # fund filter
-    if fund == "Strategic":
-        work = df[df['Type'] == 'Strategic']
-    elif fund == "Tactic":
-        work = df[df['Type'] == 'Tactic']
-    else:
-        work = df
-
+    work = _fund_transactions(df, fund)
     if work.empty:
         return pd.DataFrame()
 
-    grouped = _pre_aggregate(work)
-    first_date = grouped.index.min().normalize()
-    trading_days = trading_days_func(first_date, end)  # injected
-    grouped = grouped.reindex(trading_days, fill_value=0.0)
-    holdings_full = grouped.cumsum()
-    # slice by requested window
-    return holdings_full.loc[start:end]
+    changes = position_changes(work, funds=[fund])
+    dates, tickers, positions = ledger_matrix(changes, fund)
+    return holdings_window(dates, tickers, positions, start, end, trading_days_func)
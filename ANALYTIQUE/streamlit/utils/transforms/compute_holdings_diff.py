@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from utils.transforms.security_master import security_ids
+
+CHANGE_COLUMNS = ["ETF Ticker", "From", "To", "Change", "SecurityID", "Ticker", "Name",
+                  "Weight Before", "Weight After", "Delta"]
+
+
+def _keyed_snapshot(snapshot: pd.DataFrame, ids: np.ndarray) -> dict:
+    """
+    {ETF: (sorted SecurityIDs, weights, Ticker, Name)} for one holdings snapshot.
+    Weights are fractions of the ETF (duplicate lines of a security are summed).
+    """
+    weights = snapshot["Weight (%)"].fillna(0).to_numpy(dtype=float) / 100.0
+    etfs = snapshot["ETF Ticker"].astype(object).to_numpy()
+    tickers = snapshot["Ticker"].astype(object).to_numpy()
+    names = snapshot["Name"].astype(object).to_numpy()
+    out = {}
+    for etf in pd.unique(etfs):
+        rows = np.flatnonzero(etfs == etf)
+        uniq, first, inverse = np.unique(ids[rows], return_index=True, return_inverse=True)
+        w = np.bincount(inverse, weights=weights[rows], minlength=len(uniq))
+        out[etf] = (uniq, w, tickers[rows][first], names[rows][first])
+    return out
+
+
+def _diff_keyed(before: tuple, after: tuple, tol: float) -> tuple:
+    """Sorted-merge diff of one ETF between two snapshots."""
+    ids_b, w_b, tk_b, nm_b = before
+    ids_a, w_a, tk_a, nm_a = after
+    _, ib, ia = np.intersect1d(ids_b, ids_a, assume_unique=True, return_indices=True)
+    dropped = np.ones(len(ids_b), dtype=bool)
+    dropped[ib] = False
+    added = np.ones(len(ids_a), dtype=bool)
+    added[ia] = False
+    delta = w_a[ia] - w_b[ib]
+    moved = np.abs(delta) > tol
+
+    turnover = 0.5 * (np.abs(delta).sum() + w_b[dropped].sum() + w_a[added].sum())
+    rows = {
+        "Change": np.r_[np.full(added.sum(), "Added"), np.full(dropped.sum(), "Dropped"),
+                        np.full(moved.sum(), "Reweighted")].astype(object),
+        "SecurityID": np.r_[ids_a[added], ids_b[dropped], ids_a[ia][moved]],
+        "Ticker": np.r_[tk_a[added], tk_b[dropped], tk_a[ia][moved]],
+        "Name": np.r_[nm_a[added], nm_b[dropped], nm_a[ia][moved]],
+        "Weight Before": np.r_[np.zeros(added.sum()), w_b[dropped], w_b[ib][moved]],
+        "Weight After": np.r_[w_a[added], np.zeros(dropped.sum()), w_a[ia][moved]],
+    }
+    return rows, int(added.sum()), int(dropped.sum()), turnover
+
+
+def _diff_sequence(labels: list, snapshots: list, tol: float) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Key every snapshot in one pass: each distinct security is hashed once
+    ids = security_ids(pd.concat(snapshots, ignore_index=True)) if snapshots else np.empty(0, dtype=np.int64)
+    bounds = np.cumsum([0] + [len(s) for s in snapshots])
+    keyed = [_keyed_snapshot(s, ids[b:e]) for s, b, e in zip(snapshots, bounds, bounds[1:])]
+    empty = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=object), np.empty(0, dtype=object))
+
+    changes, turnover = [], []
+    for d0, d1, k0, k1 in zip(labels, labels[1:], keyed, keyed[1:]):
+        for etf in sorted(set(k0) | set(k1)):
+            rows, n_added, n_dropped, to = _diff_keyed(k0.get(etf, empty), k1.get(etf, empty), tol)
+            turnover.append({"ETF Ticker": etf, "From": d0, "To": d1,
+                             "Added": n_added, "Dropped": n_dropped, "Turnover": to})
+            if len(rows["SecurityID"]):
+                changes.append(pd.DataFrame({"ETF Ticker": etf, "From": d0, "To": d1, **rows}))
+
+    changes = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=CHANGE_COLUMNS[:-1])
+    changes["Delta"] = changes["Weight After"] - changes["Weight Before"]
+    return changes[CHANGE_COLUMNS], pd.DataFrame(turnover)
+
+
+def diff_holdings_series(snapshots: dict, tol: float = 1e-4) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Diff consecutive holdings snapshots ({as-of date: fetch_all_holdings frame}).
+    Every snapshot is keyed once (sorted integer SecurityIDs per ETF); each pair is
+    then a sorted merge per ETF, no string joins.
+    Returns:
+      - changes: one row per added / dropped security, and per weight move above `tol`
+      - turnover: ETF Ticker / From / To / Added / Dropped / Turnover (0.5 x sum |dw|)
+    """
+    dates = sorted(snapshots)
+    return _diff_sequence(dates, [snapshots[d] for d in dates], tol)
+
+
+def diff_holdings(before: pd.DataFrame, after: pd.DataFrame, tol: float = 1e-4) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Diff two snapshots (see diff_holdings_series); From / To are "before" / "after"."""
+    return _diff_sequence(["before", "after"], [before, after], tol)
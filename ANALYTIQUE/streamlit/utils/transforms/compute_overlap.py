@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Share classes of one company are one issuer ("ALPHABET INC CLASS A" / "CLASS C")
+_SHARE_CLASS = r"\s+(CLASS|CL)\s+[A-Z]$"
+
+ISSUER_COLUMNS = ["Date", "Rank", "Issuer", "Exposure", "Share"]
+
+
+def etf_overlap_matrix(weights: pd.DataFrame) -> pd.DataFrame:
+    """
+    ETF x ETF overlap: sum over securities of min(w_i, w_j).
+    Built from the sparse weight table (ETF Ticker / SecurityID / Weight): only
+    securities held by two ETFs or more produce pairs, so the cost follows the
+    number of shared lines, not ETFs x securities.
+    """
+    if weights.empty:
+        return pd.DataFrame()
+    etf_codes, etfs = pd.factorize(weights["ETF Ticker"], sort=True)
+    sec_codes, _ = pd.factorize(weights["SecurityID"])
+    w = pd.DataFrame({"etf": etf_codes, "sec": sec_codes, "w": weights["Weight"].to_numpy()})
+    w = w.groupby(["etf", "sec"], as_index=False)["w"].sum()
+
+    n = len(etfs)
+    overlap = np.zeros((n, n))
+    np.add.at(overlap, (w["etf"].to_numpy(), w["etf"].to_numpy()), w["w"].to_numpy())
+
+    shared = w[w["sec"].duplicated(keep=False)]
+    pairs = shared.merge(shared, on="sec")
+    pairs = pairs[pairs["etf_x"] < pairs["etf_y"]]
+    if not pairs.empty:
+        mins = np.minimum(pairs["w_x"].to_numpy(), pairs["w_y"].to_numpy())
+        sums = pd.Series(mins).groupby([pairs["etf_x"].to_numpy(), pairs["etf_y"].to_numpy()]).sum()
+        i, j = (np.asarray(level) for level in zip(*sums.index))
+        overlap[i, j] = sums.to_numpy()
+        overlap[j, i] = sums.to_numpy()
+    return pd.DataFrame(overlap, index=pd.Index(etfs, name="ETF"), columns=pd.Index(etfs, name="ETF"))
+
+
+def issuer_labels(meta: pd.DataFrame) -> pd.Series:
+    """Issuer of each security (SecurityID -> label), from the security name."""
+    names = meta["Name"].astype(object).fillna(meta["Ticker"].astype(object)).fillna("Unknown")
+    return names.astype(str).str.upper().str.strip().str.replace(_SHARE_CLASS, "", regex=True)
+
+
+def issuer_concentration(etf_values: pd.DataFrame, weights: pd.DataFrame, meta: pd.DataFrame,
+                         top_n: int = 10, block: int = 64) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Top-N issuers by look-through exposure for every date.
+    Dates are processed in blocks: each block is (dates x lines) from the sparse
+    weights, reduced to (dates x issuers) with reduceat, so no ETF x issuer or
+    full dates x issuers matrix is built.
+    Returns (top: Date / Rank / Issuer / Exposure / Share, top_share: Series by date).
+    """
+    empty = pd.DataFrame(columns=ISSUER_COLUMNS), pd.Series(dtype=float)
+    if etf_values.empty or weights.empty or top_n < 1:
+        return empty
+    issuers = issuer_labels(meta)
+    w = weights[weights["ETF Ticker"].isin(etf_values.columns)]
+    if w.empty:
+        # No line of the held ETFs: nothing for reduceat to reduce
+        return empty
+    issuer_codes, issuer_names = pd.factorize(issuers.reindex(w["SecurityID"]).fillna("Unknown").to_numpy())
+    order = np.argsort(issuer_codes, kind="stable")
+    issuer_codes = issuer_codes[order]
+    etf_pos = etf_values.columns.get_indexer(w["ETF Ticker"])[order]
+    line_w = w["Weight"].to_numpy()[order]
+    starts = np.flatnonzero(np.r_[True, issuer_codes[1:] != issuer_codes[:-1]])
+    groups = issuer_codes[starts]
+
+    values = etf_values.fillna(0.0).to_numpy()
+    k = min(top_n, len(groups))
+    top_idx = np.empty((len(values), k), dtype=np.int64)
+    top_val = np.empty((len(values), k))
+    totals = values @ np.bincount(etf_pos, weights=line_w, minlength=values.shape[1])
+    for b in range(0, len(values), block):
+        by_issuer = np.add.reduceat(values[b:b + block][:, etf_pos] * line_w, starts, axis=1)
+        part = np.argpartition(by_issuer, -k, axis=1)[:, -k:]
+        part_val = np.take_along_axis(by_issuer, part, axis=1)
+        rank = np.argsort(-part_val, axis=1)
+        top_idx[b:b + block] = groups[np.take_along_axis(part, rank, axis=1)]
+        top_val[b:b + block] = np.take_along_axis(part_val, rank, axis=1)
+
+    dates = np.repeat(etf_values.index.to_numpy(), k)
+    share = np.divide(top_val, totals[:, None], out=np.zeros_like(top_val), where=totals[:, None] > 0)
+    top = pd.DataFrame({
+        "Date": dates,
+        "Rank": np.tile(np.arange(1, k + 1), len(values)),
+        "Issuer": np.asarray(issuer_names, dtype=object)[top_idx.ravel()],
+        "Exposure": top_val.ravel(),
+        "Share": share.ravel(),
+    })
+    top_share = pd.Series(share.sum(axis=1), index=etf_values.index, name=f"Top {k} share")
+    return top, top_share
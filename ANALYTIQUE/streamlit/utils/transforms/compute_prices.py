@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Resample rule of each frequency offered in the app (None = daily as stored)
+FREQUENCIES = {"D": None, "W": "W", "M": "ME"}
+
+
+def resample_prices(prices: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Last price of each period, carried forward after each series' first price."""
+    rule = FREQUENCIES[freq]
+    out = prices if rule is None else prices.resample(rule).last()
+    return out.dropna(how="all").ffill()
+
+
+def derived_series(prices: pd.DataFrame) -> dict[str, dict[str, pd.DataFrame]]:
+    """
+    {freq: {"Prices", "Log returns", "Index"}} for every frequency, built once per
+    price version. "Index" is the compounded growth of 1 since each series' first
+    price, so any window is rebased with one division (see rebase_index).
+    """
+    out = {}
+    for freq in FREQUENCIES:
+        p = resample_prices(prices, freq)
+        log_returns = np.log(p).diff()
+        out[freq] = {
+            "Prices": p,
+            "Log returns": log_returns,
+            "Index": np.exp(log_returns.fillna(0.0).cumsum()).where(p.notna()),
+        }
+    return out
+
+
+def simple_returns(log_returns: pd.DataFrame) -> pd.DataFrame:
+    return np.expm1(log_returns)
+
+
+def rebase_index(index: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Compounded cumulative return over [start, end]: index / index at the first date of
+    the window - 1. A series starting later is based on its first price, where the
+    index is exactly 1.
+    """
+    window = index.loc[start:end]
+    if window.empty:
+        return window
+    base = np.nan_to_num(window.iloc[0].to_numpy(), nan=1.0)
+    return window / base - 1
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+
+def holdings_returns(holdings_qty: pd.DataFrame, prices: pd.DataFrame) -> pd.Series:
+    """
+    Daily return of a book of holdings: the previous day's positions repriced,
+    (Q_t-1 . P_t) / (Q_t-1 . P_t-1) - 1, so the trades of a day are flows, not returns.
+    Tickers without prices are left out; NaN on the first day and while the book is empty.
+    """
+    common = holdings_qty.columns.intersection(prices.columns)
+    qty = holdings_qty[common].shift(1).to_numpy(dtype=float)
+    px = prices.reindex(index=holdings_qty.index, columns=common).to_numpy(dtype=float)
+    before = np.nansum(qty[1:] * px[:-1], axis=1)
+    after = np.nansum(qty[1:] * px[1:], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(before > 0, after / before - 1, np.nan)
+    return pd.Series(np.concatenate([[np.nan], returns]), index=holdings_qty.index)
@@ -0,0 +1,89 @@
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.transforms.compute_fixed_income import security_fixed_income
+from utils.transforms.compute_fx import BASE_CURRENCY
+
+RATES_FACTOR = "Rates"
+
+
+def factor_exposures(etf_values: pd.Series, weights: pd.DataFrame, meta: pd.DataFrame,
+                     dimensions: list, hedged_etfs=()) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Exposure matrix on one date: positions (ETF line of a security) x factors.
+    A "<Dimension>=<Category>" column holds the position value when it belongs to the
+    category; "Rates" holds -value x duration / 10,000 (P&L per bp). Currency exposure
+    held through CAD-hedged ETFs loads on CAD.
+    Returns (positions: ETF Ticker / SecurityID / Value, X: positions x factors).
+    """
+    values = etf_values[etf_values > 0]
+    w = weights[weights["ETF Ticker"].isin(values.index)]
+    rows = meta.index.get_indexer(w["SecurityID"])
+    value = w["Weight"].to_numpy() * values.reindex(w["ETF Ticker"]).to_numpy()
+    positions = pd.DataFrame({"ETF Ticker": w["ETF Ticker"].to_numpy(),
+                              "SecurityID": w["SecurityID"].to_numpy(), "Value": value})
+
+    blocks, names = [], []
+    for dim in dimensions:
+        labels = meta[dim].astype(object).fillna("Unknown").to_numpy()[rows]
+        if dim == "Currency":
+            labels = np.where(positions["ETF Ticker"].isin(list(hedged_etfs)), BASE_CURRENCY, labels)
+        codes, categories = pd.factorize(labels)
+        block = np.zeros((len(value), len(categories)))
+        block[np.arange(len(value)), codes] = value
+        blocks.append(block)
+        names += [f"{dim}={c}" for c in categories]
+    duration = security_fixed_income(meta)["Duration"].fillna(0.0).to_numpy()[rows]
+    blocks.append((-value * duration / 10_000.0)[:, None])
+    names.append(RATES_FACTOR)
+    return positions, pd.DataFrame(np.hstack(blocks), columns=names)
+
+
+def _valid_factor(factor: str) -> bool:
+    return factor == RATES_FACTOR or "=" in factor
+
+
+def invalid_factors(scenarios: dict) -> list[str]:
+    """One message per scenario factor that is neither '<Dimension>=<Category>' nor RATES_FACTOR."""
+    return [f"stress factor '{factor}' of '{name}' is not '<Dimension>=<Category>' or '{RATES_FACTOR}': ignored"
+            for name, shocks in scenarios.items() for factor in shocks if not _valid_factor(factor)]
+
+
+def shock_matrix(scenarios: dict, factors: pd.Index) -> pd.DataFrame:
+    """Factors x scenarios shocks from {scenario: {factor: shock}}; factors we have no exposure to are dropped."""
+    for message in invalid_factors(scenarios):
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
+    S = pd.DataFrame(0.0, index=factors, columns=list(scenarios))
+    for name, shocks in scenarios.items():
+        for factor, shock in shocks.items():
+            if _valid_factor(factor) and factor in S.index:
+                S.loc[factor, name] = shock
+    return S
+
+
+def grid_shock_matrix(grid: dict, factors: pd.Index) -> pd.DataFrame:
+    """Factors x scenarios for every combination of the grid's shock levels."""
+    keys = list(grid)
+    levels = np.array(list(itertools.product(*(grid[k] for k in keys))), dtype=float).reshape(-1, len(keys))
+    S = np.zeros((len(factors), len(levels)))
+    for j, key in enumerate(keys):
+        if key in factors:
+            S[factors.get_loc(key)] = levels[:, j]
+    columns = pd.MultiIndex.from_arrays(levels.T, names=keys)
+    return pd.DataFrame(S, index=factors, columns=columns)
+
+
+def run_scenarios(X: pd.DataFrame, S: pd.DataFrame) -> pd.Series:
+    """Portfolio P&L per scenario: (1 x positions) X (positions x factors) S (factors x scenarios)."""
+    factor_totals = X.to_numpy().sum(axis=0)
+    S = S.reindex(X.columns, fill_value=0.0)
+    return pd.Series(factor_totals @ S.to_numpy(), index=S.columns, name="P&L")
+
+
+def position_pnl(positions: pd.DataFrame, X: pd.DataFrame, shocks: pd.Series) -> pd.DataFrame:
+    """P&L of every position under one scenario (a column of the shock matrix)."""
+    pnl = X.to_numpy() @ shocks.reindex(X.columns, fill_value=0.0).to_numpy()
+    return positions.assign(**{"P&L": pnl})
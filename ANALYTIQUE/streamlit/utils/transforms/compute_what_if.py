@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+TRADE_COLUMNS = ["Date", "Ticker", "Quantity"]
+
+
+def clean_trades(trades: pd.DataFrame) -> pd.DataFrame:
+    """Complete, non-zero trades from the editor (Date / Ticker / Quantity)."""
+    t = trades.reindex(columns=TRADE_COLUMNS).dropna()
+    t = t.assign(Date=pd.to_datetime(t["Date"]), Quantity=t["Quantity"].astype(float))
+    return t[t["Quantity"] != 0]
+
+
+def trade_deltas(trades: pd.DataFrame, days: pd.DatetimeIndex, tickers: pd.Index) -> tuple[int, pd.DataFrame]:
+    """
+    Hypothetical trades as step changes on a days x tickers holdings grid: a trade adds
+    its quantity from the first trading day on or after its date onwards.
+    Returns (first row affected, cumulative deltas from that row); earlier rows are
+    unchanged, so the work only covers the dates after the earliest trade.
+    """
+    t = clean_trades(trades)
+    rows = days.searchsorted(t["Date"].to_numpy())
+    t, rows = t[rows < len(days)], rows[rows < len(days)]
+    cols = tickers.union(pd.Index(t["Ticker"].unique()))
+    if t.empty:
+        return len(days), pd.DataFrame(index=days[:0], columns=cols, dtype=float)
+    i0 = int(rows.min())
+    steps = np.zeros((len(days) - i0, len(cols)))
+    np.add.at(steps, (rows - i0, cols.get_indexer(t["Ticker"])), t["Quantity"].to_numpy())
+    return i0, pd.DataFrame(np.cumsum(steps, axis=0), index=days[i0:], columns=cols)
+
+
+def apply_deltas(base: pd.DataFrame, i0: int, deltas: pd.DataFrame) -> pd.DataFrame:
+    """base with `deltas` added from row i0 (new columns start at 0)."""
+    out = base.reindex(columns=base.columns.union(deltas.columns), fill_value=0.0)
+    if len(deltas):
+        out.iloc[i0:] += deltas.reindex(columns=out.columns, fill_value=0.0).to_numpy()
+    return out
+
+
+def value_deltas(deltas: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """Market value of the position deltas (tickers without a price count as 0)."""
+    px = prices.reindex(index=deltas.index, columns=deltas.columns)
+    return (deltas * px).fillna(0.0)
+
+
+def exposure_at(values: pd.Series, matrix: np.ndarray, etfs: pd.Index, categories: pd.Index) -> pd.Series:
+    """Look-through exposure by category of ETF values on one date: one (ETF x category) product."""
+    v = values.reindex(etfs).fillna(0.0).to_numpy()
+    return pd.Series(v @ matrix, index=categories)
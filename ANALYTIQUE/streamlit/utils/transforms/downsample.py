@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of `n_out` points that keep the visual
+    shape of the (x, y) line (peaks, troughs, slopes). First and last points are
+    kept; each inner bucket keeps the point forming the largest triangle with the
+    point kept in the previous bucket and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket edges over the inner points, and the mean of every bucket in one pass
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    x_mean = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    y_mean = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    next_x = np.r_[x_mean[1:], x[-1]]
+    next_y = np.r_[y_mean[1:], y[-1]]
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Twice the triangle area (a, candidate, next bucket mean); the constant factor doesn't change the argmax
+        area = np.abs((x[a] - next_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def downsample_series(s: pd.Series, n_out: int) -> pd.Series:
+    """LTTB of a date-indexed series (missing values dropped first)."""
+    s = s.dropna()
+    if len(s) <= n_out:
+        return s
+    x = s.index.asi8.astype(float)
+    return s.iloc[lttb_indices(x, s.to_numpy(dtype=float), n_out)]
+
+
+def downsample_frame(df: pd.DataFrame, n_out: int) -> dict[str, pd.Series]:
+    """{column: downsampled series}; each column keeps its own x positions."""
+    return {col: downsample_series(df[col], n_out) for col in df.columns}
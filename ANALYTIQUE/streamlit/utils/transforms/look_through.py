@@ -0,0 +1,75 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.loaders.api.blackrock_api import FUND_ALIASES
+from utils.transforms.normalize_tickers import normalize_etf_ticker
+
+
+def _fund_keys(lines: pd.DataFrame, funds) -> pd.Series:
+    """Fund each holding line points to (when that fund's holdings are available), else NaN."""
+    keys = lines["Ticker"].map(normalize_etf_ticker).replace(FUND_ALIASES)
+    return keys.where(keys.isin(funds))
+
+
+def fund_graph(underlyers: pd.DataFrame) -> dict:
+    """{fund: set of funds it holds} for the funds present in the snapshot."""
+    funds = set(underlyers["ETF Ticker"].astype(object).unique())
+    keys = _fund_keys(underlyers, funds)
+    edges = underlyers.loc[keys.notna(), "ETF Ticker"].astype(object)
+    graph = {f: set() for f in funds}
+    for parent, child in zip(edges, keys.dropna()):
+        graph[parent].add(child)
+    return graph
+
+
+def expand_fund_lines(underlyers: pd.DataFrame, roots) -> pd.DataFrame:
+    """
+    Recursive look-through of holding lines.
+    Lines pointing to a fund whose holdings are in `underlyers` are replaced by that
+    fund's (recursively expanded) lines, weights multiplied along the path. An edge
+    back into the current path is a cycle and the line stays opaque (RuntimeWarning).
+    A fund's expansion is memoized unless a cycle edge was cut inside it: where the
+    cut falls depends on the path the fund was reached by, so funds on a cycle are
+    expanded again each time and the output does not depend on root order.
+    Returns the lines of `roots`, with "ETF Ticker" set to the root and "Via" holding
+    the nested path (NaN for direct lines).
+    """
+    funds = set(underlyers["ETF Ticker"].astype(object).unique())
+    lines = underlyers.assign(_fund=_fund_keys(underlyers, funds))
+    if "Via" not in lines.columns:
+        lines["Via"] = np.nan
+    by_fund = {etf: sub for etf, sub in lines.groupby(lines["ETF Ticker"].astype(object))}
+
+    memo, path = {}, []
+
+    def expand(fund: str) -> tuple[pd.DataFrame, bool]:
+        """(expanded lines, whether a cycle edge was cut in the expansion)"""
+        if fund in memo:
+            return memo[fund], False
+        path.append(fund)
+        sub = by_fund[fund]
+        cyclic = sub["_fund"].isin(path)
+        cut = bool(cyclic.any())
+        for child in sub.loc[cyclic, "_fund"].unique():
+            warnings.warn(f"fund cycle {' > '.join(path)} > {child}, line kept opaque", RuntimeWarning, stacklevel=2)
+        nested = sub["_fund"].notna() & ~cyclic
+        parts = [sub[~nested]]
+        for child, weight in zip(sub.loc[nested, "_fund"], sub.loc[nested, "Weight (%)"].fillna(0)):
+            expanded, child_cut = expand(child)
+            cut |= child_cut
+            part = expanded.copy()
+            part["Weight (%)"] = part["Weight (%)"] * weight / 100.0
+            part["Via"] = np.where(part["Via"].isna(), child, child + " > " + part["Via"].astype(str))
+            parts.append(part)
+        path.pop()
+        result = pd.concat(parts, ignore_index=True)
+        if not cut:
+            memo[fund] = result
+        return result, cut
+
+    out = [expand(r)[0].assign(**{"ETF Ticker": r}) for r in roots if r in by_fund]
+    if not out:
+        return underlyers.iloc[0:0]
+    return pd.concat(out, ignore_index=True).drop(columns="_fund")
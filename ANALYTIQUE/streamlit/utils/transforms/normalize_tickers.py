@@ -0,0 +1,34 @@
+import pandas as pd
+
+
+def normalize_etf_ticker(raw: str) -> str:
+    if not isinstance(raw, str):
+        return raw
+    r = raw.strip().upper()
+    if ' ' in r:
+        r = r.split(' ')[0]
+    if '.' in r:
+        r = r.split('.')[0]
+    return r
+
+def normalize_holdings_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    norm_cols = [normalize_etf_ticker(c) for c in df.columns]
+    temp = df.copy()
+    temp.columns = norm_cols
+    return temp.groupby(level=0, axis=1).sum()
+
+def normalize_price_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    norm_cols = [normalize_etf_ticker(c) for c in df.columns]
+    temp = df.copy()
+    temp.columns = norm_cols
+    combined = {}
+    for col, sub in temp.groupby(level=0, axis=1):
+        if sub.shape[1] == 1:
+            combined[col] = sub.iloc[:, 0]
+        else:
+            combined[col] = sub.bfill(axis=1).iloc[:, 0]
+    return pd.DataFrame(combined, index=temp.index).sort_index()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# A security is identified by these fields, not by Ticker alone: bond lines
+# often share a placeholder ticker ("-", issuer code) across many issues.
+SECURITY_KEY = ["Ticker", "Name", "Maturity", "Coupon (%)", "Currency"]
+
+# Per-security attributes, stored once in the master instead of on every holding line
+SECURITY_ATTRIBUTES = [
+    "Ticker", "Name", "Sector", "Asset Class", "Location", "Exchange",
+    "Currency", "Market Currency", "Duration", "Coupon (%)", "Maturity", "Price", "FX Rate",
+]
+
+TEXT_ATTRIBUTES = ["Ticker", "Name", "Sector", "Asset Class", "Location", "Exchange",
+                   "Currency", "Market Currency"]
+
+
+def _key_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Canonical text form of the key columns, so IDs do not depend on the dtype
+    the parser happened to infer (e.g. an all-integer Coupon column).
+    """
+    key = pd.DataFrame(index=df.index)
+    for col in SECURITY_KEY:
+        s = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        if col == "Coupon (%)":
+            s = pd.to_numeric(s, errors="coerce").round(6)
+        key[col] = s.astype(str).str.strip().where(s.notna(), "")
+    return key
+
+
+def security_ids(df: pd.DataFrame) -> np.ndarray:
+    """
+    Stable int64 ID per (Ticker, Name, Maturity, Coupon, Currency).
+    Same inputs give the same ID across snapshots, processes and sessions.
+    """
+    if df.empty:
+        return np.empty(0, dtype=np.int64)
+    # Canonicalize and hash each distinct key once (lines repeat across ETFs and snapshots)
+    present = [c for c in SECURITY_KEY if c in df.columns]
+    codes = df.groupby(present, dropna=False, sort=False).ngroup().to_numpy()
+    first = np.unique(codes, return_index=True)[1]
+    hashed = pd.util.hash_pandas_object(_key_strings(df.iloc[first]), index=False)
+    return hashed.to_numpy().view(np.int64)[codes]
+
+
+def build_security_master(underlyers: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split ETF holding lines into:
+      - master: one row per security, indexed by SecurityID (sorted), text as categoricals
+      - lines: the holding lines with a categorical "Security" column whose codes
+        are row positions in master (attributes are dropped from the lines)
+    """
+    lines = underlyers.copy()
+    ids = security_ids(lines)
+    lines["SecurityID"] = ids
+
+    attrs = [c for c in SECURITY_ATTRIBUTES if c in lines.columns]
+    order = lines.sort_values("Effective Date", ascending=False) if "Effective Date" in lines.columns else lines
+    master = (order.drop_duplicates(subset=["SecurityID"])
+                   .set_index("SecurityID")[attrs + ["ETF Ticker"]]
+                   .sort_index())
+    for col in TEXT_ATTRIBUTES + ["ETF Ticker"]:
+        if col in master.columns:
+            master[col] = master[col].astype("category")
+
+    codes = np.searchsorted(master.index.to_numpy(), ids).astype(np.int32)
+    lines = lines.drop(columns=attrs + ["SecurityID"])
+    lines.insert(0, "Security", pd.Categorical.from_codes(codes, categories=master.index))
+    lines["ETF Ticker"] = lines["ETF Ticker"].astype("category")
+    return master, lines
+
+
+def attach_attributes(df: pd.DataFrame, master: pd.DataFrame, columns=None) -> pd.DataFrame:
+    """Join master attributes onto a frame that carries a "Security" categorical column."""
+    columns = list(master.columns) if columns is None else list(columns)
+    codes = df["Security"].cat.codes.to_numpy()
+    attrs = master[columns].iloc[codes].reset_index()
+    attrs.index = df.index
+    return pd.concat([df, attrs], axis=1)